@@ -5,11 +5,25 @@ Provides an interactive, conversational chat-based privacy assessment interface.
 Run with: streamlit run app.py
 """
 
+import os
+import sqlite3
+import time
+
 import streamlit as st
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Mapping, Optional
 from src.inference_engine import InferenceEngine
-from src.issue_classifier import IssueClassifier
-import google.generativeai as genai
+from src.issue_classifier import IssueClassifier, generate_issue_report, stream_issue_report
+from src.output_handler import ResultsSummary
+from src.question_graph import get_question_graph
+from src.question_paths import get_path_table
+from src.job_queue import CANCELLED, DONE, JOB_QUEUE, QUEUED, RUNNING, JobQueueFull, job_cancelled, report_progress
+from src.local_report import use_local_report
+from src.report_cache import REPORT_CACHE, cached_report, remember_report, report_cache_key
+from src.session_memory import (SESSION_MEMORY, current_session_id, memory_enabled, render_memory_report,
+                                session_cap_bytes)
+from src.session_snapshot import get_snapshot_store, new_token
+from src.speculation import SETTLE_SECONDS, SPECULATION, may_speculate, ready_to_speculate, speculation_enabled
+from src.warmup import start_warmup
 
 
 # Configure page
@@ -58,6 +72,44 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# Widgets inside a fragment rerun only that fragment instead of the whole
+# script (st.fragment, or st.experimental_fragment before Streamlit 1.37).
+# PRIVACY_ADVISOR_FRAGMENTS=0 falls back to full-page reruns.
+FRAGMENTS_ENABLED = os.environ.get("PRIVACY_ADVISOR_FRAGMENTS", "1") != "0"
+
+
+# PRIVACY_ADVISOR_SINGLE_REQUEST=0 classifies and asks for follow-ups in two Gemini requests.
+SINGLE_REQUEST = os.environ.get("PRIVACY_ADVISOR_SINGLE_REQUEST", "1") != "0"
+
+# PRIVACY_ADVISOR_STREAM=0 waits for the whole report instead of showing parts as they arrive.
+STREAM_REPORTS = os.environ.get("PRIVACY_ADVISOR_STREAM", "1") != "0"
+
+# Seconds between status checks of a background job
+JOB_POLL_SECONDS = 1.0
+
+# Seconds between checks for newly streamed report parts
+STREAM_POLL_SECONDS = 0.25
+
+# Seconds between checks whether the Step 3 answers have settled
+SPECULATION_TICK_SECONDS = 1.0
+
+
+def _st_fragment():
+    if not FRAGMENTS_ENABLED:
+        return None
+    return getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+
+def fragment(func=None, *, run_every=None):
+    """Decorate func as a Streamlit fragment (rerun every run_every seconds) when available and enabled."""
+    if func is None:
+        return lambda f: fragment(f, run_every=run_every)
+    st_fragment = _st_fragment()
+    if st_fragment is None:
+        return func
+    return st_fragment(func, run_every=run_every) if run_every else st_fragment(func)
+
+
 def initialize_session():
     """Initialize session state variables."""
     if "user_data" not in st.session_state:
@@ -83,352 +135,314 @@ def initialize_session():
         st.session_state.report_generated = False
     if "final_report" not in st.session_state:
         st.session_state.final_report = None
+    # Background job (classification or report) the page is waiting for
+    if "active_job" not in st.session_state:
+        st.session_state.active_job = None
+    # Report generated speculatively while the follow-ups are answered
+    if "speculative_job" not in st.session_state:
+        st.session_state.speculative_job = None
+    if "speculative_key" not in st.session_state:
+        st.session_state.speculative_key = None
+    if "speculated_at" not in st.session_state:
+        st.session_state.speculated_at = None
+    if "speculation_answers" not in st.session_state:
+        st.session_state.speculation_answers = None
+    if "answers_changed_at" not in st.session_state:
+        st.session_state.answers_changed_at = None
+    # Follow-ups the user answered (widget defaults are not answers for speculation)
+    if "followup_touched" not in st.session_state:
+        st.session_state.followup_touched = []
+    if "speculation_count" not in st.session_state:
+        st.session_state.speculation_count = 0
+    if "last_speculated_at" not in st.session_state:
+        st.session_state.last_speculated_at = None
+    # Token of this session's snapshot (PRIVACY_ADVISOR_SNAPSHOTS) and the step it holds
+    if "snapshot_token" not in st.session_state:
+        st.session_state.snapshot_token = None
+    if "snapshot_step" not in st.session_state:
+        st.session_state.snapshot_step = None
 
 
-def get_all_questions() -> Dict[str, Dict[str, Any]]:
-    """Get all available assessment questions organized by category."""
+def session_step() -> tuple:
+    """Where the session is in the issue flow; changes on every step transition."""
+    return (
+        bool(st.session_state.user_issue),
+        st.session_state.issue_classified,
+        st.session_state.report_generated,
+        st.session_state.final_report is not None,
+    )
+
+
+def account_memory():
+    """Sample this session's state size on step changes and enforce the session cap."""
+    cap = session_cap_bytes()
+    if cap is None and not memory_enabled():
+        return
+    session_id = current_session_id()
+    record = SESSION_MEMORY.observe(session_id, "app", session_step(), st.session_state)
+    if record is None or cap is None or record["bytes"] <= cap:
+        return
+    # The report is the bulk of a session; Step 4 gets it back from the shared cache
+    st.session_state.final_report = None
+    st.session_state.final_report_key = None
+    SESSION_MEMORY.trimmed(session_id, st.session_state)
+
+
+def restore_snapshot_session():
+    """On a new session, restore the snapshot named by ?session= (or start a new token)."""
+    store = get_snapshot_store()
+    if store is None or st.session_state.snapshot_token:
+        return
+    token = st.query_params.get("session")
+    fields = store.load(token) if token else None
+    if fields is None:
+        token = new_token()
+    else:
+        for field, value in fields.items():
+            st.session_state[field] = value
+    st.session_state.snapshot_token = token
+    st.session_state.snapshot_step = session_step()
+    st.query_params["session"] = token
+
+
+def snapshot_session():
+    """Save the session's snapshot if it moved to another step since the last save."""
+    store = get_snapshot_store()
+    if store is None or not st.session_state.snapshot_token:
+        return
+    step = session_step()
+    if step == st.session_state.snapshot_step:
+        return
+    try:
+        store.save(st.session_state.snapshot_token, st.session_state)
+    except sqlite3.Error:
+        # A snapshot is a convenience; never fail the page over it
+        return
+    st.session_state.snapshot_step = step
+
+
+def restore_job_session():
+    """After a page reload, rebuild the session from the job ID in the URL."""
+    job_id = st.query_params.get("job")
+    if not job_id or st.session_state.active_job == job_id:
+        return
+    status = JOB_QUEUE.status(job_id)
+    if status is None:
+        # Finished long ago or from another server process
+        del st.query_params["job"]
+        return
+    for field, value in status["meta"].items():
+        st.session_state[field] = value
+    st.session_state.active_job = job_id
+
+
+def start_job(job_id: str):
+    """Remember the job the page waits for, in the session and the URL."""
+    st.session_state.active_job = job_id
+    st.query_params["job"] = job_id
+
+
+def finish_job():
+    """Forget the job the page was waiting for."""
+    st.session_state.active_job = None
+    if "job" in st.query_params:
+        del st.query_params["job"]
+
+
+def classify_issue_job(api_key: str, user_issue: str) -> Dict[str, Any]:
+    """Background job: classify an issue and generate its follow-up questions."""
+    classification, followup_questions = IssueClassifier(api_key, single_request=SINGLE_REQUEST).analyze_issue(user_issue)
+    return {"classification": classification, "followup_questions": followup_questions}
+
+
+def report_job(api_key: str, issue_data: Dict[str, Any], key: str) -> Optional[Dict[str, Any]]:
+    """Background job: generate a report and share it with other sessions (unless cancelled)."""
+    if STREAM_REPORTS:
+        for report in stream_issue_report(api_key, issue_data):
+            if job_cancelled():
+                # A stale speculation: stop reading the stream
+                return None
+            if report.get("partial"):
+                # Shown by the waiting page (render_streamed_job)
+                report_progress(report)
+    else:
+        report = generate_issue_report(api_key, issue_data)
+    if job_cancelled():
+        return None
+    REPORT_CACHE.put(key, report)
+    return report
+
+
+def report_issue_data(followup_answers: Dict[str, Any]) -> Dict[str, Any]:
+    """Inputs of the Step 4 report for the current issue and the given answers."""
     return {
-        # Password Security Questions
-        "password_reuse": {
-            "category": "Password Security",
-            "question": "Do you reuse passwords across different accounts?",
-            "type": "yes_no",
-            "depends_on": None,
-            "follow_ups": {
-                "yes": ["password_manager_importance", "password_strength"],
-                "no": ["password_manager"]
-            }
-        },
-        "password_manager": {
-            "category": "Password Security",
-            "question": "Do you use a password manager to store your passwords?",
-            "type": "yes_no",
-            "depends_on": None,
-            "follow_ups": {
-                "yes": ["password_reuse_avoided"],
-                "no": ["password_manager_importance"]
-            }
-        },
-        "password_manager_importance": {
-            "category": "Password Security",
-            "question": "Are you aware that password managers can help you create unique passwords?",
-            "type": "yes_no",
-            "depends_on": ["password_reuse", "password_manager"],
-            "condition": lambda data: data.get("password_reuse") == "yes" or data.get("password_manager") == "no",
-            "follow_ups": {"yes": [], "no": []}
-        },
-        "password_strength": {
-            "category": "Password Security",
-            "question": "Do you create strong passwords (mix of uppercase, lowercase, numbers, symbols)?",
-            "type": "yes_no",
-            "depends_on": ["password_reuse"],
-            "condition": lambda data: data.get("password_reuse") == "yes",
-            "follow_ups": {"yes": [], "no": []}
-        },
-        "password_reuse_avoided": {
-            "category": "Password Security",
-            "question": "How do you remember your unique passwords without a manager?",
-            "type": "text",
-            "depends_on": ["password_manager"],
-            "condition": lambda data: data.get("password_manager") == "yes",
-            "follow_ups": {}
-        },
-        
-        # Account Security Questions
-        "two_factor": {
-            "category": "Account Security",
-            "question": "Do you have two-factor authentication (2FA) enabled on important accounts?",
-            "type": "yes_no",
-            "depends_on": None,
-            "follow_ups": {
-                "yes": ["two_factor_method"],
-                "no": ["two_factor_barriers"]
-            }
-        },
-        "two_factor_method": {
-            "category": "Account Security",
-            "question": "What method do you use for 2FA?",
-            "type": "choice",
-            "options": ["Authenticator App (Google/Authy)", "SMS", "Biometric", "Multiple Methods"],
-            "depends_on": ["two_factor"],
-            "condition": lambda data: data.get("two_factor") == "yes",
-            "follow_ups": {}
-        },
-        "two_factor_barriers": {
-            "category": "Account Security",
-            "question": "What's preventing you from using 2FA?",
-            "type": "choice",
-            "options": ["Not aware of it", "Too complicated", "Concerned about access", "Don't need it"],
-            "depends_on": ["two_factor"],
-            "condition": lambda data: data.get("two_factor") == "no",
-            "follow_ups": {}
-        },
-        
-        # Network Security Questions
-        "public_wifi": {
-            "category": "Network Security",
-            "question": "Do you connect to public Wi-Fi networks (cafes, airports, etc.)?",
-            "type": "yes_no",
-            "depends_on": None,
-            "follow_ups": {
-                "yes": ["vpn", "public_wifi_behavior"],
-                "no": ["vpn_usage"]
-            }
-        },
-        "public_wifi_behavior": {
-            "category": "Network Security",
-            "question": "What do you do on public Wi-Fi? (Banking, emails, social media, etc.)",
-            "type": "text",
-            "depends_on": ["public_wifi"],
-            "condition": lambda data: data.get("public_wifi") == "yes",
-            "follow_ups": {}
-        },
-        "vpn": {
-            "category": "Network Security",
-            "question": "Do you use a VPN when accessing the internet?",
-            "type": "yes_no",
-            "depends_on": None,
-            "follow_ups": {
-                "yes": ["vpn_frequency"],
-                "no": ["vpn_reason"]
-            }
-        },
-        "vpn_frequency": {
-            "category": "Network Security",
-            "question": "How often do you use a VPN?",
-            "type": "choice",
-            "options": ["Always", "On public Wi-Fi only", "Sometimes", "Rarely"],
-            "depends_on": ["vpn"],
-            "condition": lambda data: data.get("vpn") == "yes",
-            "follow_ups": {}
-        },
-        "vpn_reason": {
-            "category": "Network Security",
-            "question": "Why don't you use a VPN?",
-            "type": "choice",
-            "options": ["Not aware of it", "Too slow", "Too expensive", "Don't think I need it"],
-            "depends_on": ["vpn"],
-            "condition": lambda data: data.get("vpn") == "no",
-            "follow_ups": {}
-        },
-        "vpn_usage": {
-            "category": "Network Security",
-            "question": "Do you use a VPN for general internet privacy?",
-            "type": "yes_no",
-            "depends_on": ["public_wifi"],
-            "condition": lambda data: data.get("public_wifi") == "no",
-            "follow_ups": {"yes": [], "no": []}
-        },
-        
-        # Device Security Questions
-        "os_update": {
-            "category": "Device Security",
-            "question": "Do you keep your operating system and apps up to date?",
-            "type": "yes_no",
-            "depends_on": None,
-            "follow_ups": {
-                "yes": ["auto_update"],
-                "no": ["update_barriers"]
-            }
-        },
-        "auto_update": {
-            "category": "Device Security",
-            "question": "Do you have automatic updates enabled?",
-            "type": "yes_no",
-            "depends_on": ["os_update"],
-            "condition": lambda data: data.get("os_update") == "yes",
-            "follow_ups": {}
-        },
-        "update_barriers": {
-            "category": "Device Security",
-            "question": "What prevents you from updating regularly?",
-            "type": "choice",
-            "options": ["Forget", "Takes too long", "Causes issues", "Don't see the need"],
-            "depends_on": ["os_update"],
-            "condition": lambda data: data.get("os_update") == "no",
-            "follow_ups": {}
-        },
-        "antivirus": {
-            "category": "Device Security",
-            "question": "Do you use antivirus/anti-malware software?",
-            "type": "yes_no",
-            "depends_on": ["os_update"],
-            "condition": lambda data: True,
-            "follow_ups": {"yes": [], "no": []}
-        },
-        
-        # Data Protection Questions
-        "backup_data": {
-            "category": "Data Protection",
-            "question": "Do you regularly back up your important data?",
-            "type": "yes_no",
-            "depends_on": None,
-            "follow_ups": {
-                "yes": ["backup_method", "backup_encryption"],
-                "no": ["backup_reasons"]
-            }
-        },
-        "backup_method": {
-            "category": "Data Protection",
-            "question": "Where do you back up your data?",
-            "type": "choice",
-            "options": ["Cloud (Google Drive, OneDrive)", "External Drive", "Both", "Other"],
-            "depends_on": ["backup_data"],
-            "condition": lambda data: data.get("backup_data") == "yes",
-            "follow_ups": {}
-        },
-        "backup_encryption": {
-            "category": "Data Protection",
-            "question": "Is your backup encrypted?",
-            "type": "yes_no",
-            "depends_on": ["backup_data"],
-            "condition": lambda data: data.get("backup_data") == "yes",
-            "follow_ups": {}
-        },
-        "backup_reasons": {
-            "category": "Data Protection",
-            "question": "Why don't you back up data?",
-            "type": "choice",
-            "options": ["Don't have important data", "Too complicated", "Storage costs", "Never thought about it"],
-            "depends_on": ["backup_data"],
-            "condition": lambda data: data.get("backup_data") == "no",
-            "follow_ups": {}
-        },
-        
-        # Communication Security Questions
-        "email_encryption": {
-            "category": "Communication Security",
-            "question": "Do you use email encryption for sensitive communications?",
-            "type": "yes_no",
-            "depends_on": None,
-            "follow_ups": {
-                "yes": ["email_service"],
-                "no": ["email_sensitivity"]
-            }
-        },
-        "email_service": {
-            "category": "Communication Security",
-            "question": "Which encrypted email service do you use?",
-            "type": "text",
-            "depends_on": ["email_encryption"],
-            "condition": lambda data: data.get("email_encryption") == "yes",
-            "follow_ups": {}
-        },
-        "email_sensitivity": {
-            "category": "Communication Security",
-            "question": "Do you send sensitive information via email?",
-            "type": "yes_no",
-            "depends_on": ["email_encryption"],
-            "condition": lambda data: data.get("email_encryption") == "no",
-            "follow_ups": {}
-        },
-        
-        # Privacy Settings Questions
-        "privacy_settings": {
-            "category": "Privacy Settings",
-            "question": "Do you regularly review app permissions on your devices?",
-            "type": "yes_no",
-            "depends_on": None,
-            "follow_ups": {
-                "yes": ["permission_management"],
-                "no": ["permission_concerns"]
-            }
-        },
-        "permission_management": {
-            "category": "Privacy Settings",
-            "question": "How many apps have access to your camera/microphone?",
-            "type": "choice",
-            "options": ["None", "Few", "Many", "Don't know"],
-            "depends_on": ["privacy_settings"],
-            "condition": lambda data: data.get("privacy_settings") == "yes",
-            "follow_ups": {}
-        },
-        "permission_concerns": {
-            "category": "Privacy Settings",
-            "question": "Are you concerned about app permissions?",
-            "type": "yes_no",
-            "depends_on": ["privacy_settings"],
-            "condition": lambda data: data.get("privacy_settings") == "no",
-            "follow_ups": {}
-        },
-        
-        # Social Media Questions
-        "social_media_usage": {
-            "category": "Social Media",
-            "question": "How active are you on social media?",
-            "type": "choice",
-            "options": ["Very Active", "Moderately Active", "Rarely", "Don't use it"],
-            "depends_on": None,
-            "follow_ups": {
-                "Very Active": ["social_media_privacy"],
-                "Moderately Active": ["social_media_privacy"],
-                "Rarely": [],
-                "Don't use it": []
-            }
-        },
-        "social_media_privacy": {
-            "category": "Social Media",
-            "question": "How private are your social media accounts?",
-            "type": "choice",
-            "options": ["Public", "Friends only", "Private", "Don't share personal info"],
-            "depends_on": ["social_media_usage"],
-            "condition": lambda data: data.get("social_media_usage") in ["Very Active", "Moderately Active"],
-            "follow_ups": {}
-        },
+        "user_issue": st.session_state.user_issue,
+        "classification": st.session_state.issue_classification,
+        "followup_answers": followup_answers,
+        "followup_questions": st.session_state.followup_questions
     }
 
 
+def submit_report_job(api_key: str, issue_data: Dict[str, Any], key: str) -> str:
+    """Queue a report job; its metadata lets a reload resume at Step 4."""
+    return JOB_QUEUE.submit(
+        report_job, api_key, issue_data, key,
+        kind="report", key=key, meta=dict(
+            user_issue=issue_data["user_issue"],
+            issue_classification=issue_data["classification"],
+            issue_classified=True,
+            followup_questions=issue_data["followup_questions"],
+            followup_answers=issue_data["followup_answers"],
+            report_generated=True,
+        )
+    )
+
+
+def clear_speculation(cancel: bool = True):
+    """Forget the speculative report job, cancelling it unless it is kept."""
+    if cancel and st.session_state.speculative_job is not None:
+        if JOB_QUEUE.cancel(st.session_state.speculative_job):
+            SPECULATION.cancelled()
+    st.session_state.speculative_job = None
+    st.session_state.speculative_key = None
+    st.session_state.speculated_at = None
+
+
+def resolve_speculation(key: str):
+    """
+    On the first Step 4 run, keep the speculative job if it matches the final answers.
+    
+    Args:
+        key: Report cache key of the final answers
+    """
+    if st.session_state.speculative_key is None:
+        SPECULATION.report(hit=False)
+        return
+    hit = st.session_state.speculative_key == key
+    saved = 0.0
+    if hit:
+        saved = time.monotonic() - st.session_state.speculated_at
+        status = JOB_QUEUE.status(st.session_state.speculative_job)
+        if status is not None and status["state"] not in (QUEUED, RUNNING):
+            # Finished before the click: it saved its whole duration
+            saved = min(saved, status["wait_seconds"] + status["run_seconds"])
+    SPECULATION.report(hit=hit, saved_seconds=saved)
+    clear_speculation(cancel=not hit)
+
+
+@fragment(run_every=SPECULATION_TICK_SECONDS)
+def speculate_report(api_key: str):
+    """Queue the report for the current answers once the user's answers look settled (renders nothing)."""
+    answers = dict(st.session_state.followup_answers)
+    now = time.monotonic()
+    if answers != st.session_state.speculation_answers:
+        st.session_state.speculation_answers = answers
+        st.session_state.answers_changed_at = now
+    touched = {q_id: answers[q_id] for q_id in st.session_state.followup_touched if q_id in answers}
+    if not ready_to_speculate(st.session_state.followup_questions, touched,
+                              now - st.session_state.answers_changed_at, SETTLE_SECONDS):
+        return
+    # The job gets every answer, defaults included, as the Generate button would send them
+    issue_data = report_issue_data(answers)
+    key = report_cache_key(issue_data, IssueClassifier.MODEL_NAME)
+    if key == st.session_state.speculative_key:
+        return
+    clear_speculation()
+    last = st.session_state.last_speculated_at
+    if not may_speculate(st.session_state.speculation_count, None if last is None else now - last):
+        return
+    try:
+        job_id = submit_report_job(api_key, issue_data, key)
+    except JobQueueFull:
+        # Speculation never competes with requested work for queue space
+        return
+    SPECULATION.started()
+    st.session_state.speculative_job = job_id
+    st.session_state.speculative_key = key
+    st.session_state.speculated_at = now
+    st.session_state.speculation_count += 1
+    st.session_state.last_speculated_at = now
+
+
+def mark_followup_touched(q_id: str):
+    """Widget callback: the user answered a follow-up question."""
+    if q_id not in st.session_state.followup_touched:
+        st.session_state.followup_touched.append(q_id)
+
+
+def reset_followups():
+    """Forget the follow-up answers and the speculation state of the previous issue."""
+    st.session_state.followup_answers = {}
+    st.session_state.followup_touched = []
+    st.session_state.speculation_count = 0
+    st.session_state.last_speculated_at = None
+
+
+def show_job_status(job_id: str, label: str):
+    """Progress of a background job and any streamed report parts; reruns the page once the job is finished."""
+    status = JOB_QUEUE.status(job_id)
+    if status is None or status["state"] not in (QUEUED, RUNNING):
+        st.rerun()
+    if status["state"] == QUEUED:
+        waiting = JOB_QUEUE.stats()["queue_depth"]
+        st.info(f"⏳ {label} — waiting for a free worker ({waiting} in line)")
+    else:
+        st.info(f"{label}… {status['run_seconds']:.0f}s")
+    if status["progress"]:
+        render_report_sections(status["progress"])
+
+
+@fragment(run_every=JOB_POLL_SECONDS)
+def render_job_status(job_id: str, label: str):
+    """Job progress, checked every JOB_POLL_SECONDS."""
+    show_job_status(job_id, label)
+
+
+@fragment(run_every=STREAM_POLL_SECONDS)
+def render_streamed_job(job_id: str, label: str):
+    """Job progress, checked often enough to show streamed report parts as they complete."""
+    show_job_status(job_id, label)
+
+
+def wait_for_job(job_id: str, label: str, streamed: bool = False):
+    """
+    Show a job's progress without blocking, or block when fragments are unavailable.
+    
+    Args:
+        job_id: Job to wait for
+        label: What the job does
+        streamed: The job publishes partial reports (report_progress)
+    """
+    if _st_fragment() is not None:
+        (render_streamed_job if streamed else render_job_status)(job_id, label)
+        return
+    with st.spinner(label):
+        placeholder = st.empty()
+        shown = None
+        status = JOB_QUEUE.wait(job_id, timeout=STREAM_POLL_SECONDS if streamed else None)
+        while status is not None and status["state"] in (QUEUED, RUNNING):
+            if status["progress"] is not None and status["progress"] is not shown:
+                shown = status["progress"]
+                with placeholder.container():
+                    render_report_sections(shown)
+            status = JOB_QUEUE.wait(job_id, timeout=STREAM_POLL_SECONDS)
+    st.rerun()
+
+
+def get_all_questions() -> Mapping[str, Mapping[str, Any]]:
+    """Get all available assessment questions organized by category."""
+    return get_question_graph().questions
+
+
 def get_next_questions(user_data: Dict[str, Any]) -> List[str]:
     """
     Intelligently determine the next questions based on previous answers.
     Uses adaptive branching to customize the assessment.
     """
-    all_questions = get_all_questions()
-    asked_questions = set(user_data.keys())
-    next_questions = []
-    
-    # Start with initial questions if none answered yet
-    if not asked_questions:
-        return [
-            "password_reuse",
-            "two_factor",
-            "public_wifi",
-            "os_update",
-            "backup_data",
-            "email_encryption",
-            "privacy_settings",
-            "social_media_usage",
-            "antivirus"
-        ]
-    
-    # Determine follow-up questions based on latest answer
-    last_answered_key = list(user_data.keys())[-1] if user_data else None
-    
-    if last_answered_key in all_questions:
-        question_info = all_questions[last_answered_key]
-        last_answer = user_data[last_answered_key]
-        
-        # Get follow-up questions based on answer
-        if "follow_ups" in question_info and last_answer in question_info["follow_ups"]:
-            follow_ups = question_info["follow_ups"][last_answer]
-            for follow_up_key in follow_ups:
-                if follow_up_key not in asked_questions:
-                    next_questions.append(follow_up_key)
-    
-    # Check for conditional questions
-    for q_key, q_info in all_questions.items():
-        if q_key not in asked_questions:
-            depends_on = q_info.get("depends_on")
-            condition_func = q_info.get("condition")
-            
-            # Check if dependencies are met
-            if depends_on is None or all(dep in asked_questions for dep in (depends_on if isinstance(depends_on, list) else [depends_on])):
-                # Check conditional logic
-                if condition_func is None or condition_func(user_data):
-                    if q_key not in next_questions:
-                        next_questions.append(q_key)
-    
-    return next_questions[:1] if next_questions else []  # Return one question at a time
+    table = get_path_table()
+    if table is not None:
+        return table.next_questions(user_data)
+    return get_question_graph().next_questions(user_data)
 
 
 def get_questions() -> List[Dict[str, Any]]:
@@ -442,7 +456,7 @@ def get_questions() -> List[Dict[str, Any]]:
     questions = []
     for key in next_q_keys:
         if key in all_questions:
-            q = all_questions[key].copy()
+            q = dict(all_questions[key])
             q["key"] = key
             questions.append(q)
     
@@ -537,30 +551,22 @@ def display_results(recommendations: List[Dict[str, Any]], risk_score: int):
         st.metric(label="Overall Risk Score", value=f"{risk_percentage}/100")
     
     # Categorize recommendations by priority
-    priority_order = {"high": 0, "medium": 1, "low": 2}
-    sorted_recs = sorted(
-        recommendations,
-        key=lambda r: (priority_order.get(r["priority"], 3), -r["risk_score"])
-    )
-    
-    high_priority = [r for r in sorted_recs if r["priority"] == "high"]
-    medium_priority = [r for r in sorted_recs if r["priority"] == "medium"]
-    low_priority = [r for r in sorted_recs if r["priority"] == "low"]
+    summary = ResultsSummary(recommendations, risk_score)
     
     # Display recommendations by priority
-    if high_priority:
+    if summary.high:
         st.markdown("### 🔴 HIGH PRIORITY — Address these immediately")
-        for i, rec in enumerate(high_priority, 1):
+        for i, rec in enumerate(summary.high, 1):
             display_recommendation(rec, i, "high-priority")
     
-    if medium_priority:
+    if summary.medium:
         st.markdown("### 🟡 MEDIUM PRIORITY — Consider these improvements")
-        for i, rec in enumerate(medium_priority, 1):
+        for i, rec in enumerate(summary.medium, 1):
             display_recommendation(rec, i, "medium-priority")
     
-    if low_priority:
+    if summary.low:
         st.markdown("### 🟢 LOW PRIORITY — Nice to have")
-        for i, rec in enumerate(low_priority, 1):
+        for i, rec in enumerate(summary.low, 1):
             display_recommendation(rec, i, "low-priority")
     
     if not recommendations:
@@ -594,6 +600,14 @@ def display_recommendation(rec: Dict[str, Any], index: int, priority_class: str)
 def main():
     """Main Streamlit app."""
     initialize_session()
+    restore_snapshot_session()
+    restore_job_session()
+    account_memory()
+    if memory_enabled() and st.query_params.get("debug") == "memory":
+        render_memory_report()
+        return
+    # Load rules, questions and the Gemini SDK while the first page renders
+    start_warmup()
     
     # Sidebar for API key
     with st.sidebar:
@@ -605,6 +619,8 @@ def main():
         )
         if api_key:
             st.success("✓ API key configured")
+            # Build this key's model while the user describes the issue
+            start_warmup(api_key, IssueClassifier.MODEL_NAME)
     
     if not api_key:
         st.warning("⚠️ Please enter your Gemini API key in the sidebar to use the Privacy Advisor")
@@ -618,8 +634,11 @@ def main():
         """)
         return
     
-    # Run issue-based assessment
-    run_issue_based_assessment(api_key)
+    # Run issue-based assessment; st.rerun() raises, so save the snapshot on the way out
+    try:
+        run_issue_based_assessment(api_key)
+    finally:
+        snapshot_session()
 
 
 def run_issue_based_assessment(api_key: str):
@@ -652,217 +671,304 @@ def run_issue_based_assessment(api_key: str):
                     st.warning("Please describe your concern")
         return
     
-    # Step 2: Classify the issue
+    # Step 2: Classify the issue (on a background worker)
     if not st.session_state.issue_classified:
         st.markdown("## Step 2️⃣ Analyzing Your Concern")
         
-        with st.spinner("🤖 Using AI to analyze your privacy concern..."):
+        status = JOB_QUEUE.status(st.session_state.active_job)
+        if status is None or status["kind"] != "classify":
             try:
-                classifier = IssueClassifier(api_key)
-                classification = classifier.classify_issue(st.session_state.user_issue)
-                st.session_state.issue_classification = classification
-                
-                # Generate follow-up questions
-                followup_questions = classifier.generate_followup_questions(classification)
-                st.session_state.followup_questions = followup_questions
-                st.session_state.issue_classified = True
-                
-            except Exception as e:
-                st.error(f"Error analyzing issue: {e}")
-                if st.button("🔄 Try Again"):
-                    st.session_state.user_issue = None
-                    st.session_state.issue_classified = False
+                job_id = JOB_QUEUE.submit(
+                    classify_issue_job, api_key, st.session_state.user_issue,
+                    kind="classify", meta={"user_issue": st.session_state.user_issue}
+                )
+            except JobQueueFull:
+                st.error("The advisor is busy right now. Please try again in a moment.")
                 return
-        
-        st.rerun()
+            start_job(job_id)
+            status = JOB_QUEUE.status(job_id)
+        
+        if status["state"] == DONE:
+            st.session_state.issue_classification = status["result"]["classification"]
+            st.session_state.followup_questions = status["result"]["followup_questions"]
+            reset_followups()
+            st.session_state.issue_classified = True
+            finish_job()
+            st.rerun()
+        elif status["state"] in (QUEUED, RUNNING):
+            wait_for_job(status["id"], "🤖 Using AI to analyze your privacy concern")
+            return
+        else:
+            st.error(f"Error analyzing issue: {status['error']}")
+            if st.button("🔄 Try Again"):
+                finish_job()
+                clear_speculation()
+                JOB_QUEUE.discard(status["id"])
+                st.session_state.user_issue = None
+                st.session_state.issue_classified = False
+                st.rerun()
+            return
     
     # Step 3: Display classification and collect follow-up answers
     if st.session_state.issue_classified and not st.session_state.report_generated:
-        classification = st.session_state.issue_classification
-        classifier = IssueClassifier(api_key)
-        
-        # Display analysis
-        st.markdown("## Step 2️⃣ Analysis Results")
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            category = classification.get("primary_category", "general")
-            icon = classifier.get_category_icon(category)
-            st.markdown(f"### {icon} Category")
-            st.markdown(f"**{category.replace('_', ' ').title()}**")
-        
-        with col2:
-            severity = classification.get("severity", "medium").upper()
-            severity_icon = {"LOW": "🟢", "MEDIUM": "🟡", "HIGH": "🔴", "CRITICAL": "🔴🔴"}
-            st.markdown(f"### Severity")
-            st.markdown(f"{severity_icon.get(severity, '🔴')} **{severity}**")
-        
-        with col3:
-            risk = classification.get("risk_level", 50)
-            st.markdown(f"### Risk Level")
-            st.markdown(f"**{risk}/100**")
-        
-        st.divider()
-        
-        # Display summary and concerns
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("**📋 Summary:**")
-            st.write(classification.get("summary", "Issue identified"))
-        
-        with col2:
-            st.markdown("**⚠️ Key Concerns:**")
-            for concern in classification.get("key_concerns", []):
-                st.write(f"• {concern}")
-        
-        st.divider()
-        
-        # Follow-up questions
-        st.markdown("## Step 3️⃣ Answer Follow-Up Questions")
-        st.info("These questions help us understand your situation better and provide targeted recommendations")
-        
-        followup_questions = st.session_state.followup_questions
-        all_answered = True
-        
-        for i, question in enumerate(followup_questions, 1):
-            st.markdown(f"### Q{i}: {question['question']}")
-            st.caption(f"💡 {question.get('context', '')}")
-            
-            q_id = question["id"]
-            q_type = question.get("type", "text")
-            
-            if q_type == "yes_no":
-                answer = st.radio(
-                    label="Select one:",
-                    options=["Yes", "No"],
-                    key=f"followup_{q_id}",
-                    label_visibility="collapsed"
-                )
-                st.session_state.followup_answers[q_id] = answer
-            
-            elif q_type == "choice":
-                options = question.get("options", [])
-                answer = st.selectbox(
-                    label="Select one:",
-                    options=options,
-                    key=f"followup_{q_id}",
-                    label_visibility="collapsed"
-                )
-                st.session_state.followup_answers[q_id] = answer
-            
-            elif q_type == "text":
-                answer = st.text_input(
-                    label="Your answer:",
-                    key=f"followup_{q_id}",
-                    label_visibility="collapsed"
-                )
-                if answer:
-                    st.session_state.followup_answers[q_id] = answer
-                else:
-                    all_answered = False
-            
-            st.divider()
-        
-        # Generate report button
-        if len(st.session_state.followup_answers) >= len(followup_questions) - 1:
-            if st.button("📊 Generate Detailed Report", use_container_width=True, type="primary"):
-                st.session_state.report_generated = True
-                st.rerun()
-        else:
-            st.info(f"Please answer at least {len(followup_questions) - 1} of {len(followup_questions)} questions")
+        render_classification_summary(st.session_state.issue_classification)
+        render_followup_form(st.session_state.followup_questions)
+        # Rule-engine reports are instant, so only Gemini reports are speculated
+        if speculation_enabled() and not use_local_report(st.session_state.issue_classification):
+            speculate_report(api_key)
     
     # Step 4: Display final report
     if st.session_state.report_generated:
         st.markdown("## Step 4️⃣ Detailed Analysis Report")
         
-        with st.spinner("📊 Generating comprehensive report..."):
-            try:
-                classifier = IssueClassifier(api_key)
-                report = classifier.generate_report({
-                    "user_issue": st.session_state.user_issue,
-                    "classification": st.session_state.issue_classification,
-                    "followup_answers": st.session_state.followup_answers
-                })
-                st.session_state.final_report = report
-                
-            except Exception as e:
-                st.error(f"Error generating report: {e}")
+        issue_data = report_issue_data(st.session_state.followup_answers)
+        key = report_cache_key(issue_data, IssueClassifier.MODEL_NAME)
+        if st.session_state.speculated_at is not None or st.session_state.speculation_answers is not None:
+            resolve_speculation(key)
+            st.session_state.speculation_answers = None
+        # Only calls Gemini when the inputs changed since the last rerun
+        # and no other session generated (or is generating) the same report
+        report, _ = cached_report(st.session_state, issue_data, IssueClassifier.MODEL_NAME)
+        if report is None:
+            job_id = JOB_QUEUE.find(key)
+            if job_id is None:
+                try:
+                    job_id = submit_report_job(api_key, issue_data, key)
+                except JobQueueFull:
+                    st.error("The advisor is busy right now. Please try again in a moment.")
+                    return
+            start_job(job_id)
+            status = JOB_QUEUE.status(job_id)
+            if status["state"] == CANCELLED:
+                # Another session's speculation went stale; queue the report again
+                st.rerun()
+            if status["state"] in (QUEUED, RUNNING):
+                wait_for_job(job_id, "📊 Generating comprehensive report", streamed=STREAM_REPORTS)
                 return
+            finish_job()
+            if status["state"] != DONE:
+                JOB_QUEUE.discard(job_id)
+                st.error(f"Error generating report: {status['error']}")
+                return
+            report = status["result"]
+            remember_report(st.session_state, key, report)
+            if "error" in report:
+                # Let the next visit retry Gemini instead of reusing the fallback
+                JOB_QUEUE.discard(job_id)
         
-        report = st.session_state.final_report
-        
-        # Analysis section
-        st.markdown("### 📋 Detailed Analysis")
-        st.write(report.get("analysis", "Analysis in progress..."))
-        
-        # Root causes
-        if report.get("root_causes"):
-            st.markdown("### 🔍 Root Causes")
-            for i, cause in enumerate(report.get("root_causes", []), 1):
-                st.write(f"{i}. {cause}")
-        
-        # Immediate actions
-        if report.get("immediate_actions"):
-            st.markdown("### 🚨 Immediate Actions (High Priority)")
-            for action in report.get("immediate_actions", []):
-                with st.container(border=True):
-                    st.markdown(f"**🔴 {action.get('action', 'Action')}**")
-                    st.caption(f"Why: {action.get('why', '')}")
-        
-        # Medium term steps
-        if report.get("medium_term_steps"):
-            st.markdown("### ⏱️ Medium-Term Steps")
-            for step in report.get("medium_term_steps", []):
-                with st.container(border=True):
-                    priority_icon = {"high": "🟠", "medium": "🟡", "low": "🟢"}
-                    icon = priority_icon.get(step.get("priority", "medium"), "🔵")
-                    st.markdown(f"**{icon} {step.get('action', 'Step')}**")
-                    st.caption(f"Why: {step.get('why', '')}")
-        
-        # Recommended tools
-        if report.get("tools_recommended"):
-            st.markdown("### 🛠️ Recommended Tools & Services")
-            cols = st.columns(2)
-            for i, tool in enumerate(report.get("tools_recommended", [])):
-                with cols[i % 2]:
-                    st.write(f"• {tool}")
-        
-        # Timeline
-        if report.get("timeline"):
-            st.markdown("### ⏳ Implementation Timeline")
-            st.info(report.get("timeline", ""))
-        
-        # FAQ
-        if report.get("faq"):
-            st.markdown("### ❓ Frequently Asked Questions")
-            for faq in report.get("faq", []):
-                with st.expander(faq.get("question", "Question")):
-                    st.write(faq.get("answer", ""))
+        render_report(report)
+
+
+@st.cache_data(show_spinner=False)
+def classification_view(classification: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Display strings for a classification, computed once per classification.
+    
+    Args:
+        classification: Result of IssueClassifier.classify_issue
+    
+    Returns:
+        Dict with icon, category, severity, severity_icon, risk, summary, concerns
+    """
+    category = classification.get("primary_category", "general")
+    severity = classification.get("severity", "medium").upper()
+    severity_icon = {"LOW": "🟢", "MEDIUM": "🟡", "HIGH": "🔴", "CRITICAL": "🔴🔴"}
+    return {
+        "icon": IssueClassifier.get_category_icon(category),
+        "category": category.replace('_', ' ').title(),
+        "severity": severity,
+        "severity_icon": severity_icon.get(severity, '🔴'),
+        "risk": classification.get("risk_level", 50),
+        "summary": classification.get("summary", "Issue identified"),
+        "concerns": [f"• {concern}" for concern in classification.get("key_concerns", [])],
+    }
+
+
+@fragment
+def render_classification_summary(classification: Dict[str, Any]):
+    """Step 2 results: category, severity, risk, summary and key concerns."""
+    view = classification_view(classification)
+    
+    st.markdown("## Step 2️⃣ Analysis Results")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown(f"### {view['icon']} Category")
+        st.markdown(f"**{view['category']}**")
+    
+    with col2:
+        st.markdown(f"### Severity")
+        st.markdown(f"{view['severity_icon']} **{view['severity']}**")
+    
+    with col3:
+        st.markdown(f"### Risk Level")
+        st.markdown(f"**{view['risk']}/100**")
+    
+    st.divider()
+    
+    # Display summary and concerns
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**📋 Summary:**")
+        st.write(view["summary"])
+    
+    with col2:
+        st.markdown("**⚠️ Key Concerns:**")
+        for concern in view["concerns"]:
+            st.write(concern)
+    
+    st.divider()
+
+
+@fragment
+def render_followup_form(followup_questions: List[Dict[str, Any]]):
+    """Step 3 follow-up questions; answering one reruns only this fragment."""
+    st.markdown("## Step 3️⃣ Answer Follow-Up Questions")
+    st.info("These questions help us understand your situation better and provide targeted recommendations")
+    
+    all_answered = True
+    
+    for i, question in enumerate(followup_questions, 1):
+        st.markdown(f"### Q{i}: {question['question']}")
+        st.caption(f"💡 {question.get('context', '')}")
+        
+        q_id = question["id"]
+        q_type = question.get("type", "text")
+        
+        if q_type == "yes_no":
+            answer = st.radio(
+                label="Select one:",
+                options=["Yes", "No"],
+                key=f"followup_{q_id}",
+                label_visibility="collapsed",
+                on_change=mark_followup_touched,
+                args=(q_id,)
+            )
+            st.session_state.followup_answers[q_id] = answer
+        
+        elif q_type == "choice":
+            options = question.get("options", [])
+            answer = st.selectbox(
+                label="Select one:",
+                options=options,
+                key=f"followup_{q_id}",
+                label_visibility="collapsed",
+                on_change=mark_followup_touched,
+                args=(q_id,)
+            )
+            st.session_state.followup_answers[q_id] = answer
+        
+        elif q_type == "text":
+            answer = st.text_input(
+                label="Your answer:",
+                key=f"followup_{q_id}",
+                label_visibility="collapsed",
+                on_change=mark_followup_touched,
+                args=(q_id,)
+            )
+            if answer:
+                st.session_state.followup_answers[q_id] = answer
+            else:
+                all_answered = False
         
         st.divider()
-        
-        # Action buttons
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("🔄 Analyze Another Issue", use_container_width=True):
-                st.session_state.user_issue = None
-                st.session_state.issue_classified = False
-                st.session_state.issue_classification = None
-                st.session_state.followup_questions = []
-                st.session_state.followup_answers = {}
-                st.session_state.report_generated = False
-                st.session_state.final_report = None
-                st.rerun()
-        
-        with col2:
-            if st.button("📖 View Assessment Path", use_container_width=True):
-                with st.expander("Assessment Journey"):
-                    st.write("**Your Issue:**")
-                    st.write(st.session_state.user_issue)
-                    st.divider()
-                    st.write("**Follow-up Answers:**")
-                    for q_id, answer in st.session_state.followup_answers.items():
-                        st.write(f"- {q_id}: {answer}")
+    
+    # Generate report button (st.rerun() reruns the whole app, not just the fragment)
+    if len(st.session_state.followup_answers) >= len(followup_questions) - 1:
+        if st.button("📊 Generate Detailed Report", use_container_width=True, type="primary"):
+            st.session_state.report_generated = True
+            st.rerun()
+    else:
+        st.info(f"Please answer at least {len(followup_questions) - 1} of {len(followup_questions)} questions")
+
+
+def render_report_sections(report: Dict[str, Any]):
+    """Report sections present in report (a streamed partial report shows what has arrived)."""
+    # Analysis section
+    st.markdown("### 📋 Detailed Analysis")
+    st.write(report.get("analysis", "Analysis in progress..."))
+    
+    # Root causes
+    if report.get("root_causes"):
+        st.markdown("### 🔍 Root Causes")
+        for i, cause in enumerate(report.get("root_causes", []), 1):
+            st.write(f"{i}. {cause}")
+    
+    # Immediate actions
+    if report.get("immediate_actions"):
+        st.markdown("### 🚨 Immediate Actions (High Priority)")
+        for action in report.get("immediate_actions", []):
+            with st.container(border=True):
+                st.markdown(f"**🔴 {action.get('action', 'Action')}**")
+                st.caption(f"Why: {action.get('why', '')}")
+    
+    # Medium term steps
+    if report.get("medium_term_steps"):
+        st.markdown("### ⏱️ Medium-Term Steps")
+        for step in report.get("medium_term_steps", []):
+            with st.container(border=True):
+                priority_icon = {"high": "🟠", "medium": "🟡", "low": "🟢"}
+                icon = priority_icon.get(step.get("priority", "medium"), "🔵")
+                st.markdown(f"**{icon} {step.get('action', 'Step')}**")
+                st.caption(f"Why: {step.get('why', '')}")
+    
+    # Recommended tools
+    if report.get("tools_recommended"):
+        st.markdown("### 🛠️ Recommended Tools & Services")
+        cols = st.columns(2)
+        for i, tool in enumerate(report.get("tools_recommended", [])):
+            with cols[i % 2]:
+                st.write(f"• {tool}")
+    
+    # Timeline
+    if report.get("timeline"):
+        st.markdown("### ⏳ Implementation Timeline")
+        st.info(report.get("timeline", ""))
+    
+    # FAQ
+    if report.get("faq"):
+        st.markdown("### ❓ Frequently Asked Questions")
+        for faq in report.get("faq", []):
+            with st.expander(faq.get("question", "Question")):
+                st.write(faq.get("answer", ""))
+
+
+@fragment
+def render_report(report: Dict[str, Any]):
+    """Step 4 report sections and actions; the buttons rerun only this fragment."""
+    if report.get("source") == "local":
+        if "error" in report:
+            st.warning("⚠️ The AI service is unavailable, so this report comes from the built-in rule engine")
+        else:
+            st.caption("⚡ Generated instantly by the built-in rule engine for this common issue")
+    
+    render_report_sections(report)
+    
+    st.divider()
+    
+    # Action buttons
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🔄 Analyze Another Issue", use_container_width=True):
+            st.session_state.user_issue = None
+            st.session_state.issue_classified = False
+            st.session_state.issue_classification = None
+            st.session_state.followup_questions = []
+            reset_followups()
+            st.session_state.report_generated = False
+            st.session_state.final_report = None
+            clear_speculation()
+            st.rerun()
+    
+    with col2:
+        if st.button("📖 View Assessment Path", use_container_width=True):
+            with st.expander("Assessment Journey"):
+                st.write("**Your Issue:**")
+                st.write(st.session_state.user_issue)
+                st.divider()
+                st.write("**Follow-up Answers:**")
+                for q_id, answer in st.session_state.followup_answers.items():
+                    st.write(f"- {q_id}: {answer}")
 
 
 
@@ -5,7 +5,10 @@ about digital privacy and security, with intelligent responses powered by Gemini
 """
 
 import streamlit as st
-import google.generativeai as genai
+from src.gemini_pool import GEMINI_POOL
+from src.session_memory import (SESSION_MEMORY, current_session_id, memory_enabled, render_memory_report,
+                                session_cap_bytes, trim_oldest)
+from src.warmup import start_warmup
 from typing import Optional
 
 
@@ -85,12 +88,27 @@ def initialize_session():
         st.session_state.model = None
 
 
+# Messages sent to Gemini as context (the last 3 exchanges); never trimmed by the session cap
+CONTEXT_MESSAGES = 6
+
+
+def account_memory():
+    """Sample this session's state size per message and trim the oldest messages over the cap."""
+    cap = session_cap_bytes()
+    if cap is None and not memory_enabled():
+        return
+    session_id = current_session_id()
+    record = SESSION_MEMORY.observe(session_id, "chatbot", len(st.session_state.messages), st.session_state)
+    if record is None or cap is None or record["bytes"] <= cap:
+        return
+    if trim_oldest(st.session_state.messages, record["bytes"] - cap, keep=CONTEXT_MESSAGES):
+        SESSION_MEMORY.trimmed(session_id, st.session_state)
+
+
 def configure_gemini(api_key: str) -> Optional[object]:
-    """Configure and return Gemini model instance."""
+    """Return the pooled Gemini model for this API key (built once per key)."""
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-pro")
-        return model
+        return GEMINI_POOL.get(api_key, "gemini-pro")
     except Exception as e:
         st.error(f"Failed to configure Gemini API: {e}")
         return None
@@ -101,7 +119,7 @@ def get_chatbot_response(model: object, user_message: str) -> str:
     try:
         # Prepare conversation history for context
         chat_history = []
-        for msg in st.session_state.messages[-6:]:  # Last 3 exchanges (6 messages)
+        for msg in st.session_state.messages[-CONTEXT_MESSAGES:]:
             if msg["role"] == "user":
                 chat_history.append({"role": "user", "parts": [msg["content"]]})
             else:
@@ -130,6 +148,12 @@ def display_chat_history():
 def main():
     """Main chatbot interface."""
     initialize_session()
+    account_memory()
+    if memory_enabled() and st.query_params.get("debug") == "memory":
+        render_memory_report()
+        return
+    # Import the Gemini SDK while the user pastes their API key
+    start_warmup()
     
     # Header
     st.markdown("# 🤖 Digital Privacy Advisor Chatbot")
@@ -5,6 +5,8 @@ Input forms for user data collection
 import tkinter as tk
 from tkinter import ttk
 
+from src.question_graph import get_question_set
+
 class InputForm(tk.Frame):
     """Main input form for collecting user data"""
     
@@ -47,83 +49,17 @@ class InputForm(tk.Frame):
         )
         subtitle.pack(pady=(0, 30), padx=20)
         
-        # Social Media
-        self._create_multi_select_section(
-            scrollable_frame,
-            "Which social media platforms do you use regularly?",
-            'social_media',
-            ['Facebook', 'Instagram', 'Twitter/X', 'TikTok', 'LinkedIn', 'Snapchat']
-        )
-        
-        # Devices
-        self._create_multi_select_section(
-            scrollable_frame,
-            "Which devices do you use?",
-            'devices',
-            ['Smartphone', 'Laptop', 'Tablet', 'Desktop', 'Smart TV', 'IoT Devices']
-        )
-        
-        # Password Questions
-        self._create_yes_no_section(
-            scrollable_frame,
-            "Do you reuse passwords across multiple accounts?",
-            'password_reuse'
-        )
-        
-        self._create_yes_no_section(
-            scrollable_frame,
-            "Do you use a password manager?",
-            'password_manager'
-        )
-        
-        # 2FA
-        self._create_yes_no_section(
-            scrollable_frame,
-            "Do you use Two-Factor Authentication (2FA) on important accounts?",
-            'two_factor'
-        )
-        
-        # Network
-        self._create_yes_no_section(
-            scrollable_frame,
-            "Do you regularly use public Wi-Fi?",
-            'public_wifi'
-        )
-        
-        self._create_yes_no_section(
-            scrollable_frame,
-            "Do you use a VPN?",
-            'vpn'
-        )
-        
-        # Updates
-        self._create_yes_no_section(
-            scrollable_frame,
-            "Do you regularly update your operating system and apps?",
-            'os_update'
-        )
-        
-        # Permissions
-        self._create_multi_select_section(
-            scrollable_frame,
-            "Which app permissions have you granted on your devices?",
-            'app_permissions',
-            ['Location', 'Contacts', 'Camera', 'Microphone', 'Storage', 'None']
-        )
-        
-        # Backup
-        self._create_yes_no_section(
-            scrollable_frame,
-            "Do you regularly backup your important data?",
-            'backup_data'
-        )
-        
-        # Email Encryption
-        self._create_yes_no_section(
-            scrollable_frame,
-            "Do you use email encryption for sensitive communications?",
-            'email_encryption'
-        )
+        # Questions, in form order, from data/questions.json
+        for question in get_question_set().for_frontend('tkinter'):
+            if question['type'] == 'yes_no':
+                self._create_yes_no_section(scrollable_frame, question['question'], question['key'])
+            else:
+                self._create_multi_select_section(
+                    scrollable_frame,
+                    question['question'],
+                    question['key'],
+                    question['options']
+                )
         
         # Pack canvas and scrollbar
         canvas.pack(side="left", fill="both", expand=True)
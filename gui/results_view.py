@@ -3,8 +3,10 @@ Results view for displaying recommendations
 """
 
 import tkinter as tk
+from datetime import datetime
 from tkinter import ttk, filedialog
-from src.utils import get_risk_color, format_report
+from src.report_writer import DEFAULT_WRITER
+from src.utils import get_risk_color
 
 class ResultsView(tk.Frame):
     """Results display view"""
@@ -309,15 +311,15 @@ class ResultsView(tk.Frame):
         )
         
         if filename:
-            report = format_report(
-                self.results['user_data'],
-                self.results['recommendations'],
-                self.results['risk_level'],
-                self.results['risk_score']
-            )
-            
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write(report)
+                DEFAULT_WRITER.write(
+                    f,
+                    self.results['user_data'],
+                    self.results['recommendations'],
+                    self.results['risk_level'],
+                    self.results['risk_score'],
+                    datetime.now()
+                )
             
             return True
         return False
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""Re-score stored assessments after editing clips/knowledge_base.clp.
+
+Pass the knowledge base and inference engine the history was scored with,
+e.g. from git:
+
+    git show HEAD~1:clips/knowledge_base.clp > old_kb.clp
+    git show HEAD~1:src/inference_engine.py > old_engine.py
+    python scripts/backfill_history.py history.db old_kb.clp --old-engine old_engine.py \
+        --population population.json
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.assessment_history import AssessmentHistory
+from src.kb_backfill import backfill
+from src.knowledge_base_mapper import ENGINE_PATH, KB_PATH
+from src.population_stats import PopulationAggregator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('history', help='SQLite history database')
+    parser.add_argument('old_kb', help='knowledge base the assessments were scored with')
+    parser.add_argument('--new-kb', default=KB_PATH, help='new knowledge base (default: the shipped one)')
+    parser.add_argument('--old-engine', default=ENGINE_PATH,
+                        help='inference_engine.py the assessments were scored with (default: the current one)')
+    parser.add_argument('--population', help='population aggregate file to adjust in place')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    population = None
+    if args.population and os.path.exists(args.population):
+        population = PopulationAggregator.load(args.population)
+
+    stats = backfill(AssessmentHistory(args.history), args.old_kb, args.new_kb,
+                     population=population, batch_size=args.batch_size, old_engine_path=args.old_engine)
+    if population is not None:
+        population.save(args.population)
+    print(f"Changed rules: {', '.join(stats['changed_rules']) or 'none'}")
+    print(f"Re-scored {stats['updated']} of {stats['selected']} selected assessments")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""Measure server CPU per follow-up interaction with and without fragments.
+
+Drives app.py with Streamlit's AppTest and an offline Gemini stub. Every
+session is taken to Step 3, then the sessions answer follow-up questions in
+round-robin order, so all of them stay open while the interactions are
+measured.
+
+- full reruns: PRIVACY_ADVISOR_FRAGMENTS=0. The CPU of each whole script run
+  is measured.
+- fragments: AppTest always reruns the whole script, so a fragment-scoped
+  rerun is measured as the CPU spent inside the follow-up fragment plus the
+  fixed cost of a run of an empty script.
+
+    python scripts/bench_fragments.py --sessions 50 --interactions 8
+"""
+import argparse
+import functools
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from src.gemini_pool import GEMINI_POOL
+from src.gemini_stub import FOLLOWUP_QUESTIONS, stub_factory
+
+APP = os.path.join(ROOT, "app.py")
+
+FRAGMENT_CPU = defaultdict(list)
+
+
+def _timed_fragment(real_fragment):
+    """st.fragment replacement recording the CPU time of every fragment call"""
+    def decorator(func=None, **kwargs):
+        if func is None:
+            return lambda f: decorator(f, **kwargs)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kw):
+            start = time.thread_time()
+            try:
+                return func(*args, **kw)
+            finally:
+                FRAGMENT_CPU[func.__name__].append(time.thread_time() - start)
+        return real_fragment(wrapper, **kwargs)
+    return decorator
+
+
+def _open_session(timeout):
+    at = AppTest.from_file(APP, default_timeout=timeout).run()
+    at.sidebar.text_input[0].input("bench-key").run()
+    at.text_area(key="issue_input").input("My email was in a breach and I reuse passwords").run()
+    at.button[0].click().run()
+    while not at.session_state.issue_classified:
+        # Classification runs on the job queue; poll until it lands
+        time.sleep(0.05)
+        at.run()
+    return at
+
+
+def _interact(at, step):
+    """Change one follow-up answer (cycling through the questions)"""
+    question = FOLLOWUP_QUESTIONS[step % len(FOLLOWUP_QUESTIONS)]
+    key = f"followup_{question['id']}"
+    if question["type"] == "yes_no":
+        at.radio(key=key).set_value("No" if step % 2 else "Yes")
+    elif question["type"] == "choice":
+        at.selectbox(key=key).set_value(question["options"][step % len(question["options"])])
+    else:
+        at.text_input(key=key).input(f"answer {step}")
+
+
+def _empty_run_cpu(runs, timeout):
+    at = AppTest.from_string("import streamlit as st", default_timeout=timeout)
+    samples = []
+    for _ in range(runs):
+        start = time.process_time()
+        at.run()
+        samples.append(time.process_time() - start)
+    return statistics.median(samples)
+
+
+def measure(fragments, sessions, interactions, timeout):
+    """CPU seconds per interaction for one mode"""
+    os.environ["PRIVACY_ADVISOR_FRAGMENTS"] = "1" if fragments else "0"
+    FRAGMENT_CPU.clear()
+    apps = [_open_session(timeout) for _ in range(sessions)]
+    samples = []
+    for step in range(interactions):
+        for at in apps:
+            _interact(at, step)
+            FRAGMENT_CPU["render_followup_form"].clear()
+            start = time.process_time()
+            at.run()
+            elapsed = time.process_time() - start
+            if at.exception:
+                raise RuntimeError(at.exception[0].value)
+            samples.append(FRAGMENT_CPU["render_followup_form"][-1] if fragments else elapsed)
+    return samples
+
+
+def _summary(samples, overhead=0.0):
+    ordered = sorted(s + overhead for s in samples)
+    return {
+        "mean": statistics.fmean(ordered) * 1000,
+        "p50": ordered[len(ordered) // 2] * 1000,
+        "p95": ordered[int(len(ordered) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--interactions", type=int, default=8, help="answers changed per session")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    os.environ["PRIVACY_ADVISOR_WARMUP"] = "0"
+    GEMINI_POOL.factory = stub_factory()
+    st.fragment = _timed_fragment(st.fragment)
+
+    overhead = _empty_run_cpu(50, args.timeout)
+    full = _summary(measure(False, args.sessions, args.interactions, args.timeout))
+    scoped = _summary(measure(True, args.sessions, args.interactions, args.timeout), overhead)
+
+    total = args.sessions * args.interactions
+    print(f"{args.sessions} sessions, {total} interactions; empty-run overhead {overhead * 1000:.2f} ms")
+    print(f"{'mode':<14}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, row in (("full rerun", full), ("fragment", scoped)):
+        print(f"{name:<14}{row['mean']:>10.2f}{row['p50']:>10.2f}{row['p95']:>10.2f}")
+    print(f"CPU per interaction reduced {full['mean'] / scoped['mean']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare questions per session in goal-driven mode with the fixed interview.
+
+Simulates sessions with random profiles (each risky answer with probability
+--risky) and checks that the settled outcome matches a full assessment.
+
+    python scripts/bench_goal_questions.py --sessions 5000 --risky 0.5
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.goal_inference import GoalDrivenInference
+from src.inference_engine import InferenceEngine
+from src.utils import calculate_risk_level, sort_recommendations
+
+YES_NO = {
+    'password_reuse': 'yes', 'password_manager': 'no', 'two_factor': 'no', 'public_wifi': 'yes',
+    'vpn': 'no', 'os_update': 'no', 'backup_data': 'no', 'email_encryption': 'no',
+}
+LISTS = {
+    'app_permissions': ['Location', 'Contacts', 'Camera', 'Microphone', 'Storage'],
+    'social_media': ['Facebook', 'Instagram', 'Twitter/X', 'TikTok', 'LinkedIn', 'Snapchat'],
+}
+
+
+def random_profile(rng, risky):
+    profile = {}
+    for field, risky_answer in YES_NO.items():
+        safe_answer = 'no' if risky_answer == 'yes' else 'yes'
+        profile[field] = risky_answer if rng.random() < risky else safe_answer
+    for field, options in LISTS.items():
+        profile[field] = [option for option in options if rng.random() < risky * 0.8]
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=5000)
+    parser.add_argument('--risky', type=float, default=0.5, help='probability of each risky answer')
+    parser.add_argument('--top', type=int, default=3, help='top recommendations that must be settled')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    goal = GoalDrivenInference(top_n=args.top)
+    rng = random.Random(args.seed)
+    asked, mismatches = [], 0
+    for _ in range(args.sessions):
+        profile = random_profile(rng, args.risky)
+        answers = {}
+        while (field := goal.next_question(answers)) is not None:
+            answers[field] = profile[field]
+        asked.append(len(answers))
+
+        recommendations, risk_score = InferenceEngine().process(profile)
+        state = goal.status(answers)
+        top = [rec['rule'] for rec in sort_recommendations(recommendations)][:args.top]
+        if state['risk_level'] != calculate_risk_level(risk_score) or state['top_recommendations'] != top:
+            mismatches += 1
+
+    print(f"{args.sessions} sessions, risky answer probability {args.risky}, top {args.top} settled")
+    print(f"fixed interview:  {len(goal.questions)} questions")
+    print(f"goal-driven:      median {statistics.median(asked)}, mean {statistics.mean(asked):.2f}, "
+          f"max {max(asked)} questions")
+    print(f"outcome mismatches vs full assessment: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Micro-benchmark the Streamlit next-question lookup per rerun.
+
+Compares scanning every question and evaluating every condition (the lookup
+app.py used to do on each rerun) with the indexed QuestionGraph and the
+precomputed path table.
+
+    python scripts/bench_question_graph.py --sessions 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.question_graph import get_question_graph
+from src.question_paths import build_path_table
+
+
+def scan_next_questions(user_data):
+    graph = get_question_graph()
+    all_questions = graph.questions
+    if not user_data:
+        return list(graph.initial_questions)
+    next_questions = []
+    last_key = list(user_data)[-1]
+    follow_ups = all_questions.get(last_key, {}).get("follow_ups", {})
+    for key in follow_ups.get(user_data[last_key], []):
+        if key not in user_data:
+            next_questions.append(key)
+    for key, info in all_questions.items():
+        if key in user_data:
+            continue
+        depends_on = info.get("depends_on")
+        if depends_on is None or all(dep in user_data for dep in depends_on):
+            condition = info.get("condition")
+            if (condition is None or condition(user_data)) and key not in next_questions:
+                next_questions.append(key)
+    return next_questions[:1]
+
+
+def _interview_states(sessions, seed):
+    """Answer states seen on each rerun of simulated interviews"""
+    graph = get_question_graph()
+    rng = random.Random(seed)
+    states = []
+    for _ in range(sessions):
+        user_data = {}
+        while True:
+            states.append(dict(user_data))
+            keys = graph.next_questions(user_data)
+            if not keys:
+                break
+            key = rng.choice(keys) if not user_data else keys[0]
+            question = graph.questions[key]
+            if question["type"] == "yes_no":
+                user_data[key] = rng.choice(["yes", "no"])
+            elif question["type"] == "choice":
+                user_data[key] = rng.choice(question["options"])
+            else:
+                user_data[key] = "text"
+    return states
+
+
+def _time_per_call(lookup, states):
+    start = time.perf_counter()
+    for state in states:
+        lookup(state)
+    return (time.perf_counter() - start) / len(states)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    states = _interview_states(args.sessions, args.seed)
+    graph = get_question_graph()
+    before = _time_per_call(scan_next_questions, states)
+    after = _time_per_call(graph.next_questions, states)
+    print(f"{len(states)} reruns over {args.sessions} interviews")
+    print(f"full scan:      {before * 1e6:8.2f} us/rerun")
+    print(f"indexed graph:  {after * 1e6:8.2f} us/rerun ({before / after:.1f}x faster)")
+    table = build_path_table()
+    lookup = _time_per_call(table.next_questions, states)
+    print(f"path table:     {lookup * 1e6:8.2f} us/rerun ({before / lookup:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Compare the shared-dictionary report archive with per-report gzip.
+
+Generates random assessments, renders them with format_report and reports
+total storage size and per-report decode latency for both approaches:
+
+    python scripts/bench_report_archive.py --reports 5000
+"""
+import argparse
+import gzip
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.app_controller import AppController
+from src.report_archive import ReportArchive
+from src.utils import format_report
+
+YES_NO_FIELDS = ['password_reuse', 'password_manager', 'two_factor', 'public_wifi',
+                 'vpn', 'os_update', 'backup_data', 'email_encryption']
+PLATFORMS = ['Facebook', 'Instagram', 'Twitter', 'TikTok', 'LinkedIn', 'Snapchat']
+DEVICES = ['Smartphone', 'Laptop', 'Tablet', 'Desktop']
+
+
+def random_report(rng):
+    controller = AppController()
+    for field in YES_NO_FIELDS:
+        controller.update_input(field, rng.choice(['yes', 'no']))
+    controller.update_input('social_media', rng.sample(PLATFORMS, rng.randint(0, len(PLATFORMS))))
+    controller.update_input('devices', rng.sample(DEVICES, rng.randint(1, len(DEVICES))))
+    results = controller.run_analysis()
+    return format_report(results['user_data'], results['recommendations'],
+                         results['risk_level'], results['risk_score'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reports', type=int, default=5000)
+    parser.add_argument('--train', type=int, default=200, help='reports used to train the dictionary')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    reports = [random_report(rng) for _ in range(args.reports)]
+    raw_size = sum(len(r.encode('utf-8')) for r in reports)
+
+    gzipped = [gzip.compress(r.encode('utf-8')) for r in reports]
+    start = time.perf_counter()
+    for blob in gzipped:
+        gzip.decompress(blob).decode('utf-8')
+    gzip_decode = (time.perf_counter() - start) / len(reports)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = ReportArchive.create(os.path.join(tmp, 'archive'), reports[:args.train])
+        start = time.perf_counter()
+        archive.append_many((str(i), r) for i, r in enumerate(reports))
+        append_time = time.perf_counter() - start
+
+        ids = archive.ids()
+        rng.shuffle(ids)
+        start = time.perf_counter()
+        for report_id in ids:
+            archive.get(report_id)
+        archive_decode = (time.perf_counter() - start) / len(ids)
+        archive_size = archive.stored_size() + len(archive.dictionary)
+        archive.close()
+
+    print(f"{args.reports} reports, {raw_size / 1024:.0f} KiB uncompressed")
+    print(f"{'method':<22}{'size (KiB)':>12}{'bytes/report':>14}{'decode (us)':>13}")
+    print(f"{'gzip per report':<22}{sum(map(len, gzipped)) / 1024:>12.1f}"
+          f"{sum(map(len, gzipped)) / len(reports):>14.0f}{gzip_decode * 1e6:>13.1f}")
+    print(f"{'shared dictionary':<22}{archive_size / 1024:>12.1f}"
+          f"{archive_size / len(reports):>14.0f}{archive_decode * 1e6:>13.1f}")
+    print(f"bulk append: {append_time:.2f}s ({args.reports / append_time:.0f} reports/s)")
+
+
+if __name__ == '__main__':
+    main()
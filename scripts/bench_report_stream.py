@@ -0,0 +1,112 @@
+"""Measure time to first report content and total time, streamed vs blocking.
+
+Uses the offline Gemini stub (src/gemini_stub.py): a blocking request
+returns after --latency seconds, and a streamed one sends its first chunk
+after STREAM_FIRST_CHUNK of that and the rest spread over the remainder.
+
+- classifier: IssueClassifier.generate_report against stream_report; first
+  content is the first partial report (the analysis paragraph).
+- page: app.py driven by AppTest from the "Generate Detailed Report" click,
+  rerun every --poll seconds as the status fragment would, until the
+  analysis is on the page and until the report is complete.
+  PRIVACY_ADVISOR_STREAM=0 is the blocking path.
+
+    python scripts/bench_report_stream.py --latency 2.0 --runs 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+from src.gemini_pool import GEMINI_POOL, GeminiClientPool
+from src.gemini_stub import CLASSIFICATION, REPORT, StubModel, stub_factory
+from src.issue_classifier import IssueClassifier
+from src.report_cache import REPORT_CACHE
+
+APP = os.path.join(ROOT, "app.py")
+
+
+def classifier_run(latency, streamed):
+    """(seconds to first content, total seconds) for one report"""
+    model = StubModel(latency=latency)
+    classifier = IssueClassifier("bench-key", pool=GeminiClientPool(factory=lambda key, name: model))
+    issue_data = {"user_issue": "breach", "classification": CLASSIFICATION, "followup_answers": {"q1": "No"}}
+    start = time.perf_counter()
+    if not streamed:
+        classifier.generate_report(issue_data)
+        total = time.perf_counter() - start
+        return total, total
+    first = None
+    for _ in classifier.stream_report(issue_data):
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def page_run(index, streamed, poll, timeout):
+    """(seconds to the analysis on the page, seconds to the full report) for one session"""
+    os.environ["PRIVACY_ADVISOR_STREAM"] = "1" if streamed else "0"
+    at = AppTest.from_file(APP, default_timeout=timeout).run()
+    at.sidebar.text_input[0].input("bench-key").run()
+    at.text_area(key="issue_input").input(f"My email was in a breach ({index}, {streamed})").run()
+    at.button[0].click().run()
+    while not at.session_state.issue_classified:
+        time.sleep(poll)
+        at.run()
+    generate = next(b for b in at.button if "Generate" in b.label)
+    start = time.perf_counter()
+    generate.click().run()
+    first = None
+    while True:
+        if first is None and REPORT["analysis"] in [m.value for m in at.markdown]:
+            first = time.perf_counter() - start
+        if at.session_state.final_report is not None:
+            break
+        if time.perf_counter() - start > timeout:
+            raise RuntimeError("report did not finish")
+        time.sleep(poll)
+        at.run()
+    total = time.perf_counter() - start
+    return first if first is not None else total, total
+
+
+def _row(name, samples):
+    firsts, totals = zip(*samples)
+    print(f"  {name:<10} first content p50 {statistics.median(firsts) * 1000:6.0f} ms   "
+          f"total p50 {statistics.median(totals) * 1000:6.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=2.0, help="simulated seconds per report request")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--poll", type=float, default=0.02, help="seconds between page reruns while waiting")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    os.environ["PRIVACY_ADVISOR_WARMUP"] = "0"
+    os.environ["PRIVACY_ADVISOR_SPECULATE"] = "0"
+
+    print("classifier:")
+    for name, streamed in (("blocking", False), ("streamed", True)):
+        _row(name, [classifier_run(args.latency, streamed) for _ in range(args.runs)])
+
+    GEMINI_POOL.factory = stub_factory(args.latency)
+    print("page:")
+    for name, streamed in (("blocking", False), ("streamed", True)):
+        samples = []
+        for index in range(args.runs):
+            GEMINI_POOL.clear()
+            REPORT_CACHE.clear()
+            samples.append(page_run(index, streamed, args.poll, args.timeout))
+        _row(name, samples)
+
+
+if __name__ == "__main__":
+    main()
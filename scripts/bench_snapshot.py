@@ -0,0 +1,82 @@
+"""Measure session snapshot size and write cost (src/session_snapshot.py).
+
+Builds a Step 4 session from the offline Gemini stub's classification,
+follow-ups and report, then times encode_snapshot and SessionSnapshots.save
+against a temporary database. Pickled and plain-JSON sizes are listed for
+comparison.
+
+    python scripts/bench_snapshot.py --writes 2000
+"""
+import argparse
+import json
+import os
+import pickle
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.gemini_stub import CLASSIFICATION, FOLLOWUP_QUESTIONS, REPORT
+from src.session_snapshot import SNAPSHOT_FIELDS, SessionSnapshots, encode_snapshot, new_token
+
+
+def step4_state():
+    """Session state of a user looking at their report"""
+    return {
+        "user_issue": "My email showed up in a data breach and I reuse that password on several sites",
+        "issue_classified": True,
+        "issue_classification": dict(CLASSIFICATION),
+        "followup_questions": list(FOLLOWUP_QUESTIONS),
+        "followup_answers": {"q1": "Yes", "q2": "No", "q3": "3-5", "q4": "none that I noticed"},
+        "report_generated": True,
+        "final_report": dict(REPORT),
+        "final_report_key": "0" * 64,
+    }
+
+
+def _us(samples):
+    ordered = sorted(samples)
+    return (f"p50 {statistics.median(ordered) * 1e6:.0f} us, "
+            f"p95 {ordered[int(len(ordered) * 0.95) - 1] * 1e6:.0f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writes", type=int, default=2000, help="snapshot writes to time")
+    args = parser.parse_args()
+
+    state = step4_state()
+    fields = {field: state[field] for field in SNAPSHOT_FIELDS}
+    print(f"pickle {len(pickle.dumps(fields))} B, json {len(json.dumps(fields).encode())} B, "
+          f"snapshot {len(encode_snapshot(state))} B")
+
+    encode = []
+    for _ in range(args.writes):
+        start = time.perf_counter()
+        encode_snapshot(state)
+        encode.append(time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SessionSnapshots(os.path.join(tmp, "snapshots.db"))
+        tokens = [new_token() for _ in range(max(args.writes // 4, 1))]
+        save = []
+        for i in range(args.writes):
+            start = time.perf_counter()
+            store.save(tokens[i % len(tokens)], state)
+            save.append(time.perf_counter() - start)
+        load = []
+        for token in tokens:
+            start = time.perf_counter()
+            store.load(token)
+            load.append(time.perf_counter() - start)
+        store.close()
+
+    print(f"encode: {_us(encode)}")
+    print(f"encode + save: {_us(save)}")
+    print(f"load: {_us(load)}")
+
+
+if __name__ == "__main__":
+    main()
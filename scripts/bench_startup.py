@@ -0,0 +1,79 @@
+"""Report cold-start import time per entry point (python -X importtime).
+
+Each entry point runs in a fresh interpreter with -X importtime. The report
+gives its wall time, total import time and the top-level imports that cost
+the most (cumulative time, children included). Streamlit pages are executed
+with runpy in bare mode, so their module-level imports and calls run but
+main() does not. The last section times the background warm-up steps
+(src/warmup.py), i.e. the first-use cost it moves off the first request.
+
+    python scripts/bench_startup.py --top 8
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = {
+    "cli --help": ["-m", "src.main", "--help"],
+    "app.py": ["-c", "import runpy; runpy.run_path('app.py')"],
+    "chatbot.py": ["-c", "import runpy; runpy.run_path('chatbot.py')"],
+}
+
+WARMUP = "import json; from src.warmup import warm_up; print(json.dumps(warm_up()))"
+
+
+def parse_importtime(stderr):
+    """
+    Parse -X importtime output.
+
+    Returns:
+        List of (module, self_us, cumulative_us, depth)
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative), depth))
+    return rows
+
+
+def profile(argv):
+    """Run one entry point with -X importtime; returns (wall seconds, rows)"""
+    env = dict(os.environ, PYTHONPATH=ROOT, PRIVACY_ADVISOR_WARMUP="0")
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", *argv], cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    return wall, parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=8, help="top-level imports listed per entry point")
+    args = parser.parse_args()
+
+    for name, argv in ENTRY_POINTS.items():
+        wall, rows = profile(argv)
+        total = sum(row[1] for row in rows)
+        print(f"\n{name}: wall {wall * 1000:.0f} ms, imports {total / 1000:.0f} ms ({len(rows)} modules)")
+        roots = sorted((row for row in rows if row[3] == 0), key=lambda row: -row[2])
+        for module, _, cumulative, _ in roots[:args.top]:
+            print(f"  {cumulative / 1000:9.1f} ms  {module}")
+
+    result = subprocess.run([sys.executable, "-c", WARMUP], cwd=ROOT, capture_output=True, text=True,
+                            env=dict(os.environ, PYTHONPATH=ROOT))
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    print("\nwarm-up steps (moved off the first request):")
+    for step, seconds in timings.items():
+        print(f"  {seconds * 1000:9.1f} ms  {step}")
+
+
+if __name__ == "__main__":
+    main()
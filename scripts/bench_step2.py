@@ -0,0 +1,75 @@
+"""Measure end-to-end Step 2 latency: one combined Gemini request vs two.
+
+Drives app.py with Streamlit's AppTest against the offline Gemini stub
+(src/gemini_stub.py) with a simulated latency per request. Each sample runs
+from the "Analyze" click until the page shows the follow-up questions; the
+page is rerun every --poll seconds while the classification job runs, as
+the status fragment would. The two-request mode is
+PRIVACY_ADVISOR_SINGLE_REQUEST=0.
+
+    python scripts/bench_step2.py --latency 1.0 --sessions 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+from src.gemini_pool import GEMINI_POOL
+from src.gemini_stub import stub_factory
+
+APP = os.path.join(ROOT, "app.py")
+
+
+def step2_seconds(index, poll, timeout):
+    """Seconds from the Analyze click to the follow-up form for one new session"""
+    at = AppTest.from_file(APP, default_timeout=timeout).run()
+    at.sidebar.text_input[0].input("bench-key").run()
+    at.text_area(key="issue_input").input(f"My email was in a breach and I reuse passwords ({index})").run()
+    start = time.perf_counter()
+    at.button[0].click().run()
+    while not at.session_state.issue_classified:
+        if time.perf_counter() - start > timeout:
+            raise RuntimeError("classification did not finish")
+        time.sleep(poll)
+        at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception or not at.session_state.followup_questions:
+        raise RuntimeError("Step 2 did not produce follow-up questions")
+    return elapsed
+
+
+def measure(single_request, sessions, poll, timeout):
+    os.environ["PRIVACY_ADVISOR_SINGLE_REQUEST"] = "1" if single_request else "0"
+    return [step2_seconds(i, poll, timeout) for i in range(sessions)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=1.0, help="simulated seconds per Gemini request")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--poll", type=float, default=0.02, help="seconds between reruns while waiting")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    os.environ["PRIVACY_ADVISOR_WARMUP"] = "0"
+    os.environ["PRIVACY_ADVISOR_SPECULATE"] = "0"
+    GEMINI_POOL.factory = stub_factory(args.latency)
+
+    results = {}
+    for name, single in (("two requests", False), ("one request", True)):
+        samples = sorted(measure(single, args.sessions, args.poll, args.timeout))
+        results[name] = samples
+        print(f"{name:<13} p50 {statistics.median(samples) * 1000:7.0f} ms   "
+              f"max {samples[-1] * 1000:7.0f} ms")
+    saved = statistics.median(results["two requests"]) - statistics.median(results["one request"])
+    print(f"Step 2 is {saved * 1000:.0f} ms faster at {args.latency:.2f} s per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Precompute the Streamlit next-question table from data/questions.json.
+
+Rerun after editing the question file; the app ignores a table built from
+other question content and falls back to the question graph.
+
+    python scripts/build_question_paths.py
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.question_paths import PATHS_PATH, build_path_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', default=PATHS_PATH, help='table file (default: data/question_paths.bin)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = build_path_table()
+    table.save(args.out)
+    report = table.report
+    print(f"{report['states']} states in {time.perf_counter() - start:.2f}s -> {args.out} "
+          f"({os.path.getsize(args.out) // 1024} KiB)")
+    print(f"Longest interview: {report['longest_path']} questions")
+    print(f"Dead ends: {report['dead_ends']}")
+    for questions in report['blocked_questions']:
+        print(f"  blocked: {', '.join(questions)}")
+    print(f"Unreachable questions: {', '.join(report['unreachable']) or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
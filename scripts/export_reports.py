@@ -0,0 +1,48 @@
+"""Render a JSON Lines file of user profiles to reports in bulk.
+
+Each input line is a user_data dict (optionally with an "id"). Example:
+
+    python scripts/export_reports.py profiles.jsonl --archive reports.zip --format text --format html
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.app_controller import AppController
+from src.report_export import FORMATS, export_reports
+
+
+def _assessments(path):
+    with open(path, encoding='utf-8') as f:
+        for idx, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            profile = json.loads(line)
+            controller = AppController()
+            for field, value in profile.items():
+                if field != 'id':
+                    controller.update_input(field, value)
+            yield dict(controller.run_analysis(), id=profile.get('id', idx))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('profiles', help='JSON Lines file of user profiles')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--out-dir', help='write one file per report')
+    target.add_argument('--archive', help='write every report into this zip file')
+    parser.add_argument('--format', dest='formats', action='append', choices=FORMATS,
+                        help='output format (repeatable, default: text)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes')
+    args = parser.parse_args()
+
+    names = export_reports(_assessments(args.profiles), out_dir=args.out_dir, archive=args.archive,
+                           formats=tuple(args.formats or ('text',)), workers=args.workers)
+    print(f'Wrote {len(names)} reports')
+
+
+if __name__ == '__main__':
+    main()
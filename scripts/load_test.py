@@ -0,0 +1,83 @@
+"""Load-test app.py with concurrent simulated users (offline, Gemini stubbed).
+
+Ramps through increasing numbers of concurrent sessions, each taking the
+full flow (describe, classify, follow-ups, report), and prints per-rerun
+latency percentiles, CPU and memory per session, throughput and the
+saturation point. Classification and reports run on the app's job queue;
+--workers sets its size (PRIVACY_ADVISOR_JOB_WORKERS). See
+src/load_harness.py.
+
+    python scripts/load_test.py --levels 1 2 4 8 16 32 --latency 0.5 --slo 2
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.load_harness import LoadHarness
+
+
+def _mib(value):
+    return "-" if value is None else f"{value / 2 ** 20:.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32],
+                        help="concurrent sessions per level")
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated seconds per Gemini request")
+    parser.add_argument("--think-time", type=float, default=0.0, help="seconds between user interactions")
+    parser.add_argument("--slo", type=float, default=2.0, help="p95 rerun latency budget (seconds)")
+    parser.add_argument("--workers", type=int, default=None, help="job queue workers (default: app default)")
+    parser.add_argument("--poll", type=float, default=0.1, help="seconds between reruns while a job is pending")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="measure Python heap per session with tracemalloc (slows reruns)")
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = parser.parse_args()
+
+    # Measure the app itself, not the background warm-up
+    os.environ["PRIVACY_ADVISOR_WARMUP"] = "0"
+    if args.workers is not None:
+        # Read when src.job_queue is first imported (by the first session)
+        os.environ["PRIVACY_ADVISOR_JOB_WORKERS"] = str(args.workers)
+    harness = LoadHarness(latency=args.latency, think_time=args.think_time, seed=args.seed,
+                          trace_memory=args.trace_memory, poll_interval=args.poll)
+    result = harness.ramp(args.levels, slo=args.slo)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"{'sessions':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'cpu s/sess':>10} "
+          f"{'MiB/sess':>9} {'heap MiB':>9} {'sess/s':>7} {'reruns/s':>9}")
+    for level in result["levels"]:
+        print(f"{level['sessions']:>8} {level['p50'] * 1000:>8.0f} {level['p95'] * 1000:>8.0f} "
+              f"{level['p99'] * 1000:>8.0f} {level['cpu_seconds_per_session']:>10.3f} "
+              f"{level['rss_bytes_per_session'] / 2 ** 20:>9.2f} "
+              f"{_mib(level['heap_bytes_per_session']):>9} {level['sessions_per_second']:>7.2f} "
+              f"{level['reruns_per_second']:>9.1f}")
+    last = result["levels"][-1]
+    print("per-step p50/p95 ms at", last["sessions"], "sessions:",
+          ", ".join(f"{step} {v['p50'] * 1000:.0f}/{v['p95'] * 1000:.0f}" for step, v in last["per_step"].items()))
+    print("perceived wait p50/p95 ms:",
+          ", ".join(f"{step} {v['p50'] * 1000:.0f}/{v['p95'] * 1000:.0f}" for step, v in last["wait"].items()))
+    jobs = last["jobs"]
+    print(f"job queue: {jobs['max_workers']} workers, max depth {jobs['max_queue_depth']}, "
+          f"mean wait {jobs['wait_seconds_mean'] * 1000:.0f} ms, mean run {jobs['run_seconds_mean'] * 1000:.0f} ms")
+    speculation = last["speculation"]
+    print(f"speculative reports: {speculation['hits']}/{speculation['reports']} hits, "
+          f"{speculation['cancelled']} cancelled, {speculation['saved_seconds_mean'] * 1000:.0f} ms saved per hit")
+    for error in last["errors"][:3]:
+        print("error:", error)
+    if result["saturation"] is None:
+        print(f"saturated immediately: {result['reason']}")
+    elif result["reason"]:
+        print(f"saturation point: {result['saturation']} concurrent sessions ({result['reason']})")
+    else:
+        print(f"no saturation up to {result['saturation']} concurrent sessions")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,18 +9,67 @@ from src.output_handler import OutputHandler
 class AppController:
     """Main application controller"""
     
-    def __init__(self):
+    def __init__(self, results_store=None, population=None, history=None, user_id=None):
+        """
+        Args:
+            results_store (ResultsStore): Optional store that every analysis
+                result is appended to
+            population (PopulationAggregator): Optional aggregator that every
+                analysis result is counted in
+            history (AssessmentHistory): Optional per-user history that every
+                analysis result is saved to
+            user_id (str): User the history entries belong to; anonymous
+                analyses (no user id) are not saved to the history
+        """
         self.input_handler = InputHandler()
         self.inference_engine = InferenceEngine()
         self.output_handler = OutputHandler()
+        self.results_store = results_store
+        self.population = population
+        self.history = history
+        self.user_id = user_id
+        self.last_assessment_id = None
+        self.goal = None
+        self.answered = set()
     
     def update_input(self, field, value):
         """Update a single input field"""
         self.input_handler.update_field(field, value)
+        self.answered.add(field)
     
     def toggle_multi_input(self, field, value):
         """Toggle a multi-select input"""
         self.input_handler.toggle_multi_select(field, value)
+        self.answered.add(field)
+    
+    def _answered_data(self):
+        data = self.input_handler.get_data()
+        return {field: data[field] for field in self.answered if field in data}
+    
+    def goal_status(self):
+        """
+        Bounds on the outcome of the answers given so far
+        
+        Returns:
+            dict: See GoalDrivenInference.status
+        """
+        if self.goal is None:
+            from src.goal_inference import GoalDrivenInference
+            self.goal = GoalDrivenInference()
+        return self.goal.status(self._answered_data())
+    
+    def next_goal_question(self):
+        """
+        Next question worth asking in goal-driven mode
+        
+        Returns:
+            str: Field to ask, or None once the risk level and top
+            recommendations can no longer change
+        """
+        if self.goal is None:
+            from src.goal_inference import GoalDrivenInference
+            self.goal = GoalDrivenInference()
+        return self.goal.next_question(self._answered_data())
     
     def validate_inputs(self):
         """Validate all inputs"""
@@ -37,14 +86,50 @@ class AppController:
         recommendations, risk_score = self.inference_engine.process(user_data)
         sorted_recs, risk_level = self.output_handler.process_results(recommendations, risk_score)
         
-        return {
+        results = {
             'recommendations': sorted_recs,
             'risk_level': risk_level,
             'risk_score': risk_score,
             'stats': self.output_handler.get_summary_stats(),
             'user_data': user_data
         }
+        
+        if self.results_store is not None:
+            self.results_store.append(results)
+        if self.population is not None:
+            self.population.observe(results)
+        if self.history is not None and self.user_id is not None:
+            self.last_assessment_id = self.history.record(self.user_id, results)
+        
+        return results
+    
+    def changes_since_last(self):
+        """
+        Compare the user's latest assessment with the one before it
+        
+        Returns:
+            dict: Rule-level diff (see AssessmentHistory.diff), or None
+        """
+        if self.history is None or self.user_id is None:
+            return None
+        return self.history.diff_latest(self.user_id)
+    
+    def save_to_group(self, group, member_id):
+        """
+        Run the analysis and store the result as a member of a group
+        
+        Args:
+            group (GroupAssessment): Group to add the member to
+            member_id (str): Member identifier
+            
+        Returns:
+            dict: Analysis results
+        """
+        results = self.run_analysis()
+        group.set_member_result(member_id, results)
+        return results
     
     def reset(self):
         """Reset the controller"""
         self.input_handler.reset()
+        self.answered = set()
@@ -0,0 +1,301 @@
+"""
+Assessment history stored in a local SQLite database
+
+Every assessment is saved with its profile, the knowledge base version it
+was scored with and its result (risk score, level, rule-hit bitmap and
+recommendations). "What changed since last time" is answered from the
+stored rule-hit bitmaps and profiles, without re-running old assessments.
+
+The database runs in WAL mode so readers never block the writer, each
+thread gets its own connection, and record_many inserts a whole batch in
+one transaction, which lets several workers share one database file.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+from src.inference_engine import RULE_IDS, rule_hit_mask
+from src.knowledge_base_mapper import current_kb_version
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    kb_version TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    risk_score INTEGER NOT NULL,
+    risk_level TEXT NOT NULL,
+    rule_hits INTEGER NOT NULL,
+    recommendations TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assessments_user_time ON assessments (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_assessments_time ON assessments (created_at);
+"""
+
+_COLUMNS = ('id', 'user_id', 'created_at', 'kb_version', 'profile',
+            'risk_score', 'risk_level', 'rule_hits', 'recommendations')
+
+_INSERT = (
+    "INSERT INTO assessments (user_id, created_at, kb_version, profile, risk_score, "
+    "risk_level, rule_hits, recommendations) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Seconds a writer waits for the database lock before giving up
+BUSY_TIMEOUT = 30
+
+
+def rules_in_mask(mask):
+    """
+    Decode a rule-hit bitmask
+
+    Args:
+        mask (int): Bitmask from inference_engine.rule_hit_mask
+
+    Returns:
+        list: Rule ids, in RULE_IDS order
+    """
+    return [rule for idx, rule in enumerate(RULE_IDS) if mask >> idx & 1]
+
+
+class AssessmentHistory:
+    """SQLite-backed history of assessments per user"""
+
+    def __init__(self, path):
+        """
+        Open (or create) a history database
+
+        Args:
+            path (str): SQLite database file
+        """
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # With WAL, NORMAL only risks the last transactions on power loss,
+            # never corruption, and avoids an fsync per commit.
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @staticmethod
+    def _row_values(user_id, results, created_at, kb_version):
+        if user_id is None:
+            raise ValueError("Assessments need a user id to be recorded in the history")
+        return (
+            str(user_id),
+            time.time() if created_at is None else created_at,
+            kb_version or current_kb_version(),
+            json.dumps(results.get('user_data', {}), separators=(',', ':')),
+            int(results['risk_score']),
+            results['risk_level'],
+            rule_hit_mask(results['recommendations']),
+            json.dumps(results['recommendations'], separators=(',', ':')),
+        )
+
+    def record(self, user_id, results, created_at=None, kb_version=None):
+        """
+        Save one assessment
+
+        Args:
+            user_id (str): User the assessment belongs to
+            results (dict): Result from AppController.run_analysis
+            created_at (float): Unix time; defaults to now
+            kb_version (str): Knowledge base version; defaults to the current one
+
+        Returns:
+            int: Assessment id
+
+        Raises:
+            ValueError: If user_id is None
+        """
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(_INSERT, self._row_values(user_id, results, created_at, kb_version))
+        return cursor.lastrowid
+
+    def record_many(self, entries):
+        """
+        Save a batch of assessments in a single transaction
+
+        Args:
+            entries (iterable): (user_id, results) or
+                (user_id, results, created_at) tuples
+
+        Returns:
+            int: Number of assessments saved
+        """
+        rows = [
+            self._row_values(entry[0], entry[1], entry[2] if len(entry) > 2 else None, None)
+            for entry in entries
+        ]
+        conn = self._connection()
+        with conn:
+            conn.executemany(_INSERT, rows)
+        return len(rows)
+
+    def count(self, user_id=None):
+        """Number of stored assessments, optionally for one user"""
+        if user_id is None:
+            query, params = "SELECT COUNT(*) FROM assessments", ()
+        else:
+            query, params = "SELECT COUNT(*) FROM assessments WHERE user_id = ?", (str(user_id),)
+        return self._connection().execute(query, params).fetchone()[0]
+
+    @staticmethod
+    def _to_dict(row):
+        record = dict(zip(_COLUMNS, row))
+        record['profile'] = json.loads(record['profile'])
+        record['recommendations'] = json.loads(record['recommendations'])
+        return record
+
+    def get(self, assessment_id):
+        """
+        Load one assessment
+
+        Returns:
+            dict: Stored assessment, or None if it does not exist
+        """
+        row = self._connection().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM assessments WHERE id = ?", (assessment_id,)
+        ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def history(self, user_id, limit=20):
+        """
+        Most recent assessments of a user
+
+        Args:
+            user_id (str): User identifier
+            limit (int): Maximum number of assessments
+
+        Returns:
+            list: Stored assessments, newest first
+        """
+        rows = self._connection().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM assessments WHERE user_id = ? "
+            "ORDER BY created_at DESC, id DESC LIMIT ?",
+            (str(user_id), limit),
+        ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def iter_where(self, condition, params=(), batch_size=1000):
+        """
+        Stream assessments matching an SQL condition in id order
+
+        Args:
+            condition (str): WHERE clause over the assessments columns
+            params (tuple): Parameters for the clause
+            batch_size (int): Rows fetched per query
+
+        Yields:
+            list: Batches of stored assessments
+        """
+        conn = self._connection()
+        query = (f"SELECT {', '.join(_COLUMNS)} FROM assessments "
+                 f"WHERE id > ? AND ({condition}) ORDER BY id LIMIT ?")
+        last_id = 0
+        while True:
+            rows = conn.execute(query, (last_id, *params, batch_size)).fetchall()
+            if not rows:
+                return
+            yield [self._to_dict(row) for row in rows]
+            last_id = rows[-1]['id']
+
+    def update_results(self, updates):
+        """
+        Overwrite the results of stored assessments in one transaction
+
+        Args:
+            updates (iterable): (id, risk_score, risk_level, rule_hits,
+                recommendations, kb_version) tuples
+
+        Returns:
+            int: Number of assessments updated
+        """
+        rows = [
+            (score, level, hits, json.dumps(recs, separators=(',', ':')), version, assessment_id)
+            for assessment_id, score, level, hits, recs, version in updates
+        ]
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "UPDATE assessments SET risk_score = ?, risk_level = ?, rule_hits = ?, "
+                "recommendations = ?, kb_version = ? WHERE id = ?",
+                rows,
+            )
+        return len(rows)
+
+    def relabel_kb_version(self, old_version, new_version):
+        """
+        Mark assessments scored with one KB version as scored with another
+
+        Returns:
+            int: Number of assessments relabelled
+        """
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                "UPDATE assessments SET kb_version = ? WHERE kb_version = ?",
+                (new_version, old_version),
+            )
+        return cursor.rowcount
+
+    def diff(self, previous, current):
+        """
+        Rule-level difference between two stored assessments
+
+        Args:
+            previous (dict): Older assessment (from get/history)
+            current (dict): Newer assessment
+
+        Returns:
+            dict: Score and level change, rules that started or stopped
+            firing and the answers that changed
+        """
+        old_hits, new_hits = previous['rule_hits'], current['rule_hits']
+        old_profile, new_profile = previous['profile'], current['profile']
+        changed_answers = {
+            field: (old_profile.get(field), new_profile.get(field))
+            for field in sorted(set(old_profile) | set(new_profile))
+            if old_profile.get(field) != new_profile.get(field)
+        }
+        return {
+            'previous_id': previous['id'],
+            'current_id': current['id'],
+            'risk_score_change': current['risk_score'] - previous['risk_score'],
+            'risk_level': (previous['risk_level'], current['risk_level']),
+            'new_rules': rules_in_mask(new_hits & ~old_hits),
+            'resolved_rules': rules_in_mask(old_hits & ~new_hits),
+            'unchanged_rules': rules_in_mask(old_hits & new_hits),
+            'changed_answers': changed_answers,
+            'kb_changed': previous['kb_version'] != current['kb_version'],
+        }
+
+    def diff_latest(self, user_id):
+        """
+        What changed between a user's two most recent assessments
+
+        Returns:
+            dict: See diff(); None if the user has fewer than two assessments
+        """
+        latest = self.history(user_id, limit=2)
+        if len(latest) < 2:
+            return None
+        return self.diff(latest[1], latest[0])
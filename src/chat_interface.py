@@ -5,81 +5,30 @@ Provides an interactive, conversational Q&A flow for privacy assessment.
 
 from typing import Dict, List, Any
 
+from src.output_handler import ResultsSummary
+from src.question_graph import get_question_set
+
 
 class ChatInterface:
     """Interactive chat-based interface for the privacy expert system."""
 
-    def __init__(self, inference_engine):
+    def __init__(self, inference_engine, goal_driven: bool = False):
         """
         Initialize the chat interface.
         
         Args:
             inference_engine: The inference engine (e.g., InferenceEngine from src/inference_engine.py)
+            goal_driven: Only ask questions that can still change the risk
+                level or the top recommendations (see src/goal_inference.py)
         """
         self.inference_engine = inference_engine
         self.user_data = {}
-        self.questions = [
-            {
-                "key": "password_reuse",
-                "question": "Do you reuse passwords across different accounts?",
-                "help": "(yes/no)",
-                "type": "yes_no"
-            },
-            {
-                "key": "password_manager",
-                "question": "Do you use a password manager to store your passwords?",
-                "help": "(yes/no)",
-                "type": "yes_no"
-            },
-            {
-                "key": "two_factor",
-                "question": "Do you have two-factor authentication (2FA) enabled on important accounts?",
-                "help": "(yes/no)",
-                "type": "yes_no"
-            },
-            {
-                "key": "public_wifi",
-                "question": "Do you connect to public Wi-Fi networks (cafes, airports, etc.)?",
-                "help": "(yes/no)",
-                "type": "yes_no"
-            },
-            {
-                "key": "vpn",
-                "question": "Do you use a VPN when accessing the internet?",
-                "help": "(yes/no)",
-                "type": "yes_no"
-            },
-            {
-                "key": "os_update",
-                "question": "Do you keep your operating system and apps up to date?",
-                "help": "(yes/no)",
-                "type": "yes_no"
-            },
-            {
-                "key": "backup_data",
-                "question": "Do you regularly back up your important data?",
-                "help": "(yes/no)",
-                "type": "yes_no"
-            },
-            {
-                "key": "email_encryption",
-                "question": "Do you use email encryption for sensitive communications?",
-                "help": "(yes/no)",
-                "type": "yes_no"
-            },
-            {
-                "key": "app_permissions",
-                "question": "List app permissions you grant (e.g., Location Contacts Camera Microphone) or type 'None':",
-                "help": "Enter space-separated permissions or 'None'",
-                "type": "multislot"
-            },
-            {
-                "key": "social_media",
-                "question": "List social media platforms you use (e.g., Facebook Instagram Twitter) or type 'None':",
-                "help": "Enter space-separated platform names or 'None'",
-                "type": "multislot"
-            }
-        ]
+        # Fixed interview order and wording from data/questions.json
+        self.questions = list(get_question_set().for_frontend("cli"))
+        self.goal = None
+        if goal_driven:
+            from src.goal_inference import GoalDrivenInference
+            self.goal = GoalDrivenInference(questions=[q_obj["key"] for q_obj in self.questions])
 
     def _parse_yes_no(self, response: str) -> str:
         """Parse yes/no response to lowercase."""
@@ -107,39 +56,23 @@ class ChatInterface:
         print("Please answer the following questions honestly.\n")
         print("(You can type 'quit' or 'exit' at any time to cancel.)\n")
 
-        for q_obj in self.questions:
-            key = q_obj["key"]
-            question = q_obj["question"]
-            q_type = q_obj["type"]
-            help_text = q_obj["help"]
-
-            while True:
-                print(f"\n[Q{self.questions.index(q_obj) + 1}/{len(self.questions)}] {question}")
-                print(f"  {help_text}")
-                response = input("You: ").strip()
-
-                # Allow early exit
-                if response.lower() in ("quit", "exit"):
-                    print("\nInterview cancelled. Goodbye!")
+        if self.goal is None:
+            for number, q_obj in enumerate(self.questions, 1):
+                if not self._ask(q_obj, f"Q{number}/{len(self.questions)}"):
                     return False
-
-                # Parse and validate
-                if q_type == "yes_no":
-                    parsed = self._parse_yes_no(response)
-                    if parsed is None:
-                        print("  ❌ Please enter 'yes' or 'no'.")
-                        continue
-                    self.user_data[key] = parsed
-                    print(f"  ✓ Got it: {parsed}")
-                    break
-                elif q_type == "multislot":
-                    parsed = self._parse_multislot(response)
-                    self.user_data[key] = parsed
-                    if parsed:
-                        print(f"  ✓ Got it: {', '.join(parsed)}")
-                    else:
-                        print(f"  ✓ Got it: (no items)")
+        else:
+            by_key = {q_obj["key"]: q_obj for q_obj in self.questions}
+            number = 0
+            while True:
+                key = self.goal.next_question(self.user_data)
+                if key is None or key not in by_key:
                     break
+                number += 1
+                if not self._ask(by_key[key], f"Q{number}"):
+                    return False
+            skipped = len(self.questions) - number
+            if skipped:
+                print(f"\n  ✓ Your answers already settle the result; skipped {skipped} question(s).")
 
         # Run inference
         print("\n" + "=" * 70)
@@ -152,6 +85,39 @@ class ChatInterface:
         self._display_results(recommendations, risk_score)
         return True
 
+    def _ask(self, q_obj: Dict[str, Any], label: str) -> bool:
+        """Ask one question until it gets a valid answer; False if the user quits."""
+        key = q_obj["key"]
+        q_type = q_obj["type"]
+
+        while True:
+            print(f"\n[{label}] {q_obj['question']}")
+            print(f"  {q_obj['help']}")
+            response = input("You: ").strip()
+
+            # Allow early exit
+            if response.lower() in ("quit", "exit"):
+                print("\nInterview cancelled. Goodbye!")
+                return False
+
+            # Parse and validate
+            if q_type == "yes_no":
+                parsed = self._parse_yes_no(response)
+                if parsed is None:
+                    print("  ❌ Please enter 'yes' or 'no'.")
+                    continue
+                self.user_data[key] = parsed
+                print(f"  ✓ Got it: {parsed}")
+                return True
+            elif q_type == "multislot":
+                parsed = self._parse_multislot(response)
+                self.user_data[key] = parsed
+                if parsed:
+                    print(f"  ✓ Got it: {', '.join(parsed)}")
+                else:
+                    print(f"  ✓ Got it: (no items)")
+                return True
+
     def _display_results(self, recommendations: List[Dict[str, Any]], risk_score: int):
         """Display recommendations in a friendly chat format."""
         if not recommendations:
@@ -159,33 +125,24 @@ class ChatInterface:
             print(f"Overall Risk Score: {risk_score}/100\n")
             return
 
-        # Sort by priority and risk score
-        priority_order = {"high": 0, "medium": 1, "low": 2}
-        sorted_recs = sorted(
-            recommendations,
-            key=lambda r: (priority_order.get(r["priority"], 3), -r["risk_score"])
-        )
-
-        # Categorize by priority
-        high_priority = [r for r in sorted_recs if r["priority"] == "high"]
-        medium_priority = [r for r in sorted_recs if r["priority"] == "medium"]
-        low_priority = [r for r in sorted_recs if r["priority"] == "low"]
+        # Group by priority, ordered by risk score within each group
+        summary = ResultsSummary(recommendations, risk_score)
 
         print(f"Overall Risk Score: {risk_score}/100\n")
 
-        if high_priority:
+        if summary.high:
             print("🔴 HIGH PRIORITY - Address these immediately:\n")
-            for i, rec in enumerate(high_priority, 1):
+            for i, rec in enumerate(summary.high, 1):
                 self._print_recommendation(rec, i)
 
-        if medium_priority:
+        if summary.medium:
             print("\n🟡 MEDIUM PRIORITY - Consider these improvements:\n")
-            for i, rec in enumerate(medium_priority, 1):
+            for i, rec in enumerate(summary.medium, 1):
                 self._print_recommendation(rec, i)
 
-        if low_priority:
+        if summary.low:
             print("\n🟢 LOW PRIORITY - Nice to have:\n")
-            for i, rec in enumerate(low_priority, 1):
+            for i, rec in enumerate(summary.low, 1):
                 self._print_recommendation(rec, i)
 
         print("\n" + "=" * 70)
@@ -0,0 +1,195 @@
+"""
+Process-wide pool of Gemini models keyed by API key and model name
+
+``genai.configure`` sets one global API key for the whole process, so two
+Streamlit sessions with different keys could send requests under each
+other's key, and calling it on every rerun rebuilds clients for nothing.
+The pool instead gives every (API key, model name) pair its own
+GenerativeModel bound to a private client, built once and reused across
+reruns and sessions. It holds at most ``max_size`` models (least recently
+used are dropped first), drops models idle for longer than ``idle_ttl``
+seconds, and counts hits, constructions and construction time.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_MAX_SIZE = 32
+DEFAULT_IDLE_TTL = 30 * 60
+
+
+def isolated_model(api_key: str, model_name: str) -> Any:
+    """
+    Build a GenerativeModel with its own client instead of the global one.
+
+    Args:
+        api_key: Gemini API key
+        model_name: Model name, e.g. "gemini-2.5-flash"
+
+    Returns:
+        google.generativeai.GenerativeModel bound to a private client
+    """
+    import google.generativeai as genai
+    from google.generativeai.client import _ClientManager
+
+    manager = _ClientManager()
+    manager.configure(api_key=api_key)
+    model = genai.GenerativeModel(model_name)
+    model._client = manager.make_client("generative")
+    return model
+
+
+def _key_id(api_key: str) -> str:
+    """Non-reversible identifier for an API key (safe to log); the full digest, so keys never collide"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("model", "last_used", "ready", "error")
+
+    def __init__(self):
+        self.model = None
+        self.last_used = 0.0
+        self.ready = threading.Event()
+        self.error = None
+
+
+class GeminiClientPool:
+    """Bounded LRU of isolated Gemini models with idle eviction and metrics."""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, idle_ttl: float = DEFAULT_IDLE_TTL,
+                 factory: Optional[Callable[[str, str], Any]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_size: Maximum number of models kept
+            idle_ttl: Seconds after which an unused model is dropped
+            factory: Builds a model from (api_key, model_name); defaults to
+                isolated_model (tests and load tests inject a stub)
+            clock: Monotonic time source
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.factory = factory or isolated_model
+        self.clock = clock
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "constructions": 0,
+            "construction_errors": 0,
+            "construction_seconds_total": 0.0,
+            "construction_seconds_max": 0.0,
+            "evicted_lru": 0,
+            "evicted_idle": 0,
+        }
+
+    def _evict_idle_locked(self, now: float):
+        expired = [key for key, entry in self._entries.items()
+                   if entry.ready.is_set() and now - entry.last_used > self.idle_ttl]
+        for key in expired:
+            del self._entries[key]
+        self._metrics["evicted_idle"] += len(expired)
+
+    def get(self, api_key: str, model_name: str) -> Any:
+        """
+        Model for an API key and model name, built on first use.
+
+        Concurrent callers asking for the same pair wait for a single
+        construction.
+
+        Raises:
+            ValueError: If api_key is empty
+            Exception: Whatever the factory raised (the failure is not cached)
+        """
+        if not api_key:
+            raise ValueError("An API key is required")
+        key = (_key_id(api_key), model_name)
+        with self._lock:
+            now = self.clock()
+            self._evict_idle_locked(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.last_used = now
+                self._metrics["hits"] += 1
+                owner = False
+            else:
+                entry = self._entries[key] = _Entry()
+                entry.last_used = now
+                self._metrics["misses"] += 1
+                owner = True
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self._metrics["evicted_lru"] += 1
+
+        if not owner:
+            entry.ready.wait()
+            if entry.error is not None:
+                raise entry.error
+            return entry.model
+
+        start = time.perf_counter()
+        try:
+            entry.model = self.factory(api_key, model_name)
+        except Exception as exc:
+            entry.error = exc
+            with self._lock:
+                self._metrics["construction_errors"] += 1
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            raise
+        finally:
+            entry.ready.set()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._metrics["constructions"] += 1
+            self._metrics["construction_seconds_total"] += elapsed
+            self._metrics["construction_seconds_max"] = max(self._metrics["construction_seconds_max"], elapsed)
+        return entry.model
+
+    def evict_idle(self) -> int:
+        """Drop models idle for longer than idle_ttl; returns how many were dropped."""
+        with self._lock:
+            before = len(self._entries)
+            self._evict_idle_locked(self.clock())
+            return before - len(self._entries)
+
+    def clear(self):
+        """Drop every model (metrics are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Pool metrics.
+
+        Returns:
+            Dict with size, hits, misses, constructions, construction errors,
+            total/mean/max construction seconds and LRU/idle evictions
+        """
+        with self._lock:
+            stats = dict(self._metrics, size=len(self._entries))
+        constructions = stats["constructions"]
+        stats["construction_seconds_mean"] = (
+            stats["construction_seconds_total"] / constructions if constructions else 0.0
+        )
+        return stats
+
+
+GEMINI_POOL = GeminiClientPool()
+
+
+def get_model(api_key: str, model_name: str) -> Any:
+    """Model from the process-wide pool."""
+    return GEMINI_POOL.get(api_key, model_name)
@@ -0,0 +1,126 @@
+"""
+Offline stand-in for Gemini models
+
+Benchmarks and load tests drive the Streamlit app without network access by
+installing ``stub_factory`` as the GEMINI_POOL factory. The stub answers the
+IssueClassifier prompts (classification, follow-up questions, both at once,
+report) with fixed, valid JSON after an optional simulated latency. Streamed
+requests get the same text in chunks: the first arrives after
+STREAM_FIRST_CHUNK of the latency and the rest are spread over the remainder,
+like a model generating tokens.
+"""
+
+import json
+import time
+from typing import Any, Callable, Dict, Iterator, List
+
+# Share of the latency before the first streamed chunk (time to first token)
+STREAM_FIRST_CHUNK = 0.3
+
+# Characters per streamed chunk
+STREAM_CHUNK_SIZE = 48
+
+CLASSIFICATION: Dict[str, Any] = {
+    "primary_category": "account_security",
+    "secondary_categories": ["password_security"],
+    "severity": "high",
+    "risk_level": 72,
+    "summary": "The user's email address appeared in a data breach and the same password is reused elsewhere.",
+    "key_concerns": ["Credential stuffing", "Password reuse", "Phishing follow-ups"],
+    "affected_areas": ["email", "online accounts"],
+}
+
+FOLLOWUP_QUESTIONS: List[Dict[str, Any]] = [
+    {"id": "q1", "question": "Do you reuse this password on other sites?", "type": "yes_no",
+     "context": "Reuse decides how many accounts are exposed", "slot": "password_reuse", "polarity": "positive"},
+    {"id": "q2", "question": "Is two-factor authentication enabled on your email?", "type": "yes_no",
+     "context": "2FA blocks most account takeovers", "slot": "two_factor", "polarity": "positive"},
+    {"id": "q3", "question": "Which devices do you read email on?", "type": "choice",
+     "options": ["Computer", "Mobile", "All devices", "Not sure"],
+     "context": "Device type affects security recommendations"},
+    {"id": "q4", "question": "Have you noticed any unexpected login alerts?", "type": "text",
+     "context": "Alerts suggest the account is already being probed"},
+]
+
+REPORT: Dict[str, Any] = {
+    "analysis": "Your email address was exposed in a breach. Because the password is reused, "
+                "attackers can try it on other services.",
+    "root_causes": ["Password reuse", "No second factor"],
+    "immediate_actions": [
+        {"priority": "high", "action": "Change the breached password", "why": "It is public now"},
+        {"priority": "high", "action": "Enable two-factor authentication", "why": "Stops credential stuffing"},
+    ],
+    "medium_term_steps": [
+        {"priority": "medium", "action": "Adopt a password manager", "why": "Unique passwords everywhere"},
+    ],
+    "tools_recommended": ["Bitwarden", "Have I Been Pwned"],
+    "timeline": "Today: change passwords and enable 2FA. This month: move to a password manager.",
+    "faq": [{"question": "Do I need a new email address?", "answer": "Usually not, once it is secured."}],
+}
+
+
+class StubResponse:
+    """Mimics the ``.text`` attribute of a Gemini response"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubModel:
+    """GenerativeModel replacement answering IssueClassifier prompts"""
+
+    def __init__(self, model_name: str = "stub", latency: float = 0.0):
+        """
+        Args:
+            model_name: Name reported by the stub
+            latency: Seconds to sleep per request (simulated API latency)
+        """
+        self.model_name = model_name
+        self.latency = latency
+        self.calls = 0
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        """Answer a prompt with the canned classification, questions or report (chunked when stream)."""
+        self.calls += 1
+        if stream:
+            return self._stream(self._answer(prompt))
+        if self.latency:
+            time.sleep(self.latency)
+        return StubResponse(self._answer(prompt))
+
+    def _stream(self, text: str) -> Iterator[StubResponse]:
+        chunks = [text[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(text), STREAM_CHUNK_SIZE)]
+        if self.latency:
+            time.sleep(self.latency * STREAM_FIRST_CHUNK)
+        rest = self.latency * (1 - STREAM_FIRST_CHUNK) / max(len(chunks) - 1, 1)
+        for index, chunk in enumerate(chunks):
+            if index and rest:
+                time.sleep(rest)
+            yield StubResponse(chunk)
+
+    @staticmethod
+    def _answer(prompt: str) -> str:
+        if '"followup_questions"' in prompt:
+            payload: Any = {"classification": CLASSIFICATION, "followup_questions": FOLLOWUP_QUESTIONS}
+        elif "follow-up questions" in prompt:
+            payload = FOLLOWUP_QUESTIONS
+        elif "report" in prompt:
+            payload = REPORT
+        else:
+            payload = CLASSIFICATION
+        return json.dumps(payload)
+
+
+def stub_factory(latency: float = 0.0) -> Callable[[str, str], StubModel]:
+    """
+    GeminiClientPool factory building stub models.
+
+    Args:
+        latency: Seconds every stub request sleeps
+
+    Returns:
+        Callable taking (api_key, model_name)
+    """
+    def factory(api_key: str, model_name: str) -> StubModel:
+        return StubModel(model_name, latency)
+    return factory
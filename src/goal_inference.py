@@ -0,0 +1,135 @@
+"""
+Goal-driven ("ask only what matters") inference
+
+Works backwards from the outcome instead of asking every question: for a
+partial profile each knowledge base rule is fired, ruled out or still open
+(three-valued evaluation in knowledge_base_mapper.rule_matches). Fired rules
+give a lower bound on the risk score and open rules the headroom to the
+upper bound. The assessment is settled once both bounds map to the same risk
+level and no open rule could enter the top recommendations; until then the
+next question is the one whose worst-case answer leaves the outcome least
+open.
+"""
+
+from src.knowledge_base_mapper import get_rules, rule_matches
+from src.utils import calculate_risk_level
+
+PRIORITY_ORDER = {'high': 1, 'medium': 2, 'low': 3}
+
+# Number of leading recommendations that must be settled before stopping
+TOP_RECOMMENDATIONS = 3
+
+_OTHER_ANSWER = '__other__'
+
+
+class GoalDrivenInference:
+    """Chooses questions and stops once the risk level and top recommendations are fixed"""
+
+    def __init__(self, rules=None, questions=None, top_n=TOP_RECOMMENDATIONS):
+        """
+        Args:
+            rules (dict): Parsed rules (knowledge_base_mapper.load_rules);
+                defaults to the shipped knowledge base
+            questions (list): Profile fields that may be asked, in the
+                preferred order for ties; defaults to every field a rule reads
+            top_n (int): Leading recommendations that must be settled
+        """
+        self.rules = rules if rules is not None else get_rules()
+        fields = []
+        for rule in self.rules.values():
+            fields.extend(field for field in rule['slots'] if field not in fields)
+        self.questions = list(questions) if questions is not None else fields
+        self.top_n = top_n
+        self._rank = {
+            name: (PRIORITY_ORDER.get(rule['priority'], 999), -rule['risk_score'], idx)
+            for idx, (name, rule) in enumerate(self.rules.items())
+        }
+        self._outcomes = {field: self._hypothetical_answers(field) for field in fields}
+
+    def _hypothetical_answers(self, field):
+        """Answers that cover every way the rules can read a field"""
+        values, lengths = [], {0}
+        for rule in self.rules.values():
+            for cond_field, op, value in rule['conditions']:
+                if cond_field != field:
+                    continue
+                if op == 'eq':
+                    if value not in values:
+                        values.append(value)
+                else:
+                    lengths.update((value, value + 1))
+        if values:
+            return values + [_OTHER_ANSWER]
+        return [['item'] * length for length in sorted(lengths)]
+
+    def status(self, user_data):
+        """
+        Bounds on the outcome of a partial profile
+
+        Args:
+            user_data (dict): Answers so far; missing or None fields are unknown
+
+        Returns:
+            dict: 'min_score', 'max_score', 'risk_level' (None while the
+            bounds span several levels), 'fired' and 'open' rule names,
+            'top_recommendations' (rule names, once settled, else None) and
+            'settled'
+        """
+        fired, open_rules = [], []
+        for name, rule in self.rules.items():
+            matched = rule_matches(rule, user_data)
+            if matched:
+                fired.append(name)
+            elif matched is None:
+                open_rules.append(name)
+        low = sum(self.rules[name]['risk_score'] for name in fired)
+        high = low + sum(self.rules[name]['risk_score'] for name in open_rules)
+        level = calculate_risk_level(low)
+        if calculate_risk_level(high) != level:
+            level = None
+
+        ranked = sorted(fired + open_rules, key=self._rank.__getitem__)[:self.top_n]
+        open_in_top = sum(1 for name in ranked if name in open_rules)
+        return {
+            'min_score': low,
+            'max_score': high,
+            'risk_level': level,
+            'fired': fired,
+            'open': open_rules,
+            'top_recommendations': ranked if not open_in_top else None,
+            'settled': level is not None and not open_in_top,
+            '_open_in_top': open_in_top,
+        }
+
+    def _cost(self, user_data):
+        state = self.status(user_data)
+        return (state['risk_level'] is None, state['_open_in_top'], state['max_score'] - state['min_score'])
+
+    def next_question(self, user_data):
+        """
+        Pick the most informative unanswered question
+
+        Args:
+            user_data (dict): Answers so far
+
+        Returns:
+            str: Field to ask next, or None once the outcome is settled
+        """
+        state = self.status(user_data)
+        if state['settled']:
+            return None
+        needed = set()
+        for name in state['open']:
+            needed.update(self.rules[name]['slots'])
+
+        best, best_cost = None, None
+        for field in self.questions:
+            if field not in needed or user_data.get(field) is not None:
+                continue
+            worst = max(
+                self._cost(dict(user_data, **{field: answer}))
+                for answer in self._outcomes[field]
+            )
+            if best_cost is None or worst < best_cost:
+                best, best_cost = field, worst
+        return best
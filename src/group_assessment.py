@@ -0,0 +1,158 @@
+"""
+Group (household / organization) assessments
+
+A GroupAssessment holds many member profiles and keeps group-level
+aggregates: the risk distribution, the weakest members and the rules that
+fire most often. Aggregates are updated incrementally: changing one
+member's answer re-scores only that member and adjusts the counters by the
+difference, so updates cost the same for a group of 5 or 50,000.
+"""
+
+import heapq
+
+from src.inference_engine import InferenceEngine, RULE_IDS, rule_hit_mask
+from src.population_stats import MAX_TRACKED_SCORE, PopulationAggregator
+
+
+class GroupAssessment:
+    """Many member profiles with incrementally maintained aggregates"""
+
+    def __init__(self, name, inference_engine=None):
+        """
+        Args:
+            name (str): Group name (household, team, organization)
+            inference_engine (InferenceEngine): Engine used to score members
+        """
+        self.name = name
+        self.inference_engine = inference_engine or InferenceEngine()
+        self.members = {}
+        self.population = PopulationAggregator()
+        # risk score -> member ids with that score, for weakest-member lookups
+        self._score_buckets = {}
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, member_id):
+        return member_id in self.members
+
+    def add_member(self, member_id, user_data):
+        """
+        Add or replace a member and score their profile
+
+        Args:
+            member_id (str): Member identifier
+            user_data (dict): Member's answers
+        """
+        user_data = dict(user_data)
+        recommendations, risk_score = self.inference_engine.process(user_data)
+        self._set_member(member_id, user_data, risk_score, rule_hit_mask(recommendations))
+
+    def set_member_result(self, member_id, results):
+        """
+        Add or replace a member from an existing analysis result
+
+        Args:
+            member_id (str): Member identifier
+            results (dict): Result from AppController.run_analysis
+        """
+        self._set_member(member_id, dict(results['user_data']), results['risk_score'],
+                         rule_hit_mask(results['recommendations']))
+
+    def update_answer(self, member_id, field, value):
+        """
+        Change one answer of a member and update the aggregates
+
+        Args:
+            member_id (str): Member identifier
+            field (str): Profile field
+            value: New answer
+        """
+        user_data = dict(self.members[member_id]['user_data'])
+        user_data[field] = value
+        self.add_member(member_id, user_data)
+
+    def remove_member(self, member_id):
+        """Remove a member and their contribution to the aggregates"""
+        member = self.members.pop(member_id)
+        self._forget(member_id, member)
+
+    def _set_member(self, member_id, user_data, risk_score, rule_hits):
+        previous = self.members.get(member_id)
+        if previous is not None:
+            self._forget(member_id, previous)
+
+        self.members[member_id] = {
+            'user_data': user_data,
+            'risk_score': risk_score,
+            'rule_hits': rule_hits,
+        }
+        self.population.observe_values(risk_score, rule_hits)
+        self._score_buckets.setdefault(min(risk_score, MAX_TRACKED_SCORE), set()).add(member_id)
+
+    def _forget(self, member_id, member):
+        self.population.observe_values(member['risk_score'], member['rule_hits'], count=-1)
+        bucket_key = min(member['risk_score'], MAX_TRACKED_SCORE)
+        bucket = self._score_buckets[bucket_key]
+        bucket.discard(member_id)
+        if not bucket:
+            del self._score_buckets[bucket_key]
+
+    def risk_distribution(self):
+        """
+        Number of members per risk level
+
+        Returns:
+            dict: Risk level -> member count
+        """
+        return dict(self.population.level_counts)
+
+    def weakest_members(self, limit=10):
+        """
+        Members with the highest risk scores
+
+        Args:
+            limit (int): Maximum number of members to return
+
+        Returns:
+            list: (member_id, risk_score) tuples, highest score first
+        """
+        weakest = []
+        for score in sorted(self._score_buckets, reverse=True):
+            needed = limit - len(weakest)
+            if needed <= 0:
+                break
+            for member_id in heapq.nsmallest(needed, self._score_buckets[score], key=str):
+                weakest.append((member_id, self.members[member_id]['risk_score']))
+        return weakest
+
+    def top_rules(self, limit=5):
+        """
+        Rules firing for the most members
+
+        Args:
+            limit (int): Maximum number of rules to return
+
+        Returns:
+            list: (rule_id, member_count) tuples, most frequent first
+        """
+        counts = self.population.rule_counts
+        ranked = sorted(RULE_IDS, key=lambda rule: (-counts[rule], RULE_IDS.index(rule)))
+        return [(rule, counts[rule]) for rule in ranked[:limit] if counts[rule] > 0]
+
+    def summary(self, limit=5):
+        """
+        Group-level rollup
+
+        Returns:
+            dict: Member count, risk distribution, median score,
+            weakest members and most frequent rules
+        """
+        return {
+            'name': self.name,
+            'members': len(self.members),
+            'risk_distribution': self.risk_distribution(),
+            'median_risk_score': self.population.quantile(0.5),
+            'weakest_members': self.weakest_members(limit),
+            'top_rules': self.top_rules(limit),
+        }
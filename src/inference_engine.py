@@ -2,6 +2,41 @@
 Inference engine - processes user data and generates recommendations
 """
 
+# Rule identifiers, named after the matching defrule in clips/knowledge_base.clp.
+# The position of a rule in this tuple is its bit in a rule-hit mask, so new
+# rules must only ever be appended.
+RULE_IDS = (
+    'password-reuse-rule',
+    'no-password-manager-rule',
+    'no-two-factor-rule',
+    'public-wifi-no-vpn-rule',
+    'no-vpn-rule',
+    'no-os-update-rule',
+    'excessive-permissions-rule',
+    'many-social-media-rule',
+    'no-backup-rule',
+    'no-email-encryption-rule',
+)
+
+RULE_BITS = {rule: 1 << idx for idx, rule in enumerate(RULE_IDS)}
+
+
+def rule_hit_mask(recommendations):
+    """
+    Encode the rules that fired as a bitmask
+    
+    Args:
+        recommendations (list): Recommendations produced by InferenceEngine
+        
+    Returns:
+        int: Bitmask with bit ``RULE_IDS.index(rule)`` set for each fired rule
+    """
+    mask = 0
+    for rec in recommendations:
+        mask |= RULE_BITS.get(rec.get('rule'), 0)
+    return mask
+
+
 class InferenceEngine:
     """
     Expert system inference engine
@@ -38,9 +73,10 @@ class InferenceEngine:
         
         return self.recommendations, self.risk_score
     
-    def _add_recommendation(self, priority, category, message, details, action, risk_score):
+    def _add_recommendation(self, rule, priority, category, message, details, action, risk_score):
         """Add a recommendation and update risk score"""
         self.recommendations.append({
+            'rule': rule,
             'priority': priority,
             'category': category,
             'message': message,
@@ -54,6 +90,7 @@ class InferenceEngine:
         """Check password-related security rules"""
         if data.get('password_reuse') == 'yes':
             self._add_recommendation(
+                'password-reuse-rule',
                 'high',
                 'Password Security',
                 'Stop reusing passwords across accounts',
@@ -64,6 +101,7 @@ class InferenceEngine:
         
         if data.get('password_manager') == 'no':
             self._add_recommendation(
+                'no-password-manager-rule',
                 'high',
                 'Password Security',
                 'Use a password manager',
@@ -76,6 +114,7 @@ class InferenceEngine:
         """Check two-factor authentication rules"""
         if data.get('two_factor') == 'no':
             self._add_recommendation(
+                'no-two-factor-rule',
                 'high',
                 'Account Security',
                 'Enable Two-Factor Authentication (2FA)',
@@ -88,6 +127,7 @@ class InferenceEngine:
         """Check network security rules"""
         if data.get('public_wifi') == 'yes' and data.get('vpn') == 'no':
             self._add_recommendation(
+                'public-wifi-no-vpn-rule',
                 'high',
                 'Network Security',
                 'Use VPN on public Wi-Fi networks',
@@ -98,6 +138,7 @@ class InferenceEngine:
         
         if data.get('vpn') == 'no':
             self._add_recommendation(
+                'no-vpn-rule',
                 'medium',
                 'Network Security',
                 'Consider using a VPN for all internet activity',
@@ -110,6 +151,7 @@ class InferenceEngine:
         """Check device security rules"""
         if data.get('os_update') == 'no':
             self._add_recommendation(
+                'no-os-update-rule',
                 'high',
                 'Device Security',
                 'Keep your operating system and apps updated',
@@ -123,6 +165,7 @@ class InferenceEngine:
         permissions = data.get('app_permissions', [])
         if len(permissions) > 2 and 'None' not in permissions:
             self._add_recommendation(
+                'excessive-permissions-rule',
                 'medium',
                 'Privacy Settings',
                 'Review and restrict app permissions',
@@ -136,6 +179,7 @@ class InferenceEngine:
         social_media = data.get('social_media', [])
         if len(social_media) > 3:
             self._add_recommendation(
+                'many-social-media-rule',
                 'medium',
                 'Social Media Privacy',
                 'Review privacy settings on social media',
@@ -148,6 +192,7 @@ class InferenceEngine:
         """Check data backup rules"""
         if data.get('backup_data') == 'no':
             self._add_recommendation(
+                'no-backup-rule',
                 'medium',
                 'Data Protection',
                 'Implement regular data backups',
@@ -160,6 +205,7 @@ class InferenceEngine:
         """Check email encryption rules"""
         if data.get('email_encryption') == 'no':
             self._add_recommendation(
+                'no-email-encryption-rule',
                 'low',
                 'Communication Security',
                 'Consider email encryption for sensitive communications',
@@ -3,11 +3,131 @@ AI-Powered Issue Classification and Analysis System
 Uses Gemini API to classify privacy issues and generate targeted follow-up questions
 """
 
-import google.generativeai as genai
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 import json
 import re
 
+from src.gemini_pool import GEMINI_POOL
+from src.knowledge_base_mapper import YES_NO_SLOTS
+from src.local_report import LOCAL_CONFIDENCE, local_report, use_local_report
+from src.report_stream import ReportStreamParser
+
+CATEGORY_ICONS = {
+    "password_security": "🔐",
+    "account_security": "👤",
+    "network_security": "🌐",
+    "device_security": "💻",
+    "data_protection": "📁",
+    "communication_security": "📧",
+    "privacy_settings": "⚙️",
+    "social_media": "📱",
+    "general": "❓"
+}
+
+SEVERITIES = ("low", "medium", "high", "critical")
+QUESTION_TYPES = ("yes_no", "choice", "text")
+
+# Follow-up questions kept from a combined response
+MAX_FOLLOWUPS = 8
+
+# Ask for JSON output instead of parsing it out of free text
+JSON_OUTPUT = {"response_mime_type": "application/json"}
+
+# Follow-up tags read by knowledge_base_mapper.profile_from_followups
+SLOT_HINT = (f"for a yes_no question asking directly about one of {', '.join(YES_NO_SLOTS)}: "
+             "that slot; otherwise null")
+POLARITY_HINT = "positive if Yes means the slot is yes, negative if Yes means it is no (e.g. skipping updates)"
+
+
+def _strip_json(text: str) -> str:
+    """Response text without a surrounding markdown code fence."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("```")[1]
+        if text.startswith("json"):
+            text = text[4:]
+    return text.strip()
+
+
+def validate_classification(data: Any) -> Optional[Dict[str, Any]]:
+    """
+    Normalize a classification from a model response.
+    
+    Out-of-range values are clamped and unknown categories or severities
+    fall back to "general" / "medium".
+    
+    Returns:
+        Classification dict (classify_issue schema), or None when data is not
+        a classification at all (no summary or key concerns)
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("summary"), str):
+        return None
+    concerns = data.get("key_concerns")
+    if not isinstance(concerns, list) or not concerns:
+        return None
+    classification = dict(data)
+    if classification.get("primary_category") not in IssueClassifier.CATEGORIES:
+        classification["primary_category"] = "general"
+    classification["secondary_categories"] = [
+        c for c in classification.get("secondary_categories") or [] if c in IssueClassifier.CATEGORIES
+    ]
+    severity = str(classification.get("severity", "medium")).lower()
+    classification["severity"] = severity if severity in SEVERITIES else "medium"
+    try:
+        classification["risk_level"] = min(max(int(classification.get("risk_level", 50)), 0), 100)
+    except (TypeError, ValueError):
+        classification["risk_level"] = 50
+    if "confidence" in classification:
+        try:
+            classification["confidence"] = min(max(float(classification["confidence"]), 0.0), 1.0)
+        except (TypeError, ValueError):
+            del classification["confidence"]
+    classification["key_concerns"] = [str(c) for c in concerns]
+    classification["affected_areas"] = [str(a) for a in classification.get("affected_areas") or []]
+    return classification
+
+
+def validate_followup_questions(data: Any) -> Optional[List[Dict[str, Any]]]:
+    """
+    Normalize follow-up questions from a model response.
+    
+    Questions without text are dropped, a choice without options becomes a
+    text question, unknown types become text, and missing or duplicate ids
+    are renumbered.
+    
+    Returns:
+        List in the generate_followup_questions schema (at most
+        MAX_FOLLOWUPS), or None when no usable question is left
+    """
+    if not isinstance(data, list):
+        return None
+    questions, ids = [], set()
+    for item in data:
+        if not isinstance(item, dict) or not isinstance(item.get("question"), str) or not item["question"].strip():
+            continue
+        question = dict(item)
+        q_type = question.get("type")
+        options = question.get("options")
+        if q_type == "choice" and not (isinstance(options, list) and options):
+            q_type = "text"
+        question["type"] = q_type if q_type in QUESTION_TYPES else "text"
+        if question["type"] == "choice":
+            question["options"] = [str(option) for option in options]
+        else:
+            question.pop("options", None)
+        q_id = question.get("id")
+        if not isinstance(q_id, str) or not q_id or q_id in ids:
+            q_id = f"q{len(questions) + 1}"
+            while q_id in ids:
+                q_id += "_"
+        question["id"] = q_id
+        ids.add(q_id)
+        question["context"] = str(question.get("context", ""))
+        questions.append(question)
+        if len(questions) == MAX_FOLLOWUPS:
+            break
+    return questions or None
+
 
 class IssueClassifier:
     """Classifies privacy issues using Gemini AI and generates follow-up questions"""
@@ -24,10 +144,31 @@ class IssueClassifier:
         "general": "❓ General Privacy"
     }
     
-    def __init__(self, api_key: str):
-        """Initialize with Gemini API key"""
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel("gemini-2.5-flash")
+    MODEL_NAME = "gemini-2.5-flash"
+    
+    def __init__(self, api_key: str, model_name: str = MODEL_NAME, pool=None,
+                 local_confidence: Optional[float] = LOCAL_CONFIDENCE, single_request: bool = True):
+        """
+        Initialize with Gemini API key
+        
+        The model comes from a process-wide pool (src/gemini_pool.py), so
+        constructing a classifier on every rerun is cheap and each API key
+        gets its own client instead of the process-global configuration.
+        
+        Args:
+            api_key: Gemini API key
+            model_name: Gemini model to use
+            pool: GeminiClientPool to take the model from (default: shared pool)
+            local_confidence: Classification confidence from which reports
+                for standard categories come from the local rule engine
+                (None always asks Gemini)
+            single_request: analyze_issue asks for the classification and the
+                follow-up questions in one request (False: two requests)
+        """
+        self.model_name = model_name
+        self.local_confidence = local_confidence
+        self.single_request = single_request
+        self.model = (pool if pool is not None else GEMINI_POOL).get(api_key, model_name)
     
     def classify_issue(self, user_issue: str) -> Dict[str, Any]:
         """
@@ -45,6 +186,7 @@ class IssueClassifier:
 Provide a structured JSON response with:
 {{
     "primary_category": "one of: password_security, account_security, network_security, device_security, data_protection, communication_security, privacy_settings, social_media, general",
+    "confidence": 0.0-1.0 (how certain you are of primary_category),
     "secondary_categories": ["list of other relevant categories"],
     "severity": "low, medium, high, or critical",
     "risk_level": 0-100 (numerical risk score),
@@ -57,15 +199,9 @@ Return ONLY the JSON, no other text."""
         
         try:
             response = self.model.generate_content(prompt)
-            # Clean markdown formatting
-            text = response.text.strip()
-            if text.startswith("```"):
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-            text = text.strip()
-            
-            classification = json.loads(text)
+            classification = validate_classification(json.loads(_strip_json(response.text)))
+            if classification is None:
+                raise ValueError("The response is not a classification")
             return classification
         except Exception as e:
             return {
@@ -102,28 +238,24 @@ For EACH question, provide a JSON object with:
     "question": "specific, clear question",
     "type": "yes_no", "choice", or "text",
     "options": ["only if type is choice"],
-    "context": "brief explanation why we're asking"
+    "context": "brief explanation why we're asking",
+    "slot": "{SLOT_HINT}",
+    "polarity": "{POLARITY_HINT}"
 }}
 
 Return a JSON array of questions. ONLY return the JSON array, no other text.
 
 Example format:
 [
-  {{"id": "q1", "question": "...", "type": "yes_no", "context": "..."}},
-  {{"id": "q2", "question": "...", "type": "choice", "options": ["opt1", "opt2"], "context": "..."}}
+  {{"id": "q1", "question": "...", "type": "yes_no", "context": "...", "slot": "two_factor", "polarity": "positive"}},
+  {{"id": "q2", "question": "...", "type": "choice", "options": ["opt1", "opt2"], "context": "...", "slot": null}}
 ]"""
         
         try:
             response = self.model.generate_content(prompt)
-            text = response.text.strip()
-            # Clean markdown
-            if text.startswith("```"):
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-            text = text.strip()
-            
-            questions = json.loads(text)
+            questions = validate_followup_questions(json.loads(_strip_json(response.text)))
+            if questions is None:
+                raise ValueError("The response has no usable follow-up questions")
             return questions
         except Exception as e:
             return [
@@ -142,16 +274,101 @@ Example format:
                 }
             ]
     
+    def analyze_issue(self, user_issue: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Classify an issue and generate its follow-up questions (Step 2).
+        
+        In single-request mode one JSON request returns both, validated with
+        validate_classification and validate_followup_questions. If the
+        combined response fails, the two-request path is used: both calls
+        when the classification is unusable, only generate_followup_questions
+        when just the questions are.
+        
+        Args:
+            user_issue: The user's description of their concern
+        
+        Returns:
+            (classification, followup_questions), as from classify_issue and
+            generate_followup_questions
+        """
+        classification = questions = None
+        if self.single_request:
+            classification, questions = self._analyze_combined(user_issue)
+        if classification is None:
+            classification = self.classify_issue(user_issue)
+        if questions is None:
+            questions = self.generate_followup_questions(classification)
+        return classification, questions
+    
+    def _analyze_combined(self, user_issue: str) -> Tuple[Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
+        """One request for the classification and the questions; None for each part that failed."""
+        prompt = f"""You are a privacy and security expert. Analyze this user's privacy concern:
+
+"{user_issue}"
+
+Respond with one JSON object with two fields:
+{{
+    "classification": {{
+        "primary_category": "one of: {', '.join(self.CATEGORIES)}",
+        "confidence": 0.0-1.0 (how certain you are of primary_category),
+        "secondary_categories": ["list of other relevant categories"],
+        "severity": "low, medium, high, or critical",
+        "risk_level": 0-100 (numerical risk score),
+        "summary": "2-3 sentence summary of the issue",
+        "key_concerns": ["concern1", "concern2", "concern3"],
+        "affected_areas": ["area1", "area2"]
+    }},
+    "followup_questions": [
+        {{"id": "q1", "question": "specific, clear question", "type": "yes_no, choice, or text",
+          "options": ["only if type is choice"], "context": "brief explanation why we're asking",
+          "slot": "{SLOT_HINT}", "polarity": "{POLARITY_HINT}"}}
+    ]
+}}
+
+Write 4-5 focused followup_questions that clarify the user's situation given the classification.
+
+Return ONLY the JSON, no other text."""
+        
+        try:
+            response = self.model.generate_content(prompt, generation_config=JSON_OUTPUT)
+            data = json.loads(_strip_json(response.text))
+        except Exception:
+            return None, None
+        if not isinstance(data, dict):
+            return None, None
+        classification = validate_classification(data.get("classification"))
+        if classification is None:
+            return None, None
+        return classification, validate_followup_questions(data.get("followup_questions"))
+    
     def generate_report(self, issue_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate detailed report with analysis and recommendations
         
+        Confidently classified standard categories are answered by the local
+        rule engine without calling Gemini, and so is any failed Gemini call
+        (see src/local_report.py).
+        
         Args:
             issue_data: Dict with user_issue, classification, followup_answers
         
         Returns:
             Dict with detailed analysis and recommendations
         """
+        if use_local_report(issue_data.get("classification") or {}, self.local_confidence):
+            return local_report(issue_data)
+        
+        prompt = self._report_prompt(issue_data)
+        
+        try:
+            response = self.model.generate_content(prompt)
+            report = json.loads(_strip_json(response.text))
+            return report
+        except Exception as e:
+            return local_report(issue_data, error=str(e))
+    
+    def _report_prompt(self, issue_data: Dict[str, Any]) -> str:
+        """Prompt asking Gemini for the generate_report JSON."""
         user_issue = issue_data.get("user_issue", "")
         classification = issue_data.get("classification", {})
         followup_answers = issue_data.get("followup_answers", {})
@@ -189,42 +406,82 @@ Generate a comprehensive JSON report with:
 }}
 
 Return ONLY valid JSON, no other text."""
+        return prompt
+    
+    def stream_report(self, issue_data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Generate the report as a stream, yielding it as parts complete
+        
+        Gemini's streamed chunks are fed to a ReportStreamParser. A partial
+        report is yielded whenever a top-level field completes or a list
+        field gains an item, so the analysis and each action can be shown
+        before the rest of the response arrives.
         
+        Args:
+            issue_data: Dict with user_issue, classification, followup_answers
+        
+        Yields:
+            Partial reports (dicts with the fields complete so far, plus
+            "partial": True), then the final report, which is the same as
+            generate_report would return
+        """
+        if use_local_report(issue_data.get("classification") or {}, self.local_confidence):
+            yield local_report(issue_data)
+            return
+        
+        parser = ReportStreamParser()
         try:
-            response = self.model.generate_content(prompt)
-            text = response.text.strip()
-            # Clean markdown
-            if text.startswith("```"):
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-            text = text.strip()
-            
-            report = json.loads(text)
-            return report
+            for chunk in self.model.generate_content(self._report_prompt(issue_data), stream=True):
+                if parser.feed(chunk.text):
+                    yield dict(parser.partial, partial=True)
+            report = json.loads(_strip_json(parser.text))
         except Exception as e:
-            return {
-                "analysis": "Analysis in progress. Please try again.",
-                "root_causes": [],
-                "immediate_actions": [],
-                "medium_term_steps": [],
-                "tools_recommended": [],
-                "timeline": "Contact support",
-                "faq": [],
-                "error": str(e)
-            }
+            yield local_report(issue_data, error=str(e))
+            return
+        yield report
+    
+    @staticmethod
+    def get_category_icon(category: str) -> str:
+        """Get emoji icon for a category (no API key or model needed)"""
+        return CATEGORY_ICONS.get(category, "🔒")
+
+
+def generate_issue_report(api_key: str, issue_data: Dict[str, Any], pool=None) -> Dict[str, Any]:
+    """
+    Report for an issue, without building a Gemini model when it is not needed.
+    
+    Falls back to the local rule engine when the model cannot be built either.
+    
+    Args:
+        api_key: Gemini API key
+        issue_data: Dict with user_issue, classification, followup_answers, followup_questions
+        pool: GeminiClientPool to take the model from (default: shared pool)
+    
+    Returns:
+        Report dict (see IssueClassifier.generate_report)
+    """
+    if use_local_report(issue_data.get("classification") or {}):
+        return local_report(issue_data)
+    try:
+        classifier = IssueClassifier(api_key, pool=pool)
+    except Exception as e:
+        return local_report(issue_data, error=str(e))
+    return classifier.generate_report(issue_data)
+
+
+def stream_issue_report(api_key: str, issue_data: Dict[str, Any], pool=None) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming counterpart of generate_issue_report.
     
-    def get_category_icon(self, category: str) -> str:
-        """Get emoji icon for a category"""
-        icon_map = {
-            "password_security": "🔐",
-            "account_security": "👤",
-            "network_security": "🌐",
-            "device_security": "💻",
-            "data_protection": "📁",
-            "communication_security": "📧",
-            "privacy_settings": "⚙️",
-            "social_media": "📱",
-            "general": "❓"
-        }
-        return icon_map.get(category, "🔒")
+    Yields:
+        Partial reports, then the final report (see IssueClassifier.stream_report)
+    """
+    if use_local_report(issue_data.get("classification") or {}):
+        yield local_report(issue_data)
+        return
+    try:
+        classifier = IssueClassifier(api_key, pool=pool)
+    except Exception as e:
+        yield local_report(issue_data, error=str(e))
+        return
+    yield from classifier.stream_report(issue_data)
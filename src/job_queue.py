@@ -0,0 +1,334 @@
+"""
+Background job queue for slow Gemini work
+
+Classification and report generation run on a local worker pool instead
+of the Streamlit script thread, so a page can poll a job's status instead
+of blocking inside st.spinner for the whole Gemini round trip. Jobs have
+string IDs and live in a process-wide registry. A page reload within the
+same server process can therefore pick a job up again by its ID (app.py
+keeps it in the query string). Each job carries the session fields needed
+to rebuild the page.
+
+Jobs submitted with a key are deduplicated: while a job with that key is
+queued, running or done, submitting it again returns the existing job. A
+running job can publish intermediate results with report_progress() (e.g.
+the parts of a streamed report received so far) for the page to show, and
+can check job_cancelled() to stop early once nobody wants its result. The
+queue reports its depth, worker use, and wait and run times.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_FINISHED = 1024
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+# The job each worker thread is running, for report_progress() and job_cancelled()
+_current = threading.local()
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by submit() when max_queue jobs are already waiting."""
+
+
+class Job:
+    """One unit of background work and its outcome."""
+
+    __slots__ = ("id", "kind", "key", "meta", "state", "result", "error", "progress",
+                 "submitted_at", "started_at", "finished_at", "future", "done_event")
+
+    def __init__(self, kind: str, key: Optional[str], meta: Dict[str, Any], now: float):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.meta = meta
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self.progress = None
+        self.submitted_at = now
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self.done_event = threading.Event()
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        """Status dict (safe to hand to the page)."""
+        waited = (self.started_at or now) - self.submitted_at
+        ran = (self.finished_at or now) - self.started_at if self.started_at is not None else 0.0
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "key": self.key,
+            "state": self.state,
+            "result": self.result,
+            "error": self.error,
+            "progress": self.progress,
+            "meta": self.meta,
+            "wait_seconds": waited,
+            "run_seconds": ran,
+        }
+
+
+class JobQueue:
+    """Bounded worker pool with a registry of jobs by ID."""
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, max_queue: int = 0,
+                 max_finished: int = DEFAULT_MAX_FINISHED, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_workers: Jobs running at once
+            max_queue: Jobs allowed to wait for a worker (0 = unbounded)
+            max_finished: Finished jobs kept for later lookups (oldest dropped first)
+            clock: Monotonic time source
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_finished = max_finished
+        self.clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="privacy-advisor-job")
+        self._jobs: Dict[str, Job] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._by_key: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero the counters, totals and maxima reported by stats()."""
+        metrics = {
+            "submitted": 0,
+            "started": 0,
+            "ran": 0,
+            "deduplicated": 0,
+            "rejected": 0,
+            "done": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "max_queue_depth": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "run_seconds_total": 0.0,
+            "run_seconds_max": 0.0,
+        }
+        with self._lock:
+            self._metrics = metrics
+
+    def _run(self, job: Job, func: Callable[..., Any], args, kwargs):
+        with self._lock:
+            if job.state != QUEUED:
+                return
+            job.state = RUNNING
+            self._queued -= 1
+            self._running += 1
+            job.started_at = self.clock()
+            waited = job.started_at - job.submitted_at
+            self._metrics["started"] += 1
+            self._metrics["wait_seconds_total"] += waited
+            self._metrics["wait_seconds_max"] = max(self._metrics["wait_seconds_max"], waited)
+        _current.job = job
+        try:
+            result, error = func(*args, **kwargs), None
+        except Exception as exc:
+            result, error = None, f"{type(exc).__name__}: {exc}"
+        finally:
+            _current.job = None
+        with self._lock:
+            job.finished_at = self.clock()
+            self._running -= 1
+            ran = job.finished_at - job.started_at
+            self._metrics["ran"] += 1
+            self._metrics["run_seconds_total"] += ran
+            self._metrics["run_seconds_max"] = max(self._metrics["run_seconds_max"], ran)
+            if job.state == RUNNING:
+                job.state = FAILED if error is not None else DONE
+                job.result, job.error = result, error
+                self._metrics[job.state] += 1
+            self._finish_locked(job)
+
+    def _finish_locked(self, job: Job):
+        if job.state in (FAILED, CANCELLED) and job.key is not None and self._by_key.get(job.key) == job.id:
+            # Failed or cancelled work is not reused for the same key
+            del self._by_key[job.key]
+        self._finished[job.id] = None
+        while len(self._finished) > self.max_finished:
+            old_id, _ = self._finished.popitem(last=False)
+            old = self._jobs.pop(old_id, None)
+            if old is not None and old.key is not None and self._by_key.get(old.key) == old_id:
+                del self._by_key[old.key]
+        job.done_event.set()
+
+    def submit(self, func: Callable[..., Any], *args, kind: str = "job", key: Optional[str] = None,
+               meta: Optional[Dict[str, Any]] = None, **kwargs) -> str:
+        """
+        Queue func(*args, **kwargs) on a worker.
+
+        Args:
+            func: Work to run
+            kind: Label for the job ("classify", "report", ...)
+            key: Deduplication key; a queued, running or done job with the
+                same key is returned instead of starting a new one
+            meta: Data kept with the job (e.g. the session fields to restore)
+
+        Returns:
+            Job ID
+
+        Raises:
+            JobQueueFull: If max_queue jobs are already waiting
+        """
+        with self._lock:
+            if key is not None and key in self._by_key:
+                self._metrics["deduplicated"] += 1
+                return self._by_key[key]
+            depth = self._queued
+            if self.max_queue and depth >= self.max_queue:
+                self._metrics["rejected"] += 1
+                raise JobQueueFull(f"{depth} jobs are already waiting")
+            job = Job(kind, key, dict(meta or {}), self.clock())
+            self._jobs[job.id] = job
+            if key is not None:
+                self._by_key[key] = job.id
+            self._metrics["submitted"] += 1
+            self._queued += 1
+            self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], depth + 1)
+            job.future = self._executor.submit(self._run, job, func, args, kwargs)
+        return job.id
+
+    def status(self, job_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Status of a job (see Job.snapshot), or None for unknown or expired IDs."""
+        with self._lock:
+            job = self._jobs.get(job_id) if job_id else None
+            return job.snapshot(self.clock()) if job is not None else None
+
+    def find(self, key: str) -> Optional[str]:
+        """ID of the live or finished job for a deduplication key, if any."""
+        with self._lock:
+            return self._by_key.get(key)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until a job finishes (or timeout); returns its status."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job.done_event.wait(timeout)
+        return self.status(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job that has not finished.
+
+        A queued job never runs. A running job cannot be interrupted, so
+        its result is discarded when it finishes; it can poll
+        job_cancelled() to stop early.
+
+        Returns:
+            True if the job was queued or running
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state in FINISHED_STATES:
+                return False
+            was_queued = job.state == QUEUED
+            job.state = CANCELLED
+            self._metrics["cancelled"] += 1
+            if was_queued:
+                self._queued -= 1
+                job.future.cancel()
+                job.finished_at = self.clock()
+                self._finish_locked(job)
+            elif job.key is not None and self._by_key.get(job.key) == job.id:
+                del self._by_key[job.key]
+            return True
+
+    def discard(self, job_id: str) -> bool:
+        """
+        Forget a finished job, so its key no longer deduplicates.
+
+        Returns:
+            True if a finished job was removed
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state not in FINISHED_STATES:
+                return False
+            del self._jobs[job_id]
+            self._finished.pop(job_id, None)
+            if job.key is not None and self._by_key.get(job.key) == job_id:
+                del self._by_key[job.key]
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Queue metrics.
+
+        Returns:
+            Dict with max_workers, queue_depth (waiting now), running,
+            max_queue_depth, submitted/started/ran/deduplicated/rejected counts,
+            done/failed/cancelled counts and mean/max wait and run seconds
+        """
+        with self._lock:
+            stats = dict(self._metrics)
+            stats["queue_depth"] = self._queued
+            stats["running"] = self._running
+        started, ran = stats["started"], stats["ran"]
+        stats["max_workers"] = self.max_workers
+        stats["wait_seconds_mean"] = stats["wait_seconds_total"] / started if started else 0.0
+        stats["run_seconds_mean"] = stats["run_seconds_total"] / ran if ran else 0.0
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers (queued jobs still run when wait is True)."""
+        self._executor.shutdown(wait=wait)
+
+
+def report_progress(progress: Any) -> bool:
+    """
+    Publish an intermediate result of the job running on this thread.
+
+    The latest value is returned as "progress" by JobQueue.status.
+
+    Returns:
+        False when called outside a job (the value is dropped)
+    """
+    job = getattr(_current, "job", None)
+    if job is None:
+        return False
+    job.progress = progress
+    return True
+
+
+def job_cancelled() -> bool:
+    """True when the job running on this thread was cancelled (False outside a job)."""
+    job = getattr(_current, "job", None)
+    return job is not None and job.state == CANCELLED
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# Process-wide queue; PRIVACY_ADVISOR_JOB_WORKERS / PRIVACY_ADVISOR_JOB_QUEUE size it
+JOB_QUEUE = JobQueue(
+    max_workers=max(1, _env_int("PRIVACY_ADVISOR_JOB_WORKERS", DEFAULT_WORKERS)),
+    max_queue=max(0, _env_int("PRIVACY_ADVISOR_JOB_QUEUE", 0)),
+)
@@ -0,0 +1,195 @@
+"""
+Re-score stored assessments after a knowledge base change
+
+Instead of replaying every assessment through the new rules, the backfill
+diffs the old and new knowledge base rule by rule and only touches the
+assessments a changed rule can affect:
+
+- a rule whose weight or recommendation text changed only matters where it
+  fired, which the stored rule-hit bitmap answers directly;
+- a rule whose conditions changed (or a new rule) can additionally start
+  firing, so rows whose profile satisfies the new conditions are selected
+  too, using only the profile slots that rule reads.
+
+Each selected assessment is updated by the difference in rule contributions,
+and population aggregates are adjusted by removing the old result and adding
+the new one.
+"""
+
+from src.inference_engine import RULE_BITS, RULE_IDS
+from src.knowledge_base_mapper import (
+    ENGINE_PATH,
+    TEMPLATES_PATH,
+    kb_version,
+    load_rules,
+    recommendation_from_rule,
+    rule_matches,
+)
+from src.utils import calculate_risk_level, sort_recommendations
+
+_TEXT_FIELDS = ('priority', 'category', 'message', 'details', 'action')
+
+_SQL_LENGTH_OPS = {'len>': '>', 'len>=': '>=', 'len<': '<', 'len<=': '<=', 'len=': '='}
+
+_RULE_ORDER = {rule: idx for idx, rule in enumerate(RULE_IDS)}
+
+
+def diff_rules(old_rules, new_rules):
+    """
+    Rule-level difference between two parsed knowledge bases
+
+    Args:
+        old_rules (dict): Rules from knowledge_base_mapper.load_rules
+        new_rules (dict): Rules of the new knowledge base
+
+    Returns:
+        dict: Rule name -> {'old': spec or None, 'new': spec or None,
+        'condition_changed': bool, 'weight_change': int,
+        'text_changed': bool, 'slots': profile fields read by either version}
+        for every rule that differs
+    """
+    changes = {}
+    for name in list(old_rules) + [n for n in new_rules if n not in old_rules]:
+        old, new = old_rules.get(name), new_rules.get(name)
+        old_conditions = old['conditions'] if old else None
+        new_conditions = new['conditions'] if new else None
+        change = {
+            'old': old,
+            'new': new,
+            'condition_changed': old_conditions != new_conditions,
+            'weight_change': (new['risk_score'] if new else 0) - (old['risk_score'] if old else 0),
+            'text_changed': bool(old and new) and any(old[f] != new[f] for f in _TEXT_FIELDS),
+            'slots': sorted(set(old['slots'] if old else ()) | set(new['slots'] if new else ())),
+        }
+        if change['condition_changed'] or change['weight_change'] or change['text_changed']:
+            changes[name] = change
+    return changes
+
+
+def _condition_sql(condition):
+    field, op, value = condition
+    path = f'$.{field}'
+    if op == 'eq':
+        return 'json_extract(profile, ?) = ?', (path, value)
+    # Same length as _complete_lists + condition_holds: a missing list is
+    # empty, and so is one holding "None"
+    length = ("(CASE WHEN EXISTS (SELECT 1 FROM json_each(profile, ?) WHERE value = 'None') THEN 0 "
+              "ELSE COALESCE(json_array_length(profile, ?), 0) END)")
+    return f'{length} {_SQL_LENGTH_OPS[op]} ?', (path, path, value)
+
+
+def _complete_lists(rule, profile):
+    """Stored profile with the rule's list fields defaulted to empty, as InferenceEngine reads them"""
+    missing = [field for field, op, _ in rule['conditions'] if op != 'eq' and profile.get(field) is None]
+    if not missing:
+        return profile
+    return dict(profile, **{field: [] for field in missing})
+
+
+def _selection(changes):
+    """SQL condition (and parameters) matching every assessment a change can affect"""
+    clauses, params = [], []
+    for name, change in changes.items():
+        clauses.append('rule_hits & ? != 0')
+        params.append(RULE_BITS[name])
+        if change['new'] and change['condition_changed']:
+            # Superset of the rows where the new rule fires; the exact
+            # decision is made in Python with rule_matches
+            parts = [_condition_sql(c) for c in change['new']['conditions']]
+            clauses.append('(' + ' AND '.join(sql for sql, _ in parts) + ')')
+            for _, values in parts:
+                params.extend(values)
+    return ' OR '.join(clauses), tuple(params)
+
+
+def rescore(assessment, changes):
+    """
+    Apply rule changes to one stored assessment
+
+    Args:
+        assessment (dict): Stored assessment (AssessmentHistory.get)
+        changes (dict): Output of diff_rules
+
+    Returns:
+        tuple: (risk_score, rule_hits, recommendations), recommendations in
+        the order AppController.run_analysis stores them
+    """
+    score, hits = assessment['risk_score'], assessment['rule_hits']
+    recommendations = [rec for rec in assessment['recommendations'] if rec.get('rule') not in changes]
+    for name, change in changes.items():
+        bit = RULE_BITS[name]
+        if hits & bit:
+            score -= change['old']['risk_score'] if change['old'] else 0
+            hits &= ~bit
+        new = change['new']
+        if new is None:
+            continue
+        if change['condition_changed']:
+            fires = rule_matches(new, _complete_lists(new, assessment['profile'])) is True
+        else:
+            fires = bool(assessment['rule_hits'] & bit)
+        if fires:
+            score += new['risk_score']
+            hits |= bit
+            recommendations.append(recommendation_from_rule(new))
+    # Engine order first so ties keep the order a fresh analysis would give
+    recommendations.sort(key=lambda rec: _RULE_ORDER.get(rec.get('rule'), len(RULE_IDS)))
+    return score, hits, sort_recommendations(recommendations)
+
+
+def backfill(history, old_kb_path, new_kb_path, population=None,
+             templates_path=TEMPLATES_PATH, batch_size=1000,
+             old_engine_path=ENGINE_PATH, new_engine_path=ENGINE_PATH):
+    """
+    Re-score the assessments affected by a knowledge base change
+
+    Only assessments scored with the old knowledge base version are
+    considered. Unaffected ones are relabelled with the new version.
+
+    Args:
+        history (AssessmentHistory): Store to update in place
+        old_kb_path (str): Knowledge base the assessments were scored with
+        new_kb_path (str): New knowledge base
+        population (PopulationAggregator): Aggregates to adjust, if any
+        templates_path (str): Templates file (part of the KB version)
+        batch_size (int): Assessments loaded and written per transaction
+        old_engine_path (str): inference_engine.py the assessments were
+            scored with (part of the KB version)
+        new_engine_path (str): inference_engine.py matching the new knowledge base
+
+    Returns:
+        dict: 'changed_rules', 'selected' (assessments examined) and
+        'updated' (assessments whose result changed)
+
+    Raises:
+        ValueError: If a new rule has no bit in inference_engine.RULE_IDS
+    """
+    changes = diff_rules(load_rules(old_kb_path), load_rules(new_kb_path))
+    unknown = sorted(name for name in changes if name not in RULE_BITS)
+    if unknown:
+        raise ValueError(
+            f"Rules without a rule-hit bit: {', '.join(unknown)} (append them to RULE_IDS)"
+        )
+
+    old_version = kb_version(old_kb_path, templates_path, old_engine_path)
+    new_version = kb_version(new_kb_path, templates_path, new_engine_path)
+    stats = {'changed_rules': sorted(changes), 'selected': 0, 'updated': 0}
+    if changes:
+        condition, params = _selection(changes)
+        batches = history.iter_where(f'kb_version = ? AND ({condition})',
+                                     (old_version, *params), batch_size)
+        for batch in batches:
+            updates = []
+            for assessment in batch:
+                score, hits, recommendations = rescore(assessment, changes)
+                updates.append((assessment['id'], score, calculate_risk_level(score),
+                                hits, recommendations, new_version))
+                if score != assessment['risk_score'] or hits != assessment['rule_hits']:
+                    stats['updated'] += 1
+                    if population is not None:
+                        population.observe_values(assessment['risk_score'], assessment['rule_hits'], -1)
+                        population.observe_values(score, hits)
+            history.update_results(updates)
+            stats['selected'] += len(batch)
+    history.relabel_kb_version(old_version, new_version)
+    return stats
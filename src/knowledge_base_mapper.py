@@ -0,0 +1,423 @@
+"""
+Knowledge base mapper - connects the CLIPS knowledge base to the Python side
+"""
+
+import hashlib
+import os
+import re
+from functools import lru_cache
+
+CLIPS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'clips')
+KB_PATH = os.path.join(CLIPS_DIR, 'knowledge_base.clp')
+TEMPLATES_PATH = os.path.join(CLIPS_DIR, 'templates.clp')
+# The Python rules (RULE_IDS, conditions, weights) that score assessments
+ENGINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'inference_engine.py')
+
+
+def kb_version(kb_path=KB_PATH, templates_path=TEMPLATES_PATH, engine_path=ENGINE_PATH):
+    """
+    Content hash identifying a knowledge base version
+
+    Assessments are scored by the Python InferenceEngine, so its source is
+    part of the version: editing a rule there changes the version just like
+    editing the CLIPS files.
+
+    Args:
+        kb_path (str): Rules file
+        templates_path (str): Templates file
+        engine_path (str): inference_engine.py the assessments are scored with
+
+    Returns:
+        str: 12 hex digits of the SHA-256 of the three files
+    """
+    digest = hashlib.sha256()
+    for path in (templates_path, kb_path, engine_path):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+@lru_cache(maxsize=1)
+def current_kb_version():
+    """Version of the knowledge base shipped with the app (computed once)"""
+    return kb_version()
+
+
+def _tokenize(text):
+    """Split CLIPS source into '(', ')', string and symbol tokens"""
+    tokens, i, n = [], 0, len(text)
+    while i < n:
+        ch = text[i]
+        if ch == ';':
+            while i < n and text[i] != '\n':
+                i += 1
+        elif ch.isspace():
+            i += 1
+        elif ch in '()':
+            tokens.append(ch)
+            i += 1
+        elif ch == '"':
+            j = i + 1
+            while j < n and text[j] != '"':
+                j += 2 if text[j] == '\\' else 1
+            tokens.append(('str', text[i + 1:j].replace('\\"', '"')))
+            i = j + 1
+        else:
+            j = i
+            while j < n and not text[j].isspace() and text[j] not in '();"':
+                j += 1
+            tokens.append(text[i:j])
+            i = j
+    return tokens
+
+
+def _parse_sexprs(tokens):
+    """Build nested lists from tokens; strings stay ('str', value) tuples"""
+    stack = [[]]
+    for token in tokens:
+        if token == '(':
+            stack.append([])
+        elif token == ')':
+            if len(stack) == 1:
+                raise ValueError("Unbalanced ')' in knowledge base")
+            done = stack.pop()
+            stack[-1].append(done)
+        else:
+            stack[-1].append(token)
+    if len(stack) != 1:
+        raise ValueError("Unbalanced '(' in knowledge base")
+    return stack[0]
+
+
+def _atom(token):
+    if isinstance(token, tuple):
+        return token[1]
+    try:
+        return int(token)
+    except (TypeError, ValueError):
+        return token
+
+
+def slot_to_field(slot):
+    """CLIPS slot name (two-factor) -> user_data key (two_factor)"""
+    return slot.replace('-', '_')
+
+
+def _parse_condition(slot_expr):
+    """
+    Turn one user-profile slot pattern into a condition tuple
+
+    Supported forms are ``(slot value)`` and
+    ``(slot $?var&:(> (length$ ?var) N))``.
+    """
+    field = slot_to_field(slot_expr[0])
+    rest = slot_expr[1:]
+    if len(rest) == 1 and not isinstance(rest[0], list) and not str(rest[0]).startswith(('?', '$?')):
+        return (field, 'eq', _atom(rest[0]))
+    if len(rest) == 2 and str(rest[0]).endswith('&:') and isinstance(rest[1], list):
+        test = rest[1]
+        if (len(test) == 3 and test[0] in ('>', '>=', '<', '<=', '=')
+                and isinstance(test[1], list) and test[1][0] == 'length$'):
+            return (field, f'len{test[0]}', int(test[2]))
+    raise ValueError(f"Unsupported user-profile pattern: {slot_expr!r}")
+
+
+def parse_rules(text):
+    """
+    Parse CLIPS defrules that match user-profile facts and assert a recommendation
+
+    Args:
+        text (str): Contents of a knowledge base .clp file
+
+    Returns:
+        dict: Rule name -> rule spec with 'conditions' (list of
+        (field, op, value) tuples), 'slots' (fields read), and the
+        recommendation fields ('priority', 'category', 'message',
+        'details', 'action', 'risk_score')
+    """
+    rules = {}
+    for form in _parse_sexprs(_tokenize(text)):
+        if not isinstance(form, list) or not form or form[0] != 'defrule':
+            continue
+        name = form[1]
+        body = form[2:]
+        if body and isinstance(body[0], tuple):
+            body = body[1:]  # rule comment string
+        arrow = body.index('=>')
+        patterns, actions = body[:arrow], body[arrow + 1:]
+
+        conditions = []
+        for pattern in patterns:
+            if pattern[0] != 'user-profile':
+                raise ValueError(f"Rule {name}: unsupported pattern {pattern[0]}")
+            conditions.extend(_parse_condition(slot) for slot in pattern[1:])
+
+        recommendation = None
+        for action in actions:
+            if action[0] == 'assert' and action[1][0] == 'recommendation':
+                recommendation = {slot[0]: _atom(slot[1]) for slot in action[1][1:]}
+        if recommendation is None:
+            raise ValueError(f"Rule {name} does not assert a recommendation")
+
+        rules[name] = {
+            'name': name,
+            'conditions': conditions,
+            'slots': sorted({field for field, _, _ in conditions}),
+            'priority': recommendation.get('priority'),
+            'category': recommendation.get('category'),
+            'message': recommendation.get('message'),
+            'details': recommendation.get('details'),
+            'action': recommendation.get('action'),
+            'risk_score': recommendation.get('risk-score', 0),
+        }
+    return rules
+
+
+def load_rules(path=KB_PATH):
+    """Parse the rules of a knowledge base file (see parse_rules)"""
+    with open(path, encoding='utf-8') as f:
+        return parse_rules(f.read())
+
+
+@lru_cache(maxsize=1)
+def get_rules():
+    """The shipped knowledge base rules, parsed once per process (do not mutate)"""
+    return load_rules()
+
+
+_LENGTH_TESTS = {
+    'len>': lambda n, v: n > v,
+    'len>=': lambda n, v: n >= v,
+    'len<': lambda n, v: n < v,
+    'len<=': lambda n, v: n <= v,
+    'len=': lambda n, v: n == v,
+}
+
+
+def condition_holds(condition, user_data):
+    """
+    Evaluate one condition against a (possibly partial) profile
+
+    Returns:
+        bool: Whether it holds, or None if the field has not been answered
+    """
+    field, op, value = condition
+    answer = user_data.get(field)
+    if answer is None:
+        return None
+    if op == 'eq':
+        return answer == value
+    if 'None' in answer:
+        # "None of these" in a multiselect maps to an empty multislot
+        answer = ()
+    return _LENGTH_TESTS[op](len(answer), value)
+
+
+def rule_matches(rule, user_data):
+    """
+    Whether a parsed rule fires for a profile
+
+    Returns:
+        bool: True/False once decided, None while it depends on unanswered fields
+    """
+    undecided = False
+    for condition in rule['conditions']:
+        holds = condition_holds(condition, user_data)
+        if holds is False:
+            return False
+        if holds is None:
+            undecided = True
+    return None if undecided else True
+
+
+def recommendation_from_rule(rule):
+    """Build the recommendation dict a rule asserts (same keys as InferenceEngine)"""
+    return {
+        'rule': rule['name'],
+        'priority': rule['priority'],
+        'category': rule['category'],
+        'message': rule['message'],
+        'details': rule['details'],
+        'action': rule['action'],
+        'risk_score': rule['risk_score'],
+    }
+
+
+def evaluate_rules(rules, user_data):
+    """
+    Run parsed rules over a complete profile
+
+    Unanswered fields never satisfy a condition, as in InferenceEngine.
+
+    Returns:
+        tuple: (recommendations, risk_score)
+    """
+    recommendations = [
+        recommendation_from_rule(rule) for rule in rules.values()
+        if rule_matches(rule, user_data)
+    ]
+    return recommendations, sum(rec['risk_score'] for rec in recommendations)
+
+
+# Yes/no profile slots a follow-up question can answer
+YES_NO_SLOTS = (
+    'password_reuse', 'password_manager', 'two_factor', 'public_wifi',
+    'vpn', 'os_update', 'backup_data', 'email_encryption',
+)
+
+# Polarity of a tagged follow-up question: with 'negative', a "Yes" answer
+# means the slot is 'no' ("Do you skip system updates?" -> os_update)
+POLARITIES = ('positive', 'negative')
+
+# Phrases tying an untagged follow-up question to the user-profile slot it
+# asks about. The first slot whose phrase appears in the question wins, so
+# more specific phrases come first. They are kept narrow: a question that
+# merely mentions an update or a backup is not about these slots.
+SLOT_KEYWORDS = (
+    ('password_manager', ('password manager',)),
+    ('password_reuse', ('reuse this password', 'reuse the password', 'reuse your password',
+                        'reuse passwords', 'reuse a password', 'same password')),
+    ('two_factor', ('two-factor', 'two factor', '2fa', 'multi-factor', 'mfa', 'authenticator app')),
+    ('vpn', ('vpn',)),
+    ('public_wifi', ('public wi-fi', 'public wifi', 'public network', 'hotspot')),
+    ('os_update', ('software update', 'system update', 'security update', 'os update',
+                   'operating system update', 'update your operating system', 'update your device')),
+    ('backup_data', ('back up your data', 'back up your files', 'back up your device',
+                     'back up your computer', 'back up your phone', 'backups of your',
+                     'backup of your', 'data backup', 'regular backup')),
+    ('email_encryption', ('encrypt your email', 'encrypted email', 'email encryption', 'encrypt email',
+                          'pgp', 's/mime')),
+)
+
+# Words that turn a question around ("Do you skip updates?"); untagged
+# questions containing one are not mapped, since a "Yes" could mean either
+NEGATIONS = ('not', 'no', 'never', 'without', 'skip', 'skips', 'skipped', 'skipping',
+             'avoid', 'ignore', 'disable', 'disabled', 'off', 'stop', 'stopped')
+
+# Phrases in the issue description that answer a slot by themselves, unless
+# a negation comes shortly before them in the same clause (see _cue_negated)
+ISSUE_CUES = (
+    ('password_reuse', 'yes', ('reuse passwords', 'reuse my password', 'same password', 'reusing passwords')),
+    ('password_manager', 'no', ('no password manager', "don't use a password manager")),
+    ('two_factor', 'no', ('no 2fa', 'no two-factor', 'without 2fa', 'without two-factor')),
+    ('public_wifi', 'yes', ('public wifi', 'public wi-fi', 'coffee shop wifi', 'airport wifi', 'hotel wifi')),
+    ('backup_data', 'no', ("don't back up", 'no backup', 'never back up')),
+)
+
+# Words before a cue that are checked for a negation ("I never reuse passwords")
+CUE_NEGATION_WINDOW = 4
+
+_CLAUSE_BREAKS = re.compile(r"[.,;:!?]|\bbut\b|\bbecause\b|\balthough\b")
+
+_YES = ('yes', 'y', 'always', 'usually', 'often', 'sometimes', 'true')
+_NO = ('no', 'n', 'never', 'rarely', 'false', 'none')
+
+
+def yes_no_value(answer):
+    """
+    Read a follow-up answer as a yes/no slot value
+
+    Returns:
+        str: 'yes' or 'no', or None when the answer is neither
+    """
+    words = str(answer).strip().lower().replace(',', ' ').replace('.', ' ').split()
+    if not words:
+        return None
+    if words[0] in _YES:
+        return 'yes'
+    if words[0] in _NO:
+        return 'no'
+    return None
+
+
+def _negation_in(words):
+    return any(word in NEGATIONS or word.endswith("n't") for word in words)
+
+
+def is_negated(question_text):
+    """True when a question contains a negation (see NEGATIONS)"""
+    return _negation_in(question_text.lower().replace('?', ' ').replace(',', ' ').replace('.', ' ').split())
+
+
+def _cue_negated(text, start):
+    """Whether a negation is among the CUE_NEGATION_WINDOW words before text[start] in its clause"""
+    clause = _CLAUSE_BREAKS.split(text[:start])[-1]
+    return _negation_in(clause.split()[-CUE_NEGATION_WINDOW:])
+
+
+def issue_cue_found(text, phrases):
+    """Whether any phrase occurs in the (lowercase) issue text without a negation before it"""
+    for phrase in phrases:
+        start = text.find(phrase)
+        while start != -1:
+            if not _cue_negated(text, start):
+                return True
+            start = text.find(phrase, start + 1)
+    return False
+
+
+def slot_for_question(question_text):
+    """
+    Profile field an untagged follow-up question asks about (see SLOT_KEYWORDS)
+
+    Returns:
+        str: The field, or None when no phrase matches or the question is negated
+    """
+    text = question_text.lower()
+    if is_negated(text):
+        return None
+    for field, keywords in SLOT_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return field
+    return None
+
+
+def question_slot(question):
+    """
+    Profile field a follow-up question answers, and whether "Yes" means 'no'
+
+    Questions tagged by Gemini with 'slot' and 'polarity' are mapped by their
+    tags; a question tagged with no slot (or an unknown one) is not mapped.
+    Untagged questions fall back to slot_for_question.
+
+    Returns:
+        tuple: (field, inverted), or None
+    """
+    if 'slot' in question:
+        field = question.get('slot')
+        polarity = question.get('polarity', 'positive')
+        if field not in YES_NO_SLOTS or polarity not in POLARITIES:
+            return None
+        return field, polarity == 'negative'
+    field = slot_for_question(question.get('question', ''))
+    return (field, False) if field is not None else None
+
+
+def profile_from_followups(questions, answers, issue_text=''):
+    """
+    Map AI-generated follow-up questions and their answers onto user-profile slots
+
+    Args:
+        questions (list): Follow-up question dicts with 'id' and 'question',
+            optionally tagged with 'slot' and 'polarity'
+        answers (dict): Answers by question id
+        issue_text (str): The user's description of the issue
+
+    Returns:
+        dict: Profile fields that could be read off the answers; fields that
+        were not asked about are left out (unknown to the rules)
+    """
+    profile = {}
+    for question in questions:
+        mapped = question_slot(question)
+        if mapped is None or mapped[0] in profile:
+            continue
+        field, inverted = mapped
+        value = yes_no_value(answers.get(question.get('id'), ''))
+        if value is not None:
+            profile[field] = ('no' if value == 'yes' else 'yes') if inverted else value
+    text = issue_text.lower()
+    for field, value, phrases in ISSUE_CUES:
+        if field not in profile and issue_cue_found(text, phrases):
+            profile[field] = value
+    return profile
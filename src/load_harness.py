@@ -0,0 +1,354 @@
+"""
+Multi-session load harness for the Streamlit app
+
+Drives N simulated users through the full issue flow concurrently, each in
+its own thread like the script threads of one ``streamlit run`` process:
+describe the issue, classify, answer every follow-up question, generate
+the report. Sessions use Streamlit's headless AppTest API and Gemini is
+replaced by src/gemini_stub.py with a configurable latency, so runs are
+offline and repeatable.
+
+AppTest installs a fresh mock Runtime and script cache for every run and
+clears the runtime afterwards, which breaks when several sessions run at
+once. While the harness is active every session shares one runtime and one
+script cache, as on a real server.
+
+Classification and the report run on the app's job queue
+(src/job_queue.py), so after those clicks a session reruns every
+poll_interval seconds until the job lands, like the page's status fragment.
+Those reruns are recorded as the "poll" step, and the time from the click
+to the result as the step's perceived wait.
+
+Every concurrency level reports per-rerun latency percentiles (overall and
+per step), perceived waits, CPU seconds and resident memory per session,
+throughput, job queue metrics and speculative report hits
+(src/speculation.py).
+ramp() runs increasing levels and finds the saturation point: the last
+level before throughput stops growing or p95 rerun latency exceeds the SLO.
+"""
+
+import contextlib
+import gc
+import logging
+import os
+import random
+import resource
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# A level saturates when throughput grows by less than this factor
+MIN_THROUGHPUT_GAIN = 1.10
+
+STEPS = ("load", "api_key", "describe", "classify", "poll", "answer", "report")
+
+# Steps whose result arrives from the job queue
+ASYNC_STEPS = ("classify", "report")
+
+
+def rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 when empty)."""
+    if not ordered:
+        return 0.0
+    rank = max(1, int(round(fraction * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _bare_mode_filter(record: logging.LogRecord) -> bool:
+    return "missing ScriptRunContext" not in record.getMessage()
+
+
+@contextlib.contextmanager
+def shared_runtime():
+    """
+    Let AppTest sessions run concurrently in one process.
+
+    Installs a single mock Runtime and script cache shared by every session
+    (the script is compiled once, as on a real server) and applies the
+    AppTest config override once for the whole block instead of per run.
+    """
+    from unittest.mock import MagicMock
+
+    import streamlit.testing.v1.app_test as app_test
+    import streamlit.testing.v1.local_script_runner as local_script_runner
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1.util import patch_config_options
+
+    class _PerRunRuntime(Runtime):
+        """Absorbs AppTest's per-run Runtime._instance assignments"""
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+
+    script_cache = ScriptCache()
+
+    saved = (app_test.Runtime, app_test.patch_config_options, app_test.ScriptCache,
+             local_script_runner.ScriptCache, Runtime._instance)
+    app_test.Runtime = _PerRunRuntime
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+    Runtime._instance = runtime
+    # Session threads are not script threads; their bare-mode warnings are noise
+    context_logger = logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context")
+    context_logger.addFilter(_bare_mode_filter)
+    try:
+        with patch_config_options({"global.appTest": True}):
+            yield runtime
+    finally:
+        (app_test.Runtime, app_test.patch_config_options, app_test.ScriptCache,
+         local_script_runner.ScriptCache, Runtime._instance) = saved
+        context_logger.removeFilter(_bare_mode_filter)
+
+
+class LoadHarness:
+    """Runs simulated users against app.py and aggregates their metrics."""
+
+    def __init__(self, app_path: str = APP_PATH, latency: float = 0.5, think_time: float = 0.0,
+                 timeout: float = 120.0, seed: int = 0, trace_memory: bool = False,
+                 poll_interval: float = 0.1):
+        """
+        Args:
+            app_path: Streamlit script to drive
+            latency: Simulated seconds per Gemini request
+            think_time: Seconds a user pauses between interactions
+            timeout: Seconds allowed per rerun
+            seed: Seed for the follow-up answers users pick
+            trace_memory: Also measure the Python heap per session with
+                tracemalloc (accurate, but slows every rerun down)
+            poll_interval: Seconds between reruns while a job is pending
+        """
+        self.app_path = app_path
+        self.latency = latency
+        self.think_time = think_time
+        self.timeout = timeout
+        self.seed = seed
+        self.trace_memory = trace_memory
+        self.poll_interval = poll_interval
+
+    def _answer(self, at, question: Dict[str, Any], rng: random.Random):
+        key = f"followup_{question['id']}"
+        q_type = question.get("type", "text")
+        if q_type == "yes_no":
+            at.radio(key=key).set_value(rng.choice(["Yes", "No"]))
+        elif q_type == "choice" and question.get("options"):
+            at.selectbox(key=key).set_value(rng.choice(question["options"]))
+        else:
+            at.text_input(key=key).input(f"answer {rng.randint(0, 10 ** 6)}")
+
+    def run_session(self, index: int, level: int = 0) -> Tuple[Any, List[Tuple[str, float]], Dict[str, float]]:
+        """
+        One user through the whole flow.
+
+        Args:
+            index: Session number (makes the issue text and answers unique)
+            level: Concurrency level (part of the issue text, so levels do
+                not reuse each other's cached reports)
+
+        Returns:
+            (AppTest, [(step, rerun seconds), ...], {async step: perceived wait})
+
+        Raises:
+            RuntimeError: If the app raised, a job did not finish within
+                timeout or no report was rendered
+        """
+        from streamlit.testing.v1 import AppTest
+
+        rng = random.Random(self.seed * 1_000_003 + level * 10_007 + index)
+        timings = []
+        waits = {}
+
+        def rerun(step, element=None):
+            if timings and self.think_time:
+                time.sleep(self.think_time)
+            start = time.perf_counter()
+            if element is None:
+                target.run(timeout=self.timeout)
+            else:
+                element.run(timeout=self.timeout)
+            timings.append((step, time.perf_counter() - start))
+            if target.exception:
+                raise RuntimeError(f"session {index} failed at {step}: {target.exception[0].value}")
+
+        def await_job(step, done):
+            start = time.perf_counter() - timings[-1][1]
+            deadline = time.monotonic() + self.timeout
+            while not done():
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"session {index}: {step} job did not finish")
+                time.sleep(self.poll_interval)
+                start_poll = time.perf_counter()
+                target.run(timeout=self.timeout)
+                timings.append(("poll", time.perf_counter() - start_poll))
+                if target.exception:
+                    raise RuntimeError(f"session {index} failed polling {step}: {target.exception[0].value}")
+            waits[step] = time.perf_counter() - start
+
+        target = AppTest.from_file(self.app_path, default_timeout=self.timeout)
+        rerun("load")
+        rerun("api_key", target.sidebar.text_input[0].input(f"load-test-key-{index % 4}"))
+        rerun("describe", target.text_area(key="issue_input").input(
+            f"My email was in a breach and I reuse passwords (level {level}, user {index})"))
+        rerun("classify", target.button[0].click())
+        await_job("classify", lambda: target.session_state.issue_classified)
+        for question in target.session_state.followup_questions:
+            self._answer(target, question, rng)
+            rerun("answer")
+        generate = next((b for b in target.button if "Generate" in b.label), None)
+        if generate is None:
+            raise RuntimeError(f"session {index}: no Generate button after the follow-ups")
+        rerun("report", generate.click())
+        if not target.session_state.report_generated:
+            raise RuntimeError(f"session {index}: report was not generated")
+        await_job("report", lambda: target.session_state.final_report is not None)
+        return target, timings, waits
+
+    def run_level(self, sessions: int, level: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Run ``sessions`` users at once (inside shared_runtime()).
+
+        Returns:
+            Dict with sessions, errors, wall_seconds, reruns, rerun latency
+            percentiles (p50/p90/p95/p99/max), per-step p50/p95,
+            wait (per async step p50/p95 of the perceived wait), jobs
+            (job queue stats for the level), speculation (speculative
+            report stats for the level),
+            cpu_seconds_per_session, rss_bytes_per_session (growth of the
+            resident set, 0 when freed memory was reused),
+            heap_bytes_per_session (None unless trace_memory),
+            sessions_per_second and reruns_per_second
+        """
+        from src.gemini_pool import GEMINI_POOL
+        from src.gemini_stub import stub_factory
+        from src.job_queue import JOB_QUEUE
+        from src.speculation import SPECULATION
+        from src.report_cache import REPORT_CACHE
+
+        level = sessions if level is None else level
+        saved_factory = GEMINI_POOL.factory
+        GEMINI_POOL.factory = stub_factory(self.latency)
+        GEMINI_POOL.clear()
+        REPORT_CACHE.clear()
+
+        results: List[Any] = [None] * sessions
+        errors: List[str] = []
+
+        def user(index):
+            try:
+                results[index] = self.run_session(index, level)
+            except Exception as exc:
+                errors.append(str(exc))
+
+        JOB_QUEUE.reset_stats()
+        SPECULATION.reset()
+        gc.collect()
+        if self.trace_memory:
+            tracemalloc.start()
+        rss_before = rss_bytes()
+        cpu_before = time.process_time()
+        start = time.perf_counter()
+        threads = [threading.Thread(target=user, args=(i,), name=f"load-session-{i}", daemon=True)
+                   for i in range(sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+        cpu = time.process_time() - cpu_before
+        gc.collect()
+        # Sessions are still referenced by results, so this is their footprint
+        rss_after = rss_bytes()
+        heap = None
+        if self.trace_memory:
+            heap = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+        GEMINI_POOL.factory = saved_factory
+        GEMINI_POOL.clear()
+        jobs = JOB_QUEUE.stats()
+
+        finished = [r for r in results if r is not None]
+        latencies = sorted(seconds for _, timings, _ in finished for _, seconds in timings)
+        per_step = {}
+        for step in STEPS:
+            samples = sorted(s for _, timings, _ in finished for name, s in timings if name == step)
+            if samples:
+                per_step[step] = {"p50": percentile(samples, 0.50), "p95": percentile(samples, 0.95)}
+        wait = {}
+        for step in ASYNC_STEPS:
+            samples = sorted(waits[step] for _, _, waits in finished if step in waits)
+            if samples:
+                wait[step] = {"p50": percentile(samples, 0.50), "p95": percentile(samples, 0.95)}
+        completed = max(len(finished), 1)
+        return {
+            "sessions": sessions,
+            "completed": len(finished),
+            "errors": errors,
+            "wall_seconds": wall,
+            "reruns": len(latencies),
+            "p50": percentile(latencies, 0.50),
+            "p90": percentile(latencies, 0.90),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else 0.0,
+            "per_step": per_step,
+            "wait": wait,
+            "jobs": jobs,
+            "speculation": SPECULATION.stats(),
+            "cpu_seconds_per_session": cpu / completed,
+            "rss_bytes_per_session": max(rss_after - rss_before, 0) / completed,
+            "heap_bytes_per_session": heap / completed if heap is not None else None,
+            "sessions_per_second": len(finished) / wall if wall else 0.0,
+            "reruns_per_second": len(latencies) / wall if wall else 0.0,
+        }
+
+    def ramp(self, levels: Iterable[int], slo: float = 2.0) -> Dict[str, Any]:
+        """
+        Run increasing concurrency levels and locate the saturation point.
+
+        Args:
+            levels: Concurrent session counts, run in increasing order
+            slo: p95 rerun latency budget in seconds
+
+        Returns:
+            Dict with 'levels' (run_level results), 'saturation' (last level
+            that still scaled within the SLO, or None if even the first
+            level broke it) and 'reason' (what stopped the ramp, or None if
+            every level scaled)
+        """
+        results = []
+        saturation, reason = None, None
+        with shared_runtime():
+            # One unmeasured user pays for module imports and script compilation
+            self.run_level(1, level=0)
+            for sessions in sorted(set(levels)):
+                result = self.run_level(sessions)
+                results.append(result)
+                if result["errors"]:
+                    reason = f"{len(result['errors'])} failed sessions at {sessions}"
+                elif result["p95"] > slo:
+                    reason = f"p95 rerun latency {result['p95']:.2f}s > {slo:.2f}s at {sessions}"
+                elif saturation is not None and result["sessions_per_second"] < \
+                        MIN_THROUGHPUT_GAIN * results[-2]["sessions_per_second"]:
+                    reason = f"throughput stopped growing at {sessions}"
+                if reason:
+                    break
+                saturation = sessions
+        return {"levels": results, "saturation": saturation, "reason": reason}
@@ -0,0 +1,144 @@
+"""
+Deterministic issue reports from the local rule engine
+
+Builds the Step 4 report without Gemini. The issue's follow-up answers are
+mapped onto user-profile slots (knowledge_base_mapper.profile_from_followups)
+and run through InferenceEngine. The rules that fire become the report's
+actions, and rules in the issue's category that the answers leave open
+become steps to check. The report has the same keys as
+IssueClassifier.generate_report plus "source": "local", so the app renders
+both the same way. It is used for confidently classified standard
+categories, and whenever Gemini is unavailable.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from src.inference_engine import InferenceEngine
+from src.knowledge_base_mapper import get_rules, profile_from_followups, recommendation_from_rule, rule_matches
+from src.utils import calculate_risk_level, sort_recommendations
+
+# Issue categories with knowledge base coverage, and the KB categories they cover
+CATEGORY_KB = {
+    "password_security": ("Password Security",),
+    "account_security": ("Account Security", "Password Security"),
+    "network_security": ("Network Security",),
+    "device_security": ("Device Security",),
+    "data_protection": ("Data Protection",),
+    "communication_security": ("Communication Security",),
+    "privacy_settings": ("Privacy Settings",),
+    "social_media": ("Social Media Privacy",),
+}
+
+# Minimum classification confidence for skipping Gemini
+LOCAL_CONFIDENCE = 0.8
+
+TOOLS_BY_RULE = {
+    "password-reuse-rule": ("Bitwarden", "1Password", "KeePassXC"),
+    "no-password-manager-rule": ("Bitwarden", "1Password", "KeePassXC"),
+    "no-two-factor-rule": ("An authenticator app (Aegis, Google Authenticator)", "A hardware security key (YubiKey)"),
+    "public-wifi-no-vpn-rule": ("Mullvad VPN", "Proton VPN"),
+    "no-vpn-rule": ("Mullvad VPN", "Proton VPN"),
+    "no-os-update-rule": ("Automatic OS updates",),
+    "excessive-permissions-rule": ("Your phone's permission manager",),
+    "many-social-media-rule": ("Each platform's privacy checkup",),
+    "no-backup-rule": ("An external drive with scheduled backups", "An end-to-end encrypted cloud backup"),
+    "no-email-encryption-rule": ("Proton Mail", "Thunderbird with OpenPGP"),
+}
+
+
+def use_local_report(classification: Dict[str, Any], threshold: Optional[float] = LOCAL_CONFIDENCE) -> bool:
+    """
+    Whether a classification is confident and standard enough to skip Gemini.
+
+    Args:
+        classification: Result of IssueClassifier.classify_issue
+        threshold: Minimum "confidence" (None never skips Gemini)
+
+    Returns:
+        True for a KB-covered category with confidence >= threshold
+    """
+    if threshold is None or "error" in classification:
+        return False
+    if classification.get("primary_category") not in CATEGORY_KB:
+        return False
+    try:
+        return float(classification.get("confidence", 0)) >= threshold
+    except (TypeError, ValueError):
+        return False
+
+
+def _step(rec: Dict[str, Any]) -> Dict[str, str]:
+    return {"priority": rec["priority"], "action": rec["action"], "why": rec["details"]}
+
+
+def local_report(issue_data: Dict[str, Any], error: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Report for an issue built from the knowledge base alone.
+
+    Args:
+        issue_data: Dict with user_issue, classification, followup_answers
+            and (for slot mapping) followup_questions
+        error: Why Gemini was not used, when it failed; it is kept under
+            "error" so the report is not memoized and Gemini is retried
+
+    Returns:
+        Dict in the generate_report schema plus source, risk_score,
+        risk_level, rules (fired rule ids) and profile (mapped slots)
+    """
+    classification = issue_data.get("classification") or {}
+    profile = profile_from_followups(
+        issue_data.get("followup_questions", []),
+        issue_data.get("followup_answers", {}),
+        issue_data.get("user_issue", "") or "",
+    )
+    fired, score = InferenceEngine().process(profile)
+    fired = sort_recommendations(fired)
+    fired_ids = {rec["rule"] for rec in fired}
+    level = calculate_risk_level(score)
+
+    # Rules of this category the answers neither confirmed nor ruled out
+    kb_categories = CATEGORY_KB.get(classification.get("primary_category"), ())
+    open_recs = sort_recommendations([
+        recommendation_from_rule(rule) for name, rule in get_rules().items()
+        if name not in fired_ids and rule["category"] in kb_categories and rule_matches(rule, profile) is None
+    ])
+
+    immediate = [_step(rec) for rec in fired if rec["priority"] == "high"]
+    medium = [_step(rec) for rec in fired if rec["priority"] != "high"]
+    medium += [dict(_step(rec), action=f"Check: {rec['action']}") for rec in open_recs]
+
+    tools: List[str] = []
+    for rec in fired + open_recs:
+        tools.extend(tool for tool in TOOLS_BY_RULE.get(rec["rule"], ()) if tool not in tools)
+
+    summary = classification.get("summary", "")
+    if fired:
+        analysis = (f"{summary} Based on your answers, {len(fired)} knowledge base rule(s) apply, "
+                    f"adding {score} risk points ({level.lower()} risk).").strip()
+    else:
+        analysis = (f"{summary} None of the knowledge base rules were confirmed by your answers; "
+                    "the steps below cover the checks that matter most for this kind of issue.").strip()
+
+    timeline = []
+    if immediate:
+        timeline.append(f"Today: {'; '.join(step['action'] for step in immediate)}.")
+    if medium:
+        timeline.append(f"Within the next month: {'; '.join(step['action'] for step in medium)}.")
+
+    report = {
+        "analysis": analysis,
+        "root_causes": [rec["message"] for rec in fired] or list(classification.get("key_concerns", [])),
+        "immediate_actions": immediate,
+        "medium_term_steps": medium,
+        "tools_recommended": tools,
+        "timeline": " ".join(timeline),
+        "faq": [],
+        "source": "local",
+        "risk_score": score,
+        "risk_level": level,
+        "rules": [rec["rule"] for rec in fired],
+        "profile": profile,
+    }
+    if error is not None:
+        report["error"] = error
+    return report
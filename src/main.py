@@ -3,20 +3,27 @@ Main entry point for Digital Privacy Advisor expert system.
 Provides a chat-like conversational interface for privacy assessment.
 """
 
+import argparse
 import sys
 import os
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.inference_engine import InferenceEngine
-from src.chat_interface import ChatInterface
-
 
 def main():
     """Run the privacy advisor as an interactive chat."""
+    parser = argparse.ArgumentParser(description="Digital Privacy Advisor - privacy assessment chat")
+    parser.add_argument("--goal", action="store_true",
+                        help="only ask questions that can still change your result")
+    args = parser.parse_args()
+
+    # Imported after argument parsing so --help does not load the engine
+    from src.inference_engine import InferenceEngine
+    from src.chat_interface import ChatInterface
+
     engine = InferenceEngine()
-    chat = ChatInterface(engine)
+    chat = ChatInterface(engine, goal_driven=args.goal)
     success = chat.run()
     return 0 if success else 1
 
@@ -2,12 +2,82 @@
 Output handler for processing and formatting recommendations
 """
 
-from src.utils import sort_recommendations, calculate_risk_level
+from src.utils import calculate_risk_level
+
+PRIORITIES = ('high', 'medium', 'low')
+
+
+class ResultsSummary:
+    """
+    Recommendations grouped by priority, plus summary statistics
+
+    Built in a single pass over the recommendations; each priority bucket is
+    ordered by descending risk score. Recommendations with a missing or
+    unknown priority go into a trailing ``other`` bucket, after every low
+    one, as utils.sort_recommendations ranks them. The Streamlit app, the
+    CLI chat and the tkinter GUI all render from this object, so they show
+    recommendations in the same order.
+    """
+
+    def __init__(self, recommendations, risk_score):
+        """
+        Args:
+            recommendations (list): Raw recommendations from the inference engine
+            risk_score (int): Total risk score
+        """
+        buckets = {priority: [] for priority in PRIORITIES}
+        other = []
+        for rec in recommendations:
+            buckets.get(rec.get('priority'), other).append(rec)
+        buckets['other'] = other
+        for bucket in buckets.values():
+            bucket.sort(key=lambda r: -r.get('risk_score', 0))
+
+        self.high = buckets['high']
+        self.medium = buckets['medium']
+        self.low = buckets['low']
+        self.other = other
+        self.risk_score = risk_score
+        self.risk_level = calculate_risk_level(risk_score)
+
+    @property
+    def recommendations(self):
+        """All recommendations, high priority first and unknown priorities last"""
+        return self.high + self.medium + self.low + self.other
+
+    def buckets(self):
+        """
+        Non-empty priority buckets in display order
+
+        Returns:
+            list: (priority, recommendations) tuples
+        """
+        return [(p, recs) for p, recs in zip(PRIORITIES + ('other',), (self.high, self.medium, self.low, self.other))
+                if recs]
+
+    @property
+    def total(self):
+        return len(self.high) + len(self.medium) + len(self.low) + len(self.other)
+
+    @property
+    def stats(self):
+        """Summary statistics in the format of OutputHandler.get_summary_stats"""
+        return {
+            'total': self.total,
+            'high_priority': len(self.high),
+            'medium_priority': len(self.medium),
+            # Missing priorities have always been counted as low
+            'low_priority': len(self.low) + len(self.other),
+            'risk_score': self.risk_score,
+            'risk_level': self.risk_level
+        }
+
 
 class OutputHandler:
     """Handles output processing and formatting"""
     
     def __init__(self):
+        self.summary = ResultsSummary([], 0)
         self.recommendations = []
         self.risk_score = 0
         self.risk_level = "Low"
@@ -23,9 +93,10 @@ class OutputHandler:
         Returns:
             tuple: (sorted_recommendations, risk_level)
         """
-        self.recommendations = sort_recommendations(recommendations)
+        self.summary = ResultsSummary(recommendations, risk_score)
+        self.recommendations = self.summary.recommendations
         self.risk_score = risk_score
-        self.risk_level = calculate_risk_level(risk_score)
+        self.risk_level = self.summary.risk_level
         
         return self.recommendations, self.risk_level
     
@@ -36,16 +107,4 @@ class OutputHandler:
         Returns:
             dict: Summary stats
         """
-        priority_counts = {'high': 0, 'medium': 0, 'low': 0}
-        for rec in self.recommendations:
-            priority = rec.get('priority', 'low')
-            priority_counts[priority] += 1
-        
-        return {
-            'total': len(self.recommendations),
-            'high_priority': priority_counts['high'],
-            'medium_priority': priority_counts['medium'],
-            'low_priority': priority_counts['low'],
-            'risk_score': self.risk_score,
-            'risk_level': self.risk_level
-        }
+        return self.summary.stats
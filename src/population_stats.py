@@ -0,0 +1,236 @@
+"""
+Incremental population statistics for assessment results
+
+PopulationAggregator keeps an exact histogram of risk scores (scores are
+small integers), counts per risk level and per-rule hit counts. Updates are
+O(1), percentile lookups are O(1) against a cumulative table that is rebuilt
+lazily, and two aggregators merge by adding their counters, so each process
+can keep its own and combine them later.
+"""
+
+import json
+import os
+import threading
+
+from src.inference_engine import RULE_IDS, rule_hit_mask
+from src.results_store import RISK_LEVELS
+from src.utils import calculate_risk_level
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+# Scores at or above this value share the last histogram bin
+MAX_TRACKED_SCORE = 255
+
+
+class PopulationAggregator:
+    """Mergeable risk-score histogram, risk-level counts and rule hit counts"""
+
+    def __init__(self):
+        self.score_counts = [0] * (MAX_TRACKED_SCORE + 1)
+        self.level_counts = dict.fromkeys(RISK_LEVELS, 0)
+        self.rule_counts = dict.fromkeys(RULE_IDS, 0)
+        self.total = 0
+        self._cumulative = None
+        self._lock = threading.Lock()
+
+    def observe(self, result):
+        """
+        Add one analysis result
+
+        Args:
+            result (dict): Result from AppController.run_analysis
+        """
+        self.observe_values(result['risk_score'], rule_hit_mask(result['recommendations']))
+
+    def observe_values(self, risk_score, rule_hits, count=1):
+        """
+        Add ``count`` assessments with the same score and rule-hit mask
+
+        Args:
+            risk_score (int): Total risk score
+            rule_hits (int): Rule-hit bitmask (see inference_engine.rule_hit_mask)
+            count (int): Number of assessments; negative to remove them
+        """
+        score = min(max(int(risk_score), 0), MAX_TRACKED_SCORE)
+        with self._lock:
+            self.score_counts[score] += count
+            self.level_counts[calculate_risk_level(risk_score)] += count
+            for idx, rule in enumerate(RULE_IDS):
+                if rule_hits >> idx & 1:
+                    self.rule_counts[rule] += count
+            self.total += count
+            self._cumulative = None
+
+    def observe_store(self, store):
+        """
+        Add every assessment in a ResultsStore (batch backfill)
+
+        Args:
+            store (ResultsStore): Store to read risk scores and rule hits from
+        """
+        for chunk in store.scan(['risk_score', 'rule_hits']):
+            if np is None:
+                for score, mask in zip(chunk['risk_score'], chunk['rule_hits']):
+                    self.observe_values(int(score), int(mask))
+                continue
+
+            scores = np.minimum(chunk['risk_score'], MAX_TRACKED_SCORE)
+            score_counts = np.bincount(scores, minlength=MAX_TRACKED_SCORE + 1)
+            with self._lock:
+                for score in np.flatnonzero(score_counts):
+                    count = int(score_counts[score])
+                    self.score_counts[score] += count
+                    self.level_counts[calculate_risk_level(int(score))] += count
+                for idx, rule in enumerate(RULE_IDS):
+                    self.rule_counts[rule] += int(np.count_nonzero(chunk['rule_hits'] & (1 << idx)))
+                self.total += len(scores)
+                self._cumulative = None
+
+    def _cumulative_counts(self):
+        """Counts of assessments scoring strictly below each score"""
+        cumulative = self._cumulative
+        if cumulative is None:
+            with self._lock:
+                cumulative = [0] * (len(self.score_counts) + 1)
+                for score, count in enumerate(self.score_counts):
+                    cumulative[score + 1] = cumulative[score] + count
+                self._cumulative = cumulative
+        return cumulative
+
+    def share_below(self, risk_score):
+        """
+        Fraction of observed assessments with a lower risk score
+
+        A result of 0.7 means "your risk score is worse than 70% of users".
+
+        Args:
+            risk_score (int): Score to rank
+
+        Returns:
+            float: Share in [0, 1]; 0.0 when nothing has been observed
+        """
+        if self.total <= 0:
+            return 0.0
+        score = min(max(int(risk_score), 0), MAX_TRACKED_SCORE)
+        return self._cumulative_counts()[score] / self.total
+
+    def quantile(self, q):
+        """
+        Smallest risk score with at least ``q`` of the population at or below it
+
+        Args:
+            q (float): Quantile in [0, 1]
+
+        Returns:
+            int: Risk score (0 when nothing has been observed)
+        """
+        if self.total <= 0:
+            return 0
+        cumulative = self._cumulative_counts()
+        target = q * self.total
+        # Binary search over a fixed-size table keeps this constant time
+        lo, hi = 0, len(self.score_counts) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if cumulative[mid + 1] >= target:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def rule_hit_rates(self):
+        """
+        Share of assessments in which each rule fired
+
+        Returns:
+            dict: Rule id -> hit rate
+        """
+        if self.total <= 0:
+            return dict.fromkeys(RULE_IDS, 0.0)
+        return {rule: count / self.total for rule, count in self.rule_counts.items()}
+
+    def merge(self, other):
+        """
+        Add another aggregator's counts into this one
+
+        Args:
+            other (PopulationAggregator): Aggregator to merge
+
+        Returns:
+            PopulationAggregator: self
+        """
+        with self._lock:
+            for score, count in enumerate(other.score_counts):
+                self.score_counts[score] += count
+            for level, count in other.level_counts.items():
+                self.level_counts[level] = self.level_counts.get(level, 0) + count
+            for rule, count in other.rule_counts.items():
+                self.rule_counts[rule] = self.rule_counts.get(rule, 0) + count
+            self.total += other.total
+            self._cumulative = None
+        return self
+
+    def to_dict(self):
+        """Serialize counters to a JSON-compatible dict"""
+        with self._lock:
+            return {
+                'total': self.total,
+                'score_counts': list(self.score_counts),
+                'level_counts': dict(self.level_counts),
+                'rule_counts': dict(self.rule_counts),
+            }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild an aggregator from to_dict() output"""
+        aggregator = cls()
+        counts = data.get('score_counts', [])
+        for score, count in enumerate(counts[:MAX_TRACKED_SCORE + 1]):
+            aggregator.score_counts[score] = count
+        aggregator.score_counts[MAX_TRACKED_SCORE] += sum(counts[MAX_TRACKED_SCORE + 1:])
+        aggregator.level_counts.update(data.get('level_counts', {}))
+        aggregator.rule_counts.update(data.get('rule_counts', {}))
+        aggregator.total = data.get('total', 0)
+        return aggregator
+
+    def save(self, path):
+        """
+        Persist counters as JSON, replacing the file atomically
+
+        Args:
+            path (str): Destination file
+        """
+        tmp_path = f'{path}.tmp{os.getpid()}'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load counters saved with save(); a missing file gives an empty aggregator
+
+        Args:
+            path (str): File written by save()
+        """
+        try:
+            with open(path, encoding='utf-8') as f:
+                return cls.from_dict(json.load(f))
+        except FileNotFoundError:
+            return cls()
+
+    @classmethod
+    def merge_files(cls, paths):
+        """
+        Combine aggregators persisted by several processes
+
+        Args:
+            paths (list): Files written by save()
+        """
+        merged = cls()
+        for path in paths:
+            merged.merge(cls.load(path))
+        return merged
@@ -0,0 +1,276 @@
+"""
+Assessment question graph shared by the Streamlit, CLI and tkinter frontends
+
+All questions live in data/questions.json: text, options, dependencies,
+follow-ups and display conditions written as small expressions over earlier
+answers (e.g. ``two_factor == 'no'``). Loading compiles each condition once
+into a plain Python predicate and freezes everything into an immutable
+QuestionSet, cached by the file's content hash. Per-frontend wording and
+ordering come from each question's "frontends" section; questions marked
+``"graph": false`` are only asked by the fixed-form frontends.
+
+The Streamlit flow uses the adaptive QuestionGraph, which keeps a reverse
+index from each question to the questions that depend on it, so finding the
+next question only looks at questions whose dependencies were just answered
+(plus the handful without dependencies) instead of every condition.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+QUESTIONS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'questions.json'
+)
+
+FRONTENDS = ('cli', 'tkinter')
+
+# Expression nodes allowed in conditions: comparisons of answers against
+# literals combined with and/or/not
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not,
+    ast.Compare, ast.Eq, ast.NotEq, ast.In, ast.NotIn,
+    ast.Name, ast.Load, ast.Constant, ast.List, ast.Tuple,
+)
+
+
+def compile_condition(source: str) -> Tuple[Callable[[Dict[str, Any]], bool], Tuple[str, ...]]:
+    """
+    Compile a condition expression into a predicate over the answers.
+
+    Names refer to answers (``data.get(name)``); only literals, comparisons
+    (==, !=, in, not in) and and/or/not are allowed.
+
+    Args:
+        source: Expression such as ``"vpn == 'no' or public_wifi == 'yes'"``
+
+    Returns:
+        (predicate, names read by the expression)
+
+    Raises:
+        ValueError: If the expression uses anything else
+    """
+    try:
+        tree = ast.parse(source, mode='eval')
+    except SyntaxError as exc:
+        raise ValueError(f"Invalid condition {source!r}: {exc.msg}") from None
+
+    names = []
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in condition {source!r}: {type(node).__name__}")
+        if isinstance(node, ast.Name) and node.id not in names:
+            names.append(node.id)
+
+    class _AnswerLookup(ast.NodeTransformer):
+        def visit_Name(self, node):
+            lookup = ast.Call(
+                func=ast.Attribute(value=ast.Name(id='data', ctx=ast.Load()), attr='get', ctx=ast.Load()),
+                args=[ast.Constant(value=node.id)],
+                keywords=[],
+            )
+            return ast.copy_location(lookup, node)
+
+    body = _AnswerLookup().visit(tree).body
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg(arg='data')], kwonlyargs=[],
+                              kw_defaults=[], defaults=[])
+    expression = ast.fix_missing_locations(ast.Expression(body=ast.Lambda(args=arguments, body=body)))
+    predicate = eval(compile(expression, f'<condition {source}>', 'eval'), {'__builtins__': {}})
+    return predicate, tuple(names)
+
+
+def _freeze(question: Dict[str, Any]) -> Mapping[str, Any]:
+    frozen = dict(question)
+    if "options" in frozen:
+        frozen["options"] = tuple(frozen["options"])
+    depends_on = frozen.get("depends_on")
+    if isinstance(depends_on, str):
+        depends_on = [depends_on]
+    frozen["depends_on"] = tuple(depends_on) if depends_on is not None else None
+    frozen["follow_ups"] = MappingProxyType(
+        {answer: tuple(keys) for answer, keys in frozen.get("follow_ups", {}).items()}
+    )
+    return MappingProxyType(frozen)
+
+
+class QuestionGraph:
+    """Immutable, indexed form of the question definitions."""
+
+    def __init__(self, definitions: Dict[str, Dict[str, Any]], initial_questions=()):
+        """
+        Index question definitions.
+
+        Args:
+            definitions: Question key -> question dict (category, question,
+                type, options, depends_on, condition predicate, follow_ups)
+            initial_questions: Questions offered before any answer
+        """
+        self.initial_questions: Tuple[str, ...] = tuple(initial_questions)
+        self.questions: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+            {key: _freeze(question) for key, question in definitions.items()}
+        )
+        self.order: Tuple[str, ...] = tuple(self.questions)
+        self.position: Mapping[str, int] = MappingProxyType(
+            {key: idx for idx, key in enumerate(self.order)}
+        )
+        self.roots: Tuple[int, ...] = tuple(
+            idx for idx, key in enumerate(self.order) if self.questions[key]["depends_on"] is None
+        )
+        dependents: Dict[str, List[int]] = {}
+        for idx, key in enumerate(self.order):
+            for dep in self.questions[key]["depends_on"] or ():
+                dependents.setdefault(dep, []).append(idx)
+        self.dependents: Mapping[str, Tuple[int, ...]] = MappingProxyType(
+            {dep: tuple(positions) for dep, positions in dependents.items()}
+        )
+
+    def _eligible(self, key: str, user_data: Dict[str, Any]) -> bool:
+        question = self.questions[key]
+        depends_on = question["depends_on"]
+        if depends_on is not None and not all(dep in user_data for dep in depends_on):
+            return False
+        condition = question.get("condition")
+        return condition is None or bool(condition(user_data))
+
+    def next_questions(self, user_data: Dict[str, Any]) -> List[str]:
+        """
+        Determine the next question from the answers given so far.
+
+        The first unanswered follow-up of the latest answer wins; otherwise
+        the first question (in definition order) whose dependencies are all
+        answered and whose condition holds.
+
+        Args:
+            user_data: Answers so far, in the order they were given
+
+        Returns:
+            List of at most one question key (initial_questions before any answer)
+        """
+        if not user_data:
+            return list(self.initial_questions)
+
+        last_key = next(reversed(user_data))
+        question = self.questions.get(last_key)
+        if question is not None:
+            for follow_up in question["follow_ups"].get(user_data[last_key], ()):
+                if follow_up not in user_data:
+                    return [follow_up]
+
+        # Only roots and questions depending on an answered key can be eligible
+        candidates = set(self.roots)
+        for key in user_data:
+            candidates.update(self.dependents.get(key, ()))
+        for idx in sorted(candidates):
+            key = self.order[idx]
+            if key not in user_data and self._eligible(key, user_data):
+                return [key]
+        return []
+
+
+class QuestionSet:
+    """Compiled question file: every question, the adaptive graph and frontend views."""
+
+    def __init__(self, document: Dict[str, Any], digest: str):
+        """
+        Compile a parsed question file.
+
+        Args:
+            document: Parsed data/questions.json
+            digest: Content hash of the file
+
+        Raises:
+            ValueError: On unknown question references or invalid conditions
+        """
+        self.digest = digest
+        self.version = document.get('version', 1)
+        definitions = {}
+        for entry in document['questions']:
+            question = {name: value for name, value in entry.items() if name != 'frontends'}
+            if 'condition' in question:
+                source = question['condition']
+                question['condition'], question['condition_reads'] = compile_condition(source)
+                question['condition_source'] = source
+            definitions[entry['key']] = question
+
+        for key, question in definitions.items():
+            referenced = list(question.get('depends_on') or ()) + list(question.get('condition_reads', ()))
+            for keys in question.get('follow_ups', {}).values():
+                referenced.extend(keys)
+            unknown = [ref for ref in referenced if ref not in definitions]
+            if unknown:
+                raise ValueError(f"Question {key!r} refers to unknown question(s): {', '.join(unknown)}")
+
+        self.questions: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+            {key: _freeze(question) for key, question in definitions.items()}
+        )
+        self.graph = QuestionGraph(
+            {key: q for key, q in definitions.items() if q.get('graph', True)},
+            document.get('initial_questions', ()),
+        )
+
+        views = {}
+        for frontend in FRONTENDS:
+            entries = [
+                (entry['frontends'][frontend].get('order', idx), entry['key'], entry['frontends'][frontend])
+                for idx, entry in enumerate(document['questions'])
+                if frontend in entry.get('frontends', {})
+            ]
+            views[frontend] = tuple(
+                MappingProxyType(dict(self.questions[key], **{k: v for k, v in overrides.items() if k != 'order'}))
+                for _, key, overrides in sorted(entries, key=lambda item: item[0])
+            )
+        self._views = MappingProxyType(views)
+
+    def for_frontend(self, frontend: str) -> Tuple[Mapping[str, Any], ...]:
+        """
+        Questions a fixed-form frontend asks, in its order and wording.
+
+        Args:
+            frontend: One of FRONTENDS
+
+        Returns:
+            Question mappings (with "key") merged with the frontend overrides
+        """
+        if frontend not in self._views:
+            raise ValueError(f"Unknown frontend {frontend!r}; expected one of {', '.join(FRONTENDS)}")
+        return self._views[frontend]
+
+
+_compiled: Dict[str, QuestionSet] = {}
+_compiled_lock = threading.Lock()
+
+
+def load_question_set(path: str = QUESTIONS_PATH) -> QuestionSet:
+    """
+    Load a question file, compiling it only if its content is new.
+
+    Args:
+        path: JSON question file
+
+    Returns:
+        The QuestionSet for the file's current content
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+    with _compiled_lock:
+        question_set = _compiled.get(digest)
+        if question_set is None:
+            question_set = _compiled[digest] = QuestionSet(json.loads(content), digest)
+    return question_set
+
+
+@lru_cache(maxsize=1)
+def get_question_set() -> QuestionSet:
+    """The shipped question set, loaded once per process."""
+    return load_question_set()
+
+
+def get_question_graph() -> QuestionGraph:
+    """The compiled adaptive question graph used by the Streamlit app."""
+    return get_question_set().graph
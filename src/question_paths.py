@@ -0,0 +1,335 @@
+"""
+Precomputed next-question table for the adaptive Streamlit assessment
+
+The next question only depends on which questions were asked, the latest
+answer and the answers that some still-unasked question's condition reads.
+build_path_table walks every interview the question graph allows from the
+empty state, reducing each answer state to that canonical key, and records
+the decision for it. At run time PathTable.next_questions is a single dict
+lookup; states outside the table (e.g. answers that are not one of the
+options) fall back to QuestionGraph.next_questions.
+
+Free-text answers never branch, so they are treated as a single value.
+The build also reports the longest interview, dead ends (interviews that
+end while a question is blocked on a dependency that was never asked) and
+questions no interview reaches.
+
+The table is stored in data/question_paths.bin by
+scripts/build_question_paths.py and is only used while its question-file
+hash matches data/questions.json.
+"""
+
+import json
+import os
+import struct
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.question_graph import get_question_set
+
+PATHS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'question_paths.bin'
+)
+
+_MAGIC = b'QPT1'
+_NO_QUESTION = 0xFF
+_TEXT = 0  # answer index used for every free-text answer
+
+
+class _StateCodec:
+    """Packs canonical answer states into integers for one question graph"""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.order = graph.order
+        self.position = graph.position
+        self.answers = []
+        for key in self.order:
+            question = graph.questions[key]
+            if question['type'] == 'yes_no':
+                self.answers.append(('yes', 'no'))
+            elif question['type'] == 'choice':
+                self.answers.append(tuple(question['options']))
+            else:
+                self.answers.append(None)  # free text
+        # Answers that conditions read, and the questions reading each one
+        readers: Dict[str, List[int]] = {}
+        for idx, key in enumerate(self.order):
+            for name in graph.questions[key].get('condition_reads', ()):
+                readers.setdefault(name, []).append(idx)
+        self.relevant = tuple(name for name in self.order if name in readers)
+        self.reader_masks = tuple(
+            sum(1 << idx for idx in readers[name]) for name in self.relevant
+        )
+
+        n = len(self.order)
+        max_answers = max(len(values) if values else 1 for values in self.answers)
+        self.key_bits = (n + 1).bit_length()
+        self.answer_bits = max(max_answers, 1).bit_length()
+        self.value_bits = (max_answers + 1).bit_length()
+        self.total_bits = n + self.key_bits + self.answer_bits + self.value_bits * len(self.relevant)
+        self.key_bytes = (self.total_bits + 7) // 8
+
+        # Per question: (position bit, answer -> code, relevant slot shift or None)
+        value_shift = n + self.key_bits + self.answer_bits
+        slots = {name: slot for slot, name in enumerate(self.relevant)}
+        self._fields = {}
+        for idx, key in enumerate(self.order):
+            values = self.answers[idx]
+            codes = {value: code for code, value in enumerate(values)} if values else None
+            slot = slots.get(key)
+            self._fields[key] = (
+                idx, codes, None if slot is None else value_shift + slot * self.value_bits
+            )
+        self._has_follow_ups = tuple(bool(graph.questions[key]['follow_ups']) for key in self.order)
+        self._slot_fields = tuple(
+            (reader_mask, ((1 << self.value_bits) - 1) << (value_shift + slot * self.value_bits))
+            for slot, reader_mask in enumerate(self.reader_masks)
+        )
+
+    def answer_index(self, idx, answer) -> Optional[int]:
+        values = self.answers[idx]
+        if values is None:
+            return _TEXT
+        try:
+            return values.index(answer)
+        except ValueError:
+            return None
+
+    def encode(self, asked: int, last: int, last_answer: int, values: Dict[int, int]) -> int:
+        """
+        Canonical key of a state
+
+        Args:
+            asked: Bitmask of asked question positions
+            last: Position of the latest answered question
+            last_answer: Answer index of the latest answer
+            values: Relevant-answer slot -> answer index
+        """
+        n = len(self.order)
+        key = asked | (last + 1) << n
+        if self._has_follow_ups[last]:
+            key |= last_answer << (n + self.key_bits)
+        shift = n + self.key_bits + self.answer_bits
+        for slot, reader_mask in enumerate(self.reader_masks):
+            # Only matters while some question reading it is still unasked
+            if slot in values and reader_mask & ~asked:
+                key |= (values[slot] + 1) << (shift + slot * self.value_bits)
+        return key
+
+    def state_from_answers(self, user_data: Dict[str, Any]) -> Optional[int]:
+        """Canonical key for the answers given so far, None if not representable"""
+        asked = values = 0
+        idx = code = 0
+        fields = self._fields
+        for key, answer in user_data.items():
+            field = fields.get(key)
+            if field is None:
+                return None
+            idx, codes, value_shift = field
+            if codes is None:
+                code = _TEXT
+            else:
+                code = codes.get(answer)
+                if code is None:
+                    return None
+            asked |= 1 << idx
+            if value_shift is not None:
+                values |= (code + 1) << value_shift
+        for reader_mask, field_mask in self._slot_fields:
+            if not reader_mask & ~asked:
+                values &= ~field_mask
+        n = len(self.order)
+        key = asked | (idx + 1) << n | values
+        if self._has_follow_ups[idx]:
+            key |= code << (n + self.key_bits)
+        return key
+
+
+class PathTable:
+    """Next-question decisions for every reachable answer state"""
+
+    def __init__(self, graph, decisions: Dict[int, int], digest: str = '', report: Optional[Dict] = None):
+        """
+        Args:
+            graph: QuestionGraph the table was built for
+            decisions: Canonical state -> next question position (or -1)
+            digest: Content hash of the question file
+            report: Build report (see build_path_table)
+        """
+        self.graph = graph
+        self.codec = _StateCodec(graph)
+        self.decisions = decisions
+        self.digest = digest
+        self.report = report or {}
+
+    def __len__(self):
+        return len(self.decisions)
+
+    def next_questions(self, user_data: Dict[str, Any]) -> List[str]:
+        """Same result as QuestionGraph.next_questions, from the table when possible"""
+        if not user_data:
+            return list(self.graph.initial_questions)
+        state = self.codec.state_from_answers(user_data)
+        decision = self.decisions.get(state) if state is not None else None
+        if decision is None:
+            return self.graph.next_questions(user_data)
+        return [self.graph.order[decision]] if decision >= 0 else []
+
+    def save(self, path: str = PATHS_PATH):
+        """Write the table: JSON header, then zlib-compressed fixed-width records"""
+        header = json.dumps({
+            'digest': self.digest,
+            'key_bytes': self.codec.key_bytes,
+            'states': len(self.decisions),
+            'report': self.report,
+        }, separators=(',', ':')).encode('utf-8')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_MAGIC + struct.pack('<I', len(header)) + header)
+            width = self.codec.key_bytes
+            f.write(zlib.compress(b''.join(
+                state.to_bytes(width, 'little') + bytes((_NO_QUESTION if nxt < 0 else nxt,))
+                for state, nxt in sorted(self.decisions.items())
+            ), 9))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, graph, path: str = PATHS_PATH) -> 'PathTable':
+        """
+        Read a table written by save
+
+        Raises:
+            ValueError: If the file is not a path table for this graph's encoding
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:4] != _MAGIC:
+            raise ValueError(f"{path} is not a question path table")
+        (header_len,) = struct.unpack_from('<I', data, 4)
+        header = json.loads(data[8:8 + header_len])
+        table = cls(graph, {}, header['digest'], header['report'])
+        width = header['key_bytes']
+        if width != table.codec.key_bytes:
+            raise ValueError("Question path table was built for a different question graph")
+        record = width + 1
+        body = zlib.decompress(data[8 + header_len:])
+        decisions = {}
+        for offset in range(0, len(body), record):
+            nxt = body[offset + width]
+            decisions[int.from_bytes(body[offset:offset + width], 'little')] = -1 if nxt == _NO_QUESTION else nxt
+        table.decisions = decisions
+        return table
+
+
+def build_path_table(question_set=None) -> PathTable:
+    """
+    Enumerate every reachable interview state of the adaptive graph
+
+    Args:
+        question_set: QuestionSet to build for (default: the shipped one)
+
+    Returns:
+        PathTable whose report has 'states', 'longest_path' (questions in the
+        longest interview), 'dead_ends' (final states where some question
+        can never be asked because a dependency was skipped),
+        'blocked_questions' (those questions) and 'unreachable' (questions
+        no interview asks)
+    """
+    question_set = question_set or get_question_set()
+    graph = question_set.graph
+    codec = _StateCodec(graph)
+    order = graph.order
+    full = (1 << len(order)) - 1
+
+    decisions: Dict[int, int] = {}
+    successors: Dict[int, Tuple[int, ...]] = {}
+    dead_ends: Dict[int, int] = {}
+    reached = 0
+
+    def answers_for(idx):
+        values = codec.answers[idx]
+        if values is None:
+            return [('text', _TEXT)]
+        return [(value, answer_idx) for answer_idx, value in enumerate(values)]
+
+    def step(user_data, values, asked, idx):
+        """Successor states of answering question idx, as (state, user_data, values)"""
+        out = []
+        key = order[idx]
+        for answer, answer_idx in answers_for(idx):
+            new_data = dict(user_data)
+            new_data[key] = answer
+            new_values = dict(values)
+            if key in codec.relevant:
+                new_values[codec.relevant.index(key)] = answer_idx
+            new_asked = asked | 1 << idx
+            out.append((codec.encode(new_asked, idx, answer_idx, new_values), new_data, new_values, new_asked))
+        return out
+
+    # The first answer can be any of the initial questions
+    frontier = []
+    for key in graph.initial_questions:
+        frontier.extend(step({}, {}, 0, graph.position[key]))
+    seen = set()
+    while frontier:
+        state, user_data, values, asked = frontier.pop()
+        if state in seen:
+            continue
+        seen.add(state)
+        reached |= asked
+        nxt = graph.next_questions(user_data)
+        if not nxt:
+            decisions[state] = -1
+            successors[state] = ()
+            blocked = sum(
+                1 << q for q in range(len(order))
+                if not asked >> q & 1 and not all(
+                    dep in user_data for dep in graph.questions[order[q]]['depends_on'] or ()
+                )
+            )
+            if blocked:
+                dead_ends[state] = blocked
+            continue
+        idx = graph.position[nxt[0]]
+        decisions[state] = idx
+        children = step(user_data, values, asked, idx)
+        successors[state] = tuple(child[0] for child in children)
+        frontier.extend(children)
+
+    # Longest interview: states form a DAG (each step asks a new question)
+    depth: Dict[int, int] = {}
+    for state in sorted(successors, key=lambda s: -bin(s & full).count('1')):
+        depth[state] = 1 + max((depth[child] for child in successors[state]), default=0)
+    first_states = [s for key in graph.initial_questions for s, *_ in step({}, {}, 0, graph.position[key])]
+    longest = max(depth[s] for s in first_states) if first_states else 0
+
+    missing_sets = sorted({mask for mask in dead_ends.values()})
+    report = {
+        'states': len(decisions),
+        'longest_path': longest,
+        'dead_ends': len(dead_ends),
+        'blocked_questions': [
+            [order[idx] for idx in range(len(order)) if mask >> idx & 1] for mask in missing_sets
+        ],
+        'unreachable': [order[idx] for idx in range(len(order)) if not reached >> idx & 1],
+    }
+    return PathTable(graph, decisions, question_set.digest, report)
+
+
+@lru_cache(maxsize=1)
+def get_path_table() -> Optional[PathTable]:
+    """
+    The prebuilt table for the shipped questions
+
+    Returns:
+        PathTable, or None when data/question_paths.bin is missing or was
+        built from a different question file
+    """
+    question_set = get_question_set()
+    try:
+        table = PathTable.load(question_set.graph)
+    except (OSError, ValueError):
+        return None
+    return table if table.digest == question_set.digest else None
@@ -0,0 +1,226 @@
+"""
+Compressed archive of text reports with a shared dictionary
+
+Reports produced by format_report repeat the same banner, NEXT STEPS block,
+resource links and recommendation details, so compressing them one by one
+with gzip mostly re-encodes the same text. This archive trains a preset
+dictionary on a sample of the report corpus once and compresses every report
+against it with raw deflate (zlib's ``zdict``), which needs only the standard
+library.
+
+An archive is a directory with three files:
+
+    dictionary.bin  preset dictionary (at most 32 KiB, deflate's window)
+    reports.dat     compressed reports, appended back to back
+    index.tsv       one ``id<TAB>offset<TAB>length`` line per report
+
+The index is read into memory on open, so any report can be decoded by ID
+with a single seek and read.
+"""
+
+import os
+import threading
+import zlib
+from collections import Counter
+
+# Deflate can only reference the last 32 KiB, so a longer dictionary is wasted
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+# Lines shorter than this cost more to reference than to encode
+MIN_DICTIONARY_LINE = 8
+
+COMPRESSION_LEVEL = 9
+
+# Raw deflate (no zlib header/checksum); the archive stores lengths itself
+_WBITS = -15
+
+
+def train_dictionary(samples, max_size=MAX_DICTIONARY_SIZE):
+    """
+    Build a preset dictionary from sample reports
+
+    Lines are ranked by how many samples contain them times their length;
+    the best ones are kept in their original order, so that multi-line
+    blocks such as NEXT STEPS stay contiguous in the dictionary.
+
+    Args:
+        samples (list): Sample report texts
+        max_size (int): Dictionary size limit in bytes
+
+    Returns:
+        bytes: Dictionary for ReportArchive.create
+    """
+    doc_freq = Counter()
+    first_seen = {}
+    for text in samples:
+        for line in set(text.splitlines(keepends=True)):
+            doc_freq[line] += 1
+        for line in text.splitlines(keepends=True):
+            first_seen.setdefault(line, len(first_seen))
+
+    candidates = [
+        line for line, freq in doc_freq.items()
+        if freq > 1 and len(line.strip()) >= MIN_DICTIONARY_LINE
+    ]
+    candidates.sort(key=lambda line: doc_freq[line] * len(line), reverse=True)
+
+    chosen, size = [], 0
+    for line in candidates:
+        encoded = len(line.encode('utf-8'))
+        if size + encoded > max_size:
+            continue
+        chosen.append(line)
+        size += encoded
+
+    chosen.sort(key=lambda line: first_seen[line])
+    return ''.join(chosen).encode('utf-8')
+
+
+class ReportArchive:
+    """Append-only archive of reports compressed against a shared dictionary"""
+
+    DICTIONARY_FILE = 'dictionary.bin'
+    DATA_FILE = 'reports.dat'
+    INDEX_FILE = 'index.tsv'
+
+    def __init__(self, path):
+        """
+        Open an existing archive
+
+        Args:
+            path (str): Archive directory created by ReportArchive.create
+        """
+        self.path = path
+        with open(self._file(self.DICTIONARY_FILE), 'rb') as f:
+            self.dictionary = f.read()
+        self._index = {}
+        self._lock = threading.Lock()
+        self._data = open(self._file(self.DATA_FILE), 'a+b')
+        self._load_index()
+
+    @classmethod
+    def create(cls, path, samples):
+        """
+        Create a new archive with a dictionary trained on ``samples``
+
+        Args:
+            path (str): Archive directory (must not already hold an archive)
+            samples (list): Sample report texts to train the dictionary on
+
+        Returns:
+            ReportArchive: The opened archive
+        """
+        os.makedirs(path, exist_ok=True)
+        dictionary_path = os.path.join(path, cls.DICTIONARY_FILE)
+        if os.path.exists(dictionary_path):
+            raise FileExistsError(f"Report archive already exists: {path}")
+        with open(dictionary_path, 'wb') as f:
+            f.write(train_dictionary(samples))
+        for name in (cls.DATA_FILE, cls.INDEX_FILE):
+            open(os.path.join(path, name), 'wb').close()
+        return cls(path)
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _load_index(self):
+        data_size = os.path.getsize(self._file(self.DATA_FILE))
+        with open(self._file(self.INDEX_FILE), encoding='utf-8') as f:
+            for line in f:
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) != 3:
+                    continue  # torn final line
+                report_id, offset, length = parts[0], int(parts[1]), int(parts[2])
+                if offset + length <= data_size:
+                    self._index[report_id] = (offset, length)
+
+    def compress(self, text):
+        """Compress one report against the archive dictionary"""
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, _WBITS, zdict=self.dictionary)
+        return compressor.compress(text.encode('utf-8')) + compressor.flush()
+
+    def decompress(self, blob):
+        """Decompress a blob produced by compress()"""
+        decompressor = zlib.decompressobj(_WBITS, zdict=self.dictionary)
+        return (decompressor.decompress(blob) + decompressor.flush()).decode('utf-8')
+
+    def append(self, report_id, text):
+        """
+        Add one report; a later report with the same ID replaces it
+
+        Args:
+            report_id (str): Assessment ID
+            text (str): Report text
+        """
+        self.append_many([(report_id, text)])
+
+    def append_many(self, reports):
+        """
+        Add a batch of reports with one data write and one index write
+
+        Args:
+            reports (iterable): (report_id, text) pairs
+        """
+        blobs = [(str(report_id), self.compress(text)) for report_id, text in reports]
+        for report_id, _ in blobs:
+            if '\t' in report_id or '\n' in report_id:
+                raise ValueError(f"Invalid report ID: {report_id!r}")
+
+        with self._lock:
+            self._data.seek(0, os.SEEK_END)
+            offset = self._data.tell()
+            entries, index_lines = [], []
+            for report_id, blob in blobs:
+                entries.append((report_id, (offset, len(blob))))
+                index_lines.append(f"{report_id}\t{offset}\t{len(blob)}\n")
+                offset += len(blob)
+
+            self._data.write(b''.join(blob for _, blob in blobs))
+            self._data.flush()
+            # The index is written after the data, so a crash never leaves an
+            # index entry pointing at missing bytes.
+            with open(self._file(self.INDEX_FILE), 'a', encoding='utf-8') as f:
+                f.write(''.join(index_lines))
+            self._index.update(entries)
+
+    def get(self, report_id):
+        """
+        Decode one report by ID
+
+        Args:
+            report_id (str): Assessment ID
+
+        Returns:
+            str: Report text
+
+        Raises:
+            KeyError: If the archive has no report with this ID
+        """
+        offset, length = self._index[str(report_id)]
+        with self._lock:
+            self._data.seek(offset)
+            blob = self._data.read(length)
+        return self.decompress(blob)
+
+    def __contains__(self, report_id):
+        return str(report_id) in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def ids(self):
+        """IDs of all reports in the archive"""
+        return list(self._index)
+
+    def stored_size(self):
+        """Total compressed size of the reports currently indexed"""
+        return sum(length for _, length in self._index.values())
+
+    def close(self):
+        self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
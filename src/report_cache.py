@@ -0,0 +1,167 @@
+"""
+Memoization of Gemini issue reports
+
+A Step 4 report depends only on the user's issue, its classification, the
+follow-up questions and answers and the model, so it is keyed by a hash of
+exactly those inputs. The questions count because the answers are keyed by
+generated ids (q1, q2, ...), and local_report maps them onto profile slots
+through each question's text and tags. The report is kept in the session (reruns of the same session never
+call Gemini again) and in a process-wide LRU shared by all sessions. Error
+fallbacks (reports with an "error" key) are never memoized, so a failed
+generation is retried on the next rerun.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, MutableMapping, Optional, Tuple
+
+DEFAULT_MAX_REPORTS = 256
+
+# Session state keys used by memoized_report
+SESSION_REPORT = "final_report"
+SESSION_REPORT_KEY = "final_report_key"
+
+# Follow-up question fields that decide what an answer means
+QUESTION_KEY_FIELDS = ("id", "question", "slot", "polarity")
+
+
+def report_cache_key(issue_data: Dict[str, Any], model_name: str) -> str:
+    """
+    Content hash of everything a report depends on.
+
+    Args:
+        issue_data: Dict with user_issue, classification, followup_answers
+            and followup_questions
+        model_name: Gemini model generating the report
+
+    Returns:
+        Hex SHA-256 digest (independent of dict ordering)
+    """
+    payload = json.dumps(
+        {
+            "user_issue": issue_data.get("user_issue", ""),
+            "classification": issue_data.get("classification", {}),
+            "followup_answers": issue_data.get("followup_answers", {}),
+            "followup_questions": [
+                {field: question.get(field) for field in QUESTION_KEY_FIELDS}
+                for question in issue_data.get("followup_questions") or []
+            ],
+            "model": model_name,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """Thread-safe bounded LRU of generated reports."""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_REPORTS):
+        """
+        Args:
+            max_size: Maximum number of reports kept
+        """
+        self.max_size = max_size
+        self._reports: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached report for a key, or None."""
+        with self._lock:
+            report = self._reports.get(key)
+            if report is None:
+                self.misses += 1
+                return None
+            self._reports.move_to_end(key)
+            self.hits += 1
+            return report
+
+    def put(self, key: str, report: Dict[str, Any]):
+        """Store a report (error fallbacks are ignored)."""
+        if "error" in report:
+            return
+        with self._lock:
+            self._reports[key] = report
+            self._reports.move_to_end(key)
+            while len(self._reports) > self.max_size:
+                self._reports.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._reports)
+
+    def clear(self):
+        """Drop every report."""
+        with self._lock:
+            self._reports.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counts and size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._reports)}
+
+
+REPORT_CACHE = ReportCache()
+
+
+def cached_report(session_state: MutableMapping[str, Any], issue_data: Dict[str, Any], model_name: str,
+                  cache: Optional[ReportCache] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Report for the current inputs if the session or the shared cache has it.
+
+    A shared-cache hit is copied into the session.
+
+    Returns:
+        (report, source) with source "session" or "cache", or (None, None)
+    """
+    cache = cache if cache is not None else REPORT_CACHE
+    key = report_cache_key(issue_data, model_name)
+    if session_state.get(SESSION_REPORT_KEY) == key and session_state.get(SESSION_REPORT) is not None:
+        return session_state[SESSION_REPORT], "session"
+    report = cache.get(key)
+    if report is None:
+        return None, None
+    remember_report(session_state, key, report)
+    return report, "cache"
+
+
+def remember_report(session_state: MutableMapping[str, Any], key: str, report: Dict[str, Any]):
+    """Keep a report in the session under its cache key (error fallbacks get no key)."""
+    session_state[SESSION_REPORT] = report
+    session_state[SESSION_REPORT_KEY] = None if "error" in report else key
+
+
+def memoized_report(session_state: MutableMapping[str, Any], issue_data: Dict[str, Any], model_name: str,
+                    generate: Callable[[Dict[str, Any]], Dict[str, Any]],
+                    cache: Optional[ReportCache] = None) -> Tuple[Dict[str, Any], str]:
+    """
+    Report for the current inputs, generating it only when they changed.
+
+    Args:
+        session_state: Per-session state (st.session_state or a dict)
+        issue_data: Dict with user_issue, classification, followup_answers
+            and followup_questions
+        model_name: Gemini model generating the report
+        generate: Called with issue_data on a miss (e.g. IssueClassifier.generate_report)
+        cache: Shared cache (default: REPORT_CACHE)
+
+    Returns:
+        (report, source) where source is "session", "cache" or "generated"
+    """
+    cache = cache if cache is not None else REPORT_CACHE
+    report, source = cached_report(session_state, issue_data, model_name, cache)
+    if report is not None:
+        return report, source
+
+    key = report_cache_key(issue_data, model_name)
+    report = generate(issue_data)
+    cache.put(key, report)
+    remember_report(session_state, key, report)
+    return report, "generated"
@@ -0,0 +1,316 @@
+"""
+Bulk export of assessment reports in several formats
+
+Renders many assessments to text, JSON, CSV, HTML and Markdown through a
+pool of worker processes. Static sections (NEXT STEPS, resource links, page
+chrome) are rendered once per format at import time and reused for every
+report. Each report is streamed to its own file, or all of them into a
+single zip archive.
+"""
+
+import csv
+import html
+import io
+import json
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from src.report_writer import (
+    DEFAULT_WRITER, NEXT_STEPS, PROFILE_FIELDS, RESOURCE_LINKS, format_timestamp, profile_value,
+)
+
+FORMATS = ('text', 'json', 'csv', 'html', 'markdown')
+
+# Assessment ids usable as output file names as they are
+_SAFE_STEM = re.compile(r'[A-Za-z0-9_-][A-Za-z0-9._-]{0,127}')
+
+EXTENSIONS = {
+    'text': 'txt',
+    'json': 'json',
+    'csv': 'csv',
+    'html': 'html',
+    'markdown': 'md',
+}
+
+# Assessments handed to a worker per task
+EXPORT_CHUNK_SIZE = 64
+
+CSV_COLUMNS = (
+    'assessment_id', 'assessment_date', 'risk_level', 'risk_score',
+    'priority', 'category', 'message', 'details', 'action', 'rule_risk_score',
+)
+
+_MARKDOWN_FOOTER = (
+    "## Next Steps\n\n"
+    + "".join(f"{idx}. {step}\n" for idx, step in enumerate(NEXT_STEPS, 1))
+    + "\nFor more information on digital privacy and security, visit:\n\n"
+    + "".join(f"- [{name}]({url})\n" for name, url in RESOURCE_LINKS)
+)
+
+_HTML_HEAD = (
+    "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+    "<title>Digital Privacy Assessment Report</title>\n</head>\n<body>\n"
+    "<h1>Digital Privacy Assessment Report</h1>\n"
+)
+
+_HTML_FOOTER = (
+    "<h2>Next Steps</h2>\n<ol>\n"
+    + "".join(f"<li>{html.escape(step)}</li>\n" for step in NEXT_STEPS)
+    + "</ol>\n<p>For more information on digital privacy and security, visit:</p>\n<ul>\n"
+    + "".join(
+        f"<li><a href=\"{html.escape(url)}\">{html.escape(name)}</a></li>\n"
+        for name, url in RESOURCE_LINKS
+    )
+    + "</ul>\n</body>\n</html>\n"
+)
+
+_JSON_STATIC = {
+    'next_steps': list(NEXT_STEPS),
+    'resources': [{'name': name, 'url': url} for name, url in RESOURCE_LINKS],
+}
+
+
+def _assessment_date(assessment, default):
+    """Return the assessment's timestamp formatted for reports"""
+    timestamp = assessment.get('timestamp')
+    if timestamp is None:
+        return default
+    return format_timestamp(timestamp)
+
+
+def render_text(assessment, date):
+    """Render an assessment in the plain-text format of format_report"""
+    return DEFAULT_WRITER.render(assessment.get('user_data', {}), assessment['recommendations'],
+                                 assessment['risk_level'], assessment['risk_score'], date)
+
+
+def write_text(fp, assessment, date):
+    """Stream an assessment in the plain-text format straight into ``fp``"""
+    DEFAULT_WRITER.write(fp, assessment.get('user_data', {}), assessment['recommendations'],
+                         assessment['risk_level'], assessment['risk_score'], date)
+
+
+def render_json(assessment, date):
+    """Render an assessment as a JSON document"""
+    document = {
+        'assessment_id': assessment.get('id'),
+        'assessment_date': date,
+        'risk_level': assessment['risk_level'],
+        'risk_score': assessment['risk_score'],
+        'user_data': assessment.get('user_data', {}),
+        'recommendations': assessment['recommendations'],
+    }
+    document.update(_JSON_STATIC)
+    return json.dumps(document, indent=2, ensure_ascii=False)
+
+
+def render_csv(assessment, date):
+    """Render an assessment as CSV, one row per recommendation"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_COLUMNS)
+    head = (assessment.get('id'), date, assessment['risk_level'], assessment['risk_score'])
+    for rec in assessment['recommendations']:
+        writer.writerow(head + (
+            rec['priority'], rec['category'], rec['message'],
+            rec['details'], rec['action'], rec.get('risk_score'),
+        ))
+    return buf.getvalue()
+
+
+def render_html(assessment, date):
+    """Render an assessment as a standalone HTML page"""
+    esc = html.escape
+    user_data = assessment.get('user_data', {})
+    parts = [
+        _HTML_HEAD,
+        f"<p>Assessment Date: {esc(date)}</p>\n"
+        f"<p><strong>Risk Level: {esc(assessment['risk_level'])}</strong> "
+        f"(Score: {assessment['risk_score']})</p>\n"
+        "<h2>User Profile Summary</h2>\n<ul>\n",
+    ]
+    parts.extend(
+        f"<li>{esc(label)}: {esc(str(profile_value(user_data, field, is_list)))}</li>\n"
+        for label, field, is_list in PROFILE_FIELDS
+    )
+    parts.append(f"</ul>\n<h2>Recommendations ({len(assessment['recommendations'])} total)</h2>\n<ol>\n")
+    for rec in assessment['recommendations']:
+        parts.append(
+            f"<li><strong>[{esc(rec['priority'].upper())}] {esc(rec['category'])}</strong>: "
+            f"{esc(rec['message'])}<br>\n"
+            f"Details: {esc(rec['details'])}<br>\n"
+            f"Action: {esc(rec['action'])}</li>\n"
+        )
+    parts.append("</ol>\n")
+    parts.append(_HTML_FOOTER)
+    return ''.join(parts)
+
+
+def render_markdown(assessment, date):
+    """Render an assessment as Markdown"""
+    user_data = assessment.get('user_data', {})
+    parts = [
+        "# Digital Privacy Assessment Report\n\n"
+        f"- **Assessment Date:** {date}\n"
+        f"- **Risk Level:** {assessment['risk_level']} (Score: {assessment['risk_score']})\n\n"
+        "## User Profile Summary\n\n"
+    ]
+    parts.extend(
+        f"- {label}: {profile_value(user_data, field, is_list)}\n"
+        for label, field, is_list in PROFILE_FIELDS
+    )
+    parts.append(f"\n## Recommendations ({len(assessment['recommendations'])} total)\n\n")
+    for idx, rec in enumerate(assessment['recommendations'], 1):
+        parts.append(
+            f"{idx}. **[{rec['priority'].upper()}] {rec['category']}** — {rec['message']}\n"
+            f"   - Details: {rec['details']}\n"
+            f"   - Action: {rec['action']}\n"
+        )
+    parts.append("\n")
+    parts.append(_MARKDOWN_FOOTER)
+    return ''.join(parts)
+
+
+RENDERERS = {
+    'text': render_text,
+    'json': render_json,
+    'csv': render_csv,
+    'html': render_html,
+    'markdown': render_markdown,
+}
+
+
+def _output_name(assessment, index, fmt):
+    """
+    File name of one rendered report
+
+    The assessment id is used when it is a safe file name stem (letters,
+    digits, '.', '_' and '-', not starting with '.'); a missing or unsafe
+    id falls back to the assessment's position in the export.
+    """
+    stem = assessment.get('id')
+    stem = '' if stem is None else str(stem)
+    if not _SAFE_STEM.fullmatch(stem):
+        stem = str(index)
+    return f"{stem}.{EXTENSIONS[fmt]}"
+
+
+def _output_path(out_dir, name):
+    """Path of an output file, refusing any that would land outside out_dir"""
+    root = os.path.realpath(out_dir)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.dirname(path) != root:
+        raise ValueError(f"Report file name {name!r} resolves outside {out_dir}")
+    return path
+
+
+def _render_chunk(chunk, formats, default_date, out_dir):
+    """
+    Render a chunk of (index, assessment) pairs in a worker
+
+    When ``out_dir`` is set, each report is written to its own file and only
+    the file names are returned; otherwise the rendered text is returned so
+    the parent can stream it into an archive.
+    """
+    rendered = []
+    for index, assessment in chunk:
+        date = _assessment_date(assessment, default_date)
+        for fmt in formats:
+            name = _output_name(assessment, index, fmt)
+            if out_dir is None:
+                rendered.append((name, RENDERERS[fmt](assessment, date)))
+                continue
+            with open(_output_path(out_dir, name), 'w', encoding='utf-8', newline='') as f:
+                if fmt == 'text':
+                    write_text(f, assessment, date)
+                else:
+                    f.write(RENDERERS[fmt](assessment, date))
+            rendered.append((name, None))
+    return rendered
+
+
+def _chunks(assessments, size):
+    chunk = []
+    for item in enumerate(assessments, 1):
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_reports(assessments, out_dir=None, archive=None, formats=('text',),
+                   workers=None, timestamp=None):
+    """
+    Render assessments in one or more formats
+
+    Args:
+        assessments (iterable): Results from AppController.run_analysis,
+            optionally carrying 'id' (used as file name) and 'timestamp'
+        out_dir (str): Directory to write one file per report and format
+        archive (str): Zip file to stream every report into instead
+        formats (tuple): Any of FORMATS
+        workers (int): Worker processes; 1 renders in-process,
+            None uses one per CPU
+        timestamp (datetime): Assessment date for assessments without
+            their own 'timestamp'; defaults to now
+
+    Returns:
+        list: Names of the files written (relative to out_dir or archive)
+    """
+    if (out_dir is None) == (archive is None):
+        raise ValueError("Pass exactly one of out_dir or archive")
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unsupported export format(s): {', '.join(sorted(unknown))}")
+
+    formats = tuple(formats)
+    default_date = format_timestamp(timestamp or datetime.now())
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+
+    chunks = _chunks(assessments, EXPORT_CHUNK_SIZE)
+    if workers == 1:
+        results = (_render_chunk(chunk, formats, default_date, out_dir) for chunk in chunks)
+        return _collect(results, archive)
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = (
+            executor.submit(_render_chunk, chunk, formats, default_date, out_dir)
+            for chunk in chunks
+        )
+        # Keep a bounded number of chunks in flight so that huge inputs are
+        # streamed rather than rendered into memory all at once.
+        in_flight = []
+        window = 2 * workers
+
+        def results():
+            for future in futures:
+                in_flight.append(future)
+                if len(in_flight) >= window:
+                    yield in_flight.pop(0).result()
+            while in_flight:
+                yield in_flight.pop(0).result()
+
+        return _collect(results(), archive)
+
+
+def _collect(results, archive):
+    """Drain rendered chunks, streaming them into ``archive`` if given"""
+    names = []
+    if archive is None:
+        for rendered in results:
+            names.extend(name for name, _ in rendered)
+        return names
+
+    with zipfile.ZipFile(archive, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for rendered in results:
+            for name, text in rendered:
+                zf.writestr(name, text)
+                names.append(name)
+    return names
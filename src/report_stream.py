@@ -0,0 +1,161 @@
+"""
+Incremental parsing of a streamed JSON report
+
+Gemini streams a report as text chunks of arbitrary size. ReportStreamParser
+scans the chunks as they arrive and keeps a partial report holding every
+top-level field whose value is complete. For list fields, each element is
+added as soon as it is complete. The "analysis" paragraph can therefore be
+shown once its closing quote arrives, and each immediate action once its
+object closes, long before the whole response has been received.
+
+Only the structure is tracked while scanning (nesting depth, strings and
+escapes). Each completed value is decoded with json.loads, and every
+character is scanned once, so feeding a whole response costs about as much
+as parsing it. Text before the first "{" (such as a markdown code fence) is
+skipped.
+"""
+
+import json
+from typing import Any, Dict, List
+
+_WHITESPACE = " \t\r\n"
+
+
+class ReportStreamParser:
+    """Partial top-level fields of a JSON object fed in chunks."""
+
+    def __init__(self):
+        self.partial: Dict[str, Any] = {}
+        self.done = False
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        # Top-level object state: expecting a key, a colon, a value, or inside one
+        self._expect = "key"
+        self._key = None
+        self._value_start = 0
+        self._value_is_list = False
+        self._item_start = None
+
+    def feed(self, chunk: str) -> List[str]:
+        """
+        Scan the next chunk of the response.
+
+        Returns:
+            Top-level fields that changed (completed, or gained a list item)
+        """
+        changed: List[str] = []
+        self._text += chunk
+        text = self._text
+        for i in range(self._pos, len(text)):
+            if self.done:
+                break
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._string_closed(i, changed)
+                continue
+            if self._depth == 0:
+                if c == "{":
+                    self._depth = 1
+                continue
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+                if self._depth == 1 and self._expect == "value":
+                    self._value_start = i
+                    self._expect = "string"
+                elif self._in_list_item_slot():
+                    self._item_start = i
+            elif c in "{[":
+                if self._depth == 1 and self._expect == "value":
+                    self._value_start = i
+                    self._value_is_list = c == "["
+                    self._expect = "nested"
+                elif self._in_list_item_slot():
+                    self._item_start = i
+                self._depth += 1
+            elif c in "}]":
+                if self._depth == 2 and self._value_is_list and self._item_start is not None:
+                    # A scalar item ends where its list does
+                    self._add_item(self._item_start, i, changed)
+                self._depth -= 1
+                if self._depth == 2 and self._value_is_list and self._item_start is not None:
+                    self._add_item(self._item_start, i + 1, changed)
+                elif self._depth == 1 and self._expect == "nested":
+                    self._set_value(self._value_start, i + 1, changed)
+                    self._expect = "after"
+                elif self._depth == 0:
+                    if self._expect == "scalar":
+                        self._set_value(self._value_start, i, changed)
+                    self.done = True
+            elif c == ",":
+                if self._depth == 1:
+                    if self._expect == "scalar":
+                        self._set_value(self._value_start, i, changed)
+                    self._expect = "key"
+                elif self._depth == 2 and self._value_is_list and self._item_start is not None:
+                    self._add_item(self._item_start, i, changed)
+            elif c == ":":
+                if self._depth == 1 and self._expect == "colon":
+                    self._expect = "value"
+            elif c not in _WHITESPACE:
+                if self._depth == 1 and self._expect == "value":
+                    self._value_start = i
+                    self._expect = "scalar"
+                elif self._in_list_item_slot():
+                    self._item_start = i
+        self._pos = len(text)
+        return changed
+
+    def _in_list_item_slot(self) -> bool:
+        return self._depth == 2 and self._value_is_list and self._item_start is None
+
+    def _string_closed(self, i: int, changed: List[str]):
+        if self._depth == 1 and self._expect == "key":
+            self._key = json.loads(self._text[self._string_start:i + 1])
+            self._expect = "colon"
+            self._value_is_list = False
+            self._item_start = None
+        elif self._depth == 1 and self._expect == "string":
+            self._set_value(self._value_start, i + 1, changed)
+            self._expect = "after"
+        elif self._depth == 2 and self._value_is_list and self._item_start == self._string_start:
+            self._add_item(self._item_start, i + 1, changed)
+
+    def _decode(self, start: int, end: int):
+        return json.loads(self._text[start:end])
+
+    def _set_value(self, start: int, end: int, changed: List[str]):
+        try:
+            value = self._decode(start, end)
+        except ValueError:
+            return
+        self.partial[self._key] = value
+        if self._key not in changed:
+            changed.append(self._key)
+        self._value_is_list = False
+        self._item_start = None
+
+    def _add_item(self, start: int, end: int, changed: List[str]):
+        self._item_start = None
+        try:
+            item = self._decode(start, end)
+        except ValueError:
+            return
+        self.partial.setdefault(self._key, []).append(item)
+        if self._key not in changed:
+            changed.append(self._key)
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return self._text
@@ -0,0 +1,152 @@
+"""
+Streaming writer for plain-text assessment reports
+
+ReportWriter yields a report section by section instead of building one
+string, so large reports are written straight to a file without quadratic
+copying. The assessment time is passed in rather than read from the clock,
+which makes the output reproducible and cacheable. Static parts (banner
+rules, NEXT STEPS, resource links) are built once at import time.
+"""
+
+from datetime import datetime
+
+# Static report sections shared by every report format
+NEXT_STEPS = (
+    "Address high-priority items first",
+    "Implement recommendations gradually over 30 days",
+    "Re-assess your security quarterly",
+    "Stay informed about emerging threats",
+    "Share this tool with family and friends",
+)
+
+RESOURCE_LINKS = (
+    ("Electronic Frontier Foundation (EFF)", "https://www.eff.org"),
+    ("Privacy Guides", "https://www.privacyguides.org"),
+    ("NIST Cybersecurity Framework", "https://www.nist.gov/cyberframework"),
+)
+
+RULE = '=' * 70
+SUBRULE = '-' * 70
+
+REPORT_FOOTER = (
+    f"\n{RULE}\nNEXT STEPS\n{SUBRULE}\n"
+    + "".join(f"{idx}. {step}\n" for idx, step in enumerate(NEXT_STEPS, 1))
+    + "\nFor more information on digital privacy and security, visit:\n"
+    + "".join(f"- {name}: {url}\n" for name, url in RESOURCE_LINKS)
+)
+
+_TITLE = f"\nDIGITAL PRIVACY ASSESSMENT REPORT\n{RULE}\n"
+_PROFILE_HEADING = f"\nUSER PROFILE SUMMARY\n{SUBRULE}\n"
+
+# (label, user_data key, is a list field)
+PROFILE_FIELDS = (
+    ('Social Media Platforms', 'social_media', True),
+    ('Devices Used', 'devices', True),
+    ('Password Manager', 'password_manager', False),
+    ('Two-Factor Authentication', 'two_factor', False),
+    ('VPN Usage', 'vpn', False),
+    ('Regular OS Updates', 'os_update', False),
+    ('Data Backup', 'backup_data', False),
+)
+
+SECTIONS = ('header', 'profile', 'recommendations', 'footer')
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def format_timestamp(timestamp):
+    """Format an assessment time for reports; strings pass through unchanged"""
+    if isinstance(timestamp, str):
+        return timestamp
+    if isinstance(timestamp, (int, float)):
+        timestamp = datetime.fromtimestamp(timestamp)
+    return timestamp.strftime(TIMESTAMP_FORMAT)
+
+
+def profile_value(user_data, field, is_list):
+    """Format one profile field the way the text report shows it"""
+    if is_list:
+        return ', '.join(user_data.get(field, [])) or 'None'
+    return user_data.get(field, 'Unknown')
+
+
+class ReportWriter:
+    """Renders text reports section by section"""
+
+    def __init__(self, sections=SECTIONS, priorities=None):
+        """
+        Args:
+            sections (tuple): Sections to render, any of SECTIONS
+            priorities (tuple): Only include recommendations with these
+                priorities (e.g. ('high',)); None includes all
+        """
+        unknown = set(sections) - set(SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown report section(s): {', '.join(sorted(unknown))}")
+        self.sections = tuple(s for s in SECTIONS if s in sections)
+        self.priorities = tuple(priorities) if priorities is not None else None
+
+    def iter_report(self, user_data, recommendations, risk_level, risk_score, timestamp):
+        """
+        Yield the report in chunks
+
+        Args:
+            user_data (dict): User input data
+            recommendations (list): List of recommendations
+            risk_level (str): Calculated risk level
+            risk_score (int): Total risk score
+            timestamp (datetime): Assessment time (or a preformatted string)
+
+        Yields:
+            str: Consecutive pieces of the report text
+        """
+        for section in self.sections:
+            if section == 'header':
+                yield (
+                    f"{_TITLE}Assessment Date: {format_timestamp(timestamp)}\n"
+                    f"Risk Level: {risk_level} (Score: {risk_score})\n"
+                )
+            elif section == 'profile':
+                yield _PROFILE_HEADING
+                yield ''.join(
+                    f"{label}: {profile_value(user_data, field, is_list)}\n"
+                    for label, field, is_list in PROFILE_FIELDS
+                )
+            elif section == 'recommendations':
+                yield from self._iter_recommendations(recommendations)
+            elif section == 'footer':
+                yield REPORT_FOOTER
+
+    def _iter_recommendations(self, recommendations):
+        if self.priorities is not None:
+            recommendations = [r for r in recommendations if r['priority'] in self.priorities]
+            heading = f"{', '.join(p.upper() for p in self.priorities)} PRIORITY RECOMMENDATIONS"
+        else:
+            heading = "RECOMMENDATIONS"
+
+        yield f"\n{heading} ({len(recommendations)} total)\n{SUBRULE}\n"
+        for idx, rec in enumerate(recommendations, 1):
+            yield (
+                f"\n{idx}. [{rec['priority'].upper()}] {rec['category']}\n"
+                f"   {rec['message']}\n   \n"
+                f"   Details: {rec['details']}\n   \n"
+                f"   Action: {rec['action']}\n   \n"
+            )
+
+    def write(self, fp, user_data, recommendations, risk_level, risk_score, timestamp):
+        """
+        Stream the report into a file-like object
+
+        Args:
+            fp: Object with a write(str) method
+            (other arguments as for iter_report)
+        """
+        for chunk in self.iter_report(user_data, recommendations, risk_level, risk_score, timestamp):
+            fp.write(chunk)
+
+    def render(self, user_data, recommendations, risk_level, risk_score, timestamp):
+        """Return the whole report as one string"""
+        return ''.join(self.iter_report(user_data, recommendations, risk_level, risk_score, timestamp))
+
+
+DEFAULT_WRITER = ReportWriter()
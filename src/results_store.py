@@ -0,0 +1,267 @@
+"""
+Columnar, append-only store for assessment results
+
+Each field lives in its own fixed-width column file inside the store
+directory, so analytical queries memory-map and scan only the columns they
+need instead of loading whole records:
+
+    timestamp.col   int64   assessment time (Unix seconds, UTC)
+    profile.col     uint16  2 bits per yes/no profile slot (see PROFILE_FLAGS)
+    risk_score.col  uint16  total risk score
+    risk_level.col  uint8   index into RISK_LEVELS
+    rule_hits.col   uint16  rule-hit bitmap (bit i = RULE_IDS[i] fired)
+
+numpy is used for vectorized scans when it is installed; otherwise the
+queries fall back to pure Python over the same memory-mapped columns.
+"""
+
+import mmap
+import os
+import time
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
+
+from src.inference_engine import RULE_BITS, rule_hit_mask
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+
+# Yes/no slots of the user profile, in bit order (2 bits each)
+PROFILE_FLAGS = (
+    'password_reuse', 'password_manager', 'two_factor', 'public_wifi',
+    'vpn', 'os_update', 'backup_data', 'email_encryption'
+)
+
+# Encoding of a single profile slot
+FLAG_UNKNOWN, FLAG_YES, FLAG_NO = 0, 1, 2
+
+RISK_LEVELS = ('Low', 'Medium', 'High', 'Critical')
+
+# column name -> array typecode
+COLUMNS = {
+    'timestamp': 'q',
+    'profile': 'H',
+    'risk_score': 'H',
+    'risk_level': 'B',
+    'rule_hits': 'H',
+}
+
+_NUMPY_DTYPES = {'q': '<i8', 'H': '<u2', 'B': 'u1'}
+
+# Rows per chunk when scanning columns
+SCAN_CHUNK_ROWS = 1 << 22
+
+
+def encode_profile(user_data):
+    """
+    Pack the yes/no answers of a user profile into 16 bits
+
+    Args:
+        user_data (dict): User input data
+
+    Returns:
+        int: Packed profile bits
+    """
+    bits = 0
+    for idx, field in enumerate(PROFILE_FLAGS):
+        value = user_data.get(field)
+        if value == 'yes':
+            bits |= FLAG_YES << (2 * idx)
+        elif value == 'no':
+            bits |= FLAG_NO << (2 * idx)
+    return bits
+
+
+def decode_profile(bits):
+    """
+    Unpack profile bits written by encode_profile
+
+    Args:
+        bits (int): Packed profile bits
+
+    Returns:
+        dict: Answered yes/no slots ('yes' or 'no'); unknown slots are omitted
+    """
+    user_data = {}
+    for idx, field in enumerate(PROFILE_FLAGS):
+        flag = (bits >> (2 * idx)) & 0b11
+        if flag == FLAG_YES:
+            user_data[field] = 'yes'
+        elif flag == FLAG_NO:
+            user_data[field] = 'no'
+    return user_data
+
+
+def _month_key(timestamp):
+    """Format a Unix timestamp as 'YYYY-MM' (UTC)"""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m')
+
+
+class ResultsStore:
+    """Append-only columnar store of assessment results"""
+
+    def __init__(self, path):
+        """
+        Open (or create) a results store
+
+        Args:
+            path (str): Directory holding the column files
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f'{name}.col')
+
+    def __len__(self):
+        # A torn append can leave columns with different lengths; only rows
+        # present in every column count.
+        rows = []
+        for name, typecode in COLUMNS.items():
+            try:
+                size = os.path.getsize(self._column_path(name))
+            except FileNotFoundError:
+                size = 0
+            rows.append(size // array(typecode).itemsize)
+        return min(rows)
+
+    def append(self, result, timestamp=None):
+        """
+        Append one analysis result
+
+        Args:
+            result (dict): Result from AppController.run_analysis
+            timestamp (float): Assessment time; defaults to now
+        """
+        self.append_many([result], [timestamp])
+
+    def append_many(self, results, timestamps=None):
+        """
+        Append a batch of analysis results with one write per column
+
+        Args:
+            results (list): Results from AppController.run_analysis
+            timestamps (list): Assessment times; None entries default to now
+        """
+        buffers = {name: array(typecode) for name, typecode in COLUMNS.items()}
+        now = int(time.time())
+        timestamps = timestamps or [None] * len(results)
+
+        for result, ts in zip(results, timestamps):
+            buffers['timestamp'].append(now if ts is None else int(ts))
+            buffers['profile'].append(encode_profile(result.get('user_data', {})))
+            buffers['risk_score'].append(min(int(result['risk_score']), 0xFFFF))
+            buffers['risk_level'].append(RISK_LEVELS.index(result['risk_level']))
+            buffers['rule_hits'].append(rule_hit_mask(result['recommendations']))
+
+        rows = len(self)
+        for name, buf in buffers.items():
+            path = self._column_path(name)
+            with open(path, 'ab') as f:
+                # Drop any rows left behind by an interrupted append so that
+                # every column stays aligned.
+                f.truncate(rows * buf.itemsize)
+                f.write(buf.tobytes())
+
+    def column(self, name):
+        """
+        Memory-map a single column read-only
+
+        Args:
+            name (str): Column name (a key of COLUMNS)
+
+        Returns:
+            memoryview or numpy.ndarray: Column values (numpy when available)
+        """
+        typecode = COLUMNS[name]
+        rows = len(self)
+        if rows == 0:
+            if np is not None:
+                return np.empty(0, dtype=_NUMPY_DTYPES[typecode])
+            return memoryview(array(typecode))
+
+        with open(self._column_path(name), 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if np is not None:
+            return np.frombuffer(mapped, dtype=_NUMPY_DTYPES[typecode], count=rows)
+        itemsize = array(typecode).itemsize
+        return memoryview(mapped)[:rows * itemsize].cast(typecode)
+
+    def scan(self, columns, chunk_rows=SCAN_CHUNK_ROWS):
+        """
+        Iterate over the store in chunks, touching only the given columns
+
+        Args:
+            columns (list): Column names to read
+            chunk_rows (int): Rows per chunk
+
+        Yields:
+            dict: Column name -> slice of that column for the chunk
+        """
+        mapped = {name: self.column(name) for name in columns}
+        rows = min((len(col) for col in mapped.values()), default=0)
+        for start in range(0, rows, chunk_rows):
+            stop = min(start + chunk_rows, rows)
+            yield {name: col[start:stop] for name, col in mapped.items()}
+
+    def rule_hit_share_by_month(self, rule):
+        """
+        Share of assessments in which a rule fired, grouped by month
+
+        Args:
+            rule (str): Rule identifier, e.g. 'no-two-factor-rule'
+
+        Returns:
+            dict: 'YYYY-MM' -> {'hits': int, 'total': int, 'share': float}
+        """
+        bit = RULE_BITS[rule]
+        hits, totals = Counter(), Counter()
+
+        for chunk in self.scan(['timestamp', 'rule_hits']):
+            if np is not None:
+                months = chunk['timestamp'].astype('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+                if not len(months):
+                    continue
+                base = int(months.min())
+                offsets = months - base
+                fired = (chunk['rule_hits'] & bit) != 0
+                chunk_totals = np.bincount(offsets)
+                chunk_hits = np.bincount(offsets[fired], minlength=len(chunk_totals))
+                for offset in np.flatnonzero(chunk_totals):
+                    year, month = divmod(base + int(offset), 12)
+                    key = f'{1970 + year:04d}-{month + 1:02d}'
+                    totals[key] += int(chunk_totals[offset])
+                    hits[key] += int(chunk_hits[offset])
+            else:
+                for ts, mask in zip(chunk['timestamp'], chunk['rule_hits']):
+                    key = _month_key(ts)
+                    totals[key] += 1
+                    if mask & bit:
+                        hits[key] += 1
+
+        return {
+            key: {'hits': hits[key], 'total': totals[key], 'share': hits[key] / totals[key]}
+            for key in sorted(totals)
+        }
+
+    def risk_level_counts(self):
+        """
+        Count assessments per risk level
+
+        Returns:
+            dict: Risk level -> number of assessments
+        """
+        counts = [0] * len(RISK_LEVELS)
+        for chunk in self.scan(['risk_level']):
+            if np is not None:
+                for idx, count in enumerate(np.bincount(chunk['risk_level'], minlength=len(RISK_LEVELS))):
+                    counts[idx] += int(count)
+            else:
+                for idx in chunk['risk_level']:
+                    counts[idx] += 1
+        return dict(zip(RISK_LEVELS, counts))
@@ -0,0 +1,283 @@
+"""
+Per-session memory accounting for the Streamlit apps
+
+Every browser session keeps its own st.session_state in the server process:
+chatbot.py appends to ``messages`` for as long as the tab is open, and
+app.py holds classifications and whole reports. SESSION_MEMORY samples the
+deep size of each session's state whenever the session reaches a new step
+(app.py: a step of the issue flow, chatbot.py: a new message). At most
+every SNAPSHOT_INTERVAL seconds it also takes a tracemalloc snapshot, so
+allocation sites that keep growing since the first snapshot stand out.
+report() returns the biggest sessions and allocation sites as a JSON-ready
+dict; both apps show it at ``?debug=memory``.
+
+Sampling is off unless PRIVACY_ADVISOR_MEMORY=1. Setting
+PRIVACY_ADVISOR_SESSION_CAP to a number of bytes caps each session's state
+(sessions are then sampled even without PRIVACY_ADVISOR_MEMORY). When a
+session exceeds the cap, the app drops its oldest data: chatbot.py trims
+the oldest messages and app.py evicts the session's copy of the report,
+which can be fetched again from the shared report cache.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional
+
+# Seconds between tracemalloc snapshots
+SNAPSHOT_INTERVAL = 30.0
+
+# Sessions not sampled for this many seconds are dropped from the report
+SESSION_TTL = 3600.0
+
+# Sessions tracked at once (least recently sampled dropped first)
+MAX_SESSIONS = 1000
+
+# Frames kept per traced allocation; 1 is enough for file:line sites and cheapest
+TRACE_FRAMES = 1
+
+# Leaf types whose size is their own getsizeof
+_ATOMIC = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+_IGNORED_SITES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def memory_enabled() -> bool:
+    """True when PRIVACY_ADVISOR_MEMORY=1."""
+    return os.environ.get("PRIVACY_ADVISOR_MEMORY", "0") == "1"
+
+
+def session_cap_bytes() -> Optional[int]:
+    """Per-session state cap from PRIVACY_ADVISOR_SESSION_CAP, or None."""
+    try:
+        cap = int(os.environ.get("PRIVACY_ADVISOR_SESSION_CAP", ""))
+    except ValueError:
+        return None
+    return cap if cap > 0 else None
+
+
+def current_session_id() -> Optional[str]:
+    """ID of the Streamlit session running this script, or None outside one."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """
+    Bytes held by an object and the containers, strings and numbers it references.
+
+    Each object is counted once. Other objects (pooled Gemini models and
+    the like, which are shared between sessions) count only their own
+    getsizeof, not what they reference.
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, _ATOMIC):
+        return size
+    if isinstance(obj, Mapping):
+        return size + sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+def trim_oldest(items: List[Any], excess: int, keep: int = 0) -> int:
+    """
+    Drop items from the front of a list until excess bytes are freed.
+
+    Args:
+        items: List to trim in place (oldest first)
+        excess: Bytes to free
+        keep: Newest items that are never dropped
+
+    Returns:
+        Number of items dropped
+    """
+    dropped = freed = 0
+    # Strings shared between items (dict keys, roles) are only freed once
+    seen: set = set()
+    while freed < excess and len(items) - dropped > keep:
+        freed += deep_sizeof(items[dropped], seen)
+        dropped += 1
+    del items[:dropped]
+    return dropped
+
+
+class SessionMemoryTracker:
+    """Latest state size per session, plus tracemalloc snapshots over time."""
+
+    def __init__(self, snapshot_interval: float = SNAPSHOT_INTERVAL, session_ttl: float = SESSION_TTL,
+                 max_sessions: int = MAX_SESSIONS, clock=time.monotonic):
+        """
+        Args:
+            snapshot_interval: Minimum seconds between tracemalloc snapshots
+            session_ttl: Seconds without a sample before a session is forgotten
+            max_sessions: Sessions tracked at once
+            clock: Monotonic time source
+        """
+        self.snapshot_interval = snapshot_interval
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget every session and snapshot (tracemalloc keeps running if it was started)."""
+        with self._lock:
+            self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+            self._baseline = None
+            self._latest = None
+            self._snapshot_at = None
+            self.trims = 0
+
+    def observe(self, session_id: Optional[str], app: str, step: Any,
+                state: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Sample a session's state if it reached a new step.
+
+        Args:
+            session_id: Streamlit session ID (None outside a session: ignored)
+            app: Which app the session belongs to
+            step: Anything that changes on a step boundary
+            state: The session's st.session_state
+
+        Returns:
+            The session's record (see report()) when it was sampled, else None
+        """
+        if session_id is None:
+            return None
+        now = self.clock()
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is not None and record["step"] == step:
+                return None
+        fields = {key: deep_sizeof(value) for key, value in state.items()}
+        total = sum(fields.values())
+        with self._lock:
+            record = self._sessions.pop(session_id, None) or {
+                "session": session_id, "app": app, "first_seen": now, "peak_bytes": 0, "samples": 0,
+            }
+            record.update(step=step, bytes=total, fields=fields, last_seen=now)
+            record["peak_bytes"] = max(record["peak_bytes"], total)
+            record["samples"] += 1
+            self._sessions[session_id] = record
+            self._expire_locked(now)
+        if memory_enabled():
+            self._maybe_snapshot(now)
+        return record
+
+    def trimmed(self, session_id: str, state: Mapping[str, Any]):
+        """Record that a session was trimmed to its cap, and re-measure it."""
+        fields = {key: deep_sizeof(value) for key, value in state.items()}
+        with self._lock:
+            self.trims += 1
+            record = self._sessions.get(session_id)
+            if record is not None:
+                record["bytes"] = sum(fields.values())
+                record["fields"] = fields
+
+    def _expire_locked(self, now: float):
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if len(self._sessions) <= self.max_sessions and now - oldest["last_seen"] <= self.session_ttl:
+                break
+            self._sessions.popitem(last=False)
+
+    def _maybe_snapshot(self, now: float):
+        if not tracemalloc.is_tracing():
+            # Only allocations made from now on are traced; the first snapshot comes next step
+            tracemalloc.start(TRACE_FRAMES)
+            return
+        with self._lock:
+            if self._snapshot_at is not None and now - self._snapshot_at < self.snapshot_interval:
+                return
+            self._snapshot_at = now
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_SITES)
+        with self._lock:
+            if self._baseline is None:
+                self._baseline = snapshot
+            self._latest = snapshot
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """
+        Biggest sessions and allocation sites.
+
+        Args:
+            top: Sessions, fields per session and allocation sites listed
+
+        Returns:
+            Dict with session_count, total_bytes, trims, sessions (biggest
+            first: session, app, step, bytes, peak_bytes, samples,
+            largest_fields, idle_seconds) and tracemalloc (None until a
+            snapshot was taken: traced_bytes, peak_bytes, top_sites and
+            growth, the sites that grew most since the first snapshot)
+        """
+        now = self.clock()
+        with self._lock:
+            records = [dict(record) for record in self._sessions.values()]
+            baseline, latest, trims = self._baseline, self._latest, self.trims
+        records.sort(key=lambda record: -record["bytes"])
+        sessions = [{
+            "session": record["session"],
+            "app": record["app"],
+            "step": str(record["step"]),
+            "bytes": record["bytes"],
+            "peak_bytes": record["peak_bytes"],
+            "samples": record["samples"],
+            "largest_fields": sorted(record["fields"].items(), key=lambda item: -item[1])[:top],
+            "idle_seconds": round(now - record["last_seen"], 1),
+        } for record in records[:top]]
+
+        traced = None
+        if latest is not None:
+            current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+            traced = {
+                "traced_bytes": current,
+                "peak_bytes": peak,
+                "top_sites": [
+                    {"site": str(stat.traceback), "bytes": stat.size, "count": stat.count}
+                    for stat in latest.statistics("lineno")[:top]
+                ],
+                "growth": [
+                    {"site": str(stat.traceback), "bytes": stat.size_diff, "count": stat.count_diff}
+                    for stat in latest.compare_to(baseline, "lineno")[:top] if stat.size_diff > 0
+                ],
+            }
+        return {
+            "session_count": len(records),
+            "total_bytes": sum(record["bytes"] for record in records),
+            "trims": trims,
+            "sessions": sessions,
+            "tracemalloc": traced,
+        }
+
+
+SESSION_MEMORY = SessionMemoryTracker()
+
+
+def render_memory_report():
+    """?debug=memory page of both apps: the biggest sessions and allocation sites."""
+    import streamlit as st
+
+    report = SESSION_MEMORY.report()
+    st.markdown("# 🧠 Session Memory")
+    st.download_button("⬇️ Download JSON", json.dumps(report, indent=2),
+                       file_name="session_memory.json", mime="application/json")
+    st.json(report)
@@ -0,0 +1,174 @@
+"""
+Session snapshots that survive a server restart
+
+st.session_state lives in the server process, so a restart or crash loses
+the issue, its classification, the follow-up answers and the report, and
+the user has to repeat the Gemini steps. With PRIVACY_ADVISOR_SNAPSHOTS set
+to a database path, app.py saves the assessment fields of a session
+whenever it moves to another step. A restored session is looked up by the
+token in its URL (``?session=...``).
+
+A snapshot is the fields below as compact JSON, deflated with zlib, in one
+row of a local SQLite database (WAL mode, one connection per thread, like
+assessment_history). A Step 4 session compresses to under half its JSON
+size and is written with a single upsert in about a tenth of a millisecond
+(scripts/bench_snapshot.py).
+"""
+
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional
+
+# Session fields needed to resume the issue flow where it stopped
+SNAPSHOT_FIELDS = (
+    "user_issue",
+    "issue_classified",
+    "issue_classification",
+    "followup_questions",
+    "followup_answers",
+    "report_generated",
+    "final_report",
+    "final_report_key",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    token TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_time ON snapshots (updated_at);
+"""
+
+# Snapshots not updated for this many seconds are pruned
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+
+# zlib level 6: within a few percent of level 9 on session JSON, at a fraction of the CPU
+COMPRESSION_LEVEL = 6
+
+# Seconds a writer waits for the database lock before giving up
+BUSY_TIMEOUT = 5
+
+
+def new_token() -> str:
+    """Unguessable session token for the URL."""
+    return secrets.token_urlsafe(16)
+
+
+def encode_snapshot(state: Mapping[str, Any]) -> bytes:
+    """
+    Serialize the snapshot fields of a session.
+
+    Args:
+        state: st.session_state (or any mapping); missing fields are skipped
+
+    Returns:
+        zlib-compressed JSON
+    """
+    fields = {field: state[field] for field in SNAPSHOT_FIELDS if field in state}
+    data = json.dumps(fields, separators=(",", ":"), ensure_ascii=False)
+    return zlib.compress(data.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decode_snapshot(data: bytes) -> Dict[str, Any]:
+    """Inverse of encode_snapshot."""
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+class SessionSnapshots:
+    """SQLite store of session snapshots by token."""
+
+    def __init__(self, path: str, max_age: float = DEFAULT_MAX_AGE):
+        """
+        Open (or create) a snapshot database and prune expired snapshots.
+
+        Args:
+            path: SQLite database file
+            max_age: Seconds after its last write a snapshot expires
+        """
+        self.path = path
+        self.max_age = max_age
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+        self.prune()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def save(self, token: str, state: Mapping[str, Any], now: Optional[float] = None) -> int:
+        """
+        Store a session's snapshot, replacing the previous one.
+
+        Returns:
+            Size of the stored snapshot in bytes
+        """
+        data = encode_snapshot(state)
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO snapshots (token, updated_at, data) VALUES (?, ?, ?) "
+                "ON CONFLICT(token) DO UPDATE SET updated_at = excluded.updated_at, data = excluded.data",
+                (token, time.time() if now is None else now, data),
+            )
+        return len(data)
+
+    def load(self, token: str) -> Optional[Dict[str, Any]]:
+        """Snapshot fields for a token, or None if unknown, expired or unreadable."""
+        row = self._connection().execute(
+            "SELECT updated_at, data FROM snapshots WHERE token = ?", (token,)
+        ).fetchone()
+        if row is None or time.time() - row[0] > self.max_age:
+            return None
+        try:
+            return decode_snapshot(row[1])
+        except (zlib.error, ValueError):
+            return None
+
+    def delete(self, token: str):
+        """Remove a session's snapshot."""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM snapshots WHERE token = ?", (token,))
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """
+        Delete expired snapshots.
+
+        Returns:
+            Number of snapshots deleted
+        """
+        cutoff = (time.time() if now is None else now) - self.max_age
+        with self._connection() as conn:
+            return conn.execute("DELETE FROM snapshots WHERE updated_at < ?", (cutoff,)).rowcount
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+
+
+@lru_cache(maxsize=None)
+def _open_store(path: str) -> SessionSnapshots:
+    return SessionSnapshots(path)
+
+
+def get_snapshot_store() -> Optional[SessionSnapshots]:
+    """Process-wide store at PRIVACY_ADVISOR_SNAPSHOTS, or None when snapshots are off."""
+    path = os.environ.get("PRIVACY_ADVISOR_SNAPSHOTS")
+    return _open_store(path) if path else None
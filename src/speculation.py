@@ -0,0 +1,129 @@
+"""
+Speculative report generation during Step 3
+
+Answering the follow-up questions takes a user tens of seconds, and the
+Gemini report round trip normally starts only when they click "Generate
+Detailed Report". Once the user has answered enough questions themselves
+(widget defaults do not count) and the answers have stopped changing for
+SETTLE_SECONDS, app.py queues the report on the job queue with the current
+answers. The job is keyed by report_cache_key, so when the final answers
+match, Step 4 finds the running (or finished) job instead of starting one.
+When they do not match, the stale job is cancelled. A session queues at
+most MAX_SPECULATIONS reports per issue, at least RESPECULATE_SECONDS
+apart, so a user who keeps changing answers does not start a paid request
+for each change.
+
+SPECULATION counts how often that pays off and how much waiting it saved:
+the part of the speculative job that had already run when the user clicked.
+Set PRIVACY_ADVISOR_SPECULATE=0 to turn speculation off.
+"""
+
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+# Seconds the answers must stay unchanged before they are used
+SETTLE_SECONDS = 3.0
+
+# Minimum seconds between speculative reports of one session
+RESPECULATE_SECONDS = 15.0
+
+# Speculative reports one session may queue per issue
+MAX_SPECULATIONS = 3
+
+
+def speculation_enabled() -> bool:
+    """False when PRIVACY_ADVISOR_SPECULATE=0."""
+    return os.environ.get("PRIVACY_ADVISOR_SPECULATE", "1") != "0"
+
+
+def ready_to_speculate(questions: List[Dict[str, Any]], answers: Dict[str, Any], unchanged_for: float,
+                       settle: float = SETTLE_SECONDS) -> bool:
+    """
+    Whether the follow-up answers are worth generating a report for.
+
+    Args:
+        questions: Follow-up questions shown in Step 3
+        answers: Answers the user gave by question id (not widget defaults)
+        unchanged_for: Seconds since the answers last changed
+        settle: Seconds the answers must stay unchanged
+
+    Returns:
+        True when as many questions are answered as the Generate button
+        needs and the answers have settled
+    """
+    if not questions:
+        return False
+    answered = sum(1 for question in questions if question["id"] in answers)
+    return answered >= len(questions) - 1 and unchanged_for >= settle
+
+
+def may_speculate(started: int, since_last: Optional[float], interval: float = RESPECULATE_SECONDS,
+                  limit: int = MAX_SPECULATIONS) -> bool:
+    """
+    Per-session rate limit on speculative reports.
+
+    Args:
+        started: Speculative reports the session queued for this issue
+        since_last: Seconds since the last one (None if there was none)
+        interval: Minimum seconds between two of them
+        limit: Maximum per issue
+
+    Returns:
+        True when another speculative report may be queued
+    """
+    if started >= limit:
+        return False
+    return since_last is None or since_last >= interval
+
+
+class SpeculationStats:
+    """Process-wide speculation counters (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zero every counter."""
+        with self._lock:
+            self._counts = {"started": 0, "cancelled": 0, "reports": 0, "hits": 0, "saved_seconds_total": 0.0}
+
+    def started(self):
+        """A speculative report job was queued."""
+        with self._lock:
+            self._counts["started"] += 1
+
+    def cancelled(self):
+        """A speculative job was dropped because the answers changed."""
+        with self._lock:
+            self._counts["cancelled"] += 1
+
+    def report(self, hit: bool, saved_seconds: float = 0.0):
+        """
+        A Step 4 report was requested.
+
+        Args:
+            hit: Whether a speculative job for the final answers existed
+            saved_seconds: How long that job had been queued or running
+        """
+        with self._lock:
+            self._counts["reports"] += 1
+            if hit:
+                self._counts["hits"] += 1
+                self._counts["saved_seconds_total"] += saved_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict with started, cancelled, reports, hits, hit_rate (hits per
+            report), saved_seconds_total and saved_seconds_mean (per hit)
+        """
+        with self._lock:
+            stats = dict(self._counts)
+        stats["hit_rate"] = stats["hits"] / stats["reports"] if stats["reports"] else 0.0
+        stats["saved_seconds_mean"] = stats["saved_seconds_total"] / stats["hits"] if stats["hits"] else 0.0
+        return stats
+
+
+SPECULATION = SpeculationStats()
@@ -0,0 +1,132 @@
+"""
+Background warm-up of shared process state
+
+The first visitor otherwise pays for everything that is loaded lazily: the
+google.generativeai import (most of a second), parsing the knowledge base
+rules, compiling data/questions.json, loading the next-question table and
+building the pooled Gemini model for their API key. start_warmup() does that
+work on a daemon thread while the first page renders. Every step goes
+through the same per-process caches the app uses, so warm-up only changes
+when the cost is paid. Set PRIVACY_ADVISOR_WARMUP=0 to turn it off.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds spent per warm-up step, filled in as steps finish
+WARMUP_TIMINGS: Dict[str, float] = {}
+
+_started = set()
+_lock = threading.Lock()
+
+
+def warmup_enabled() -> bool:
+    """False when PRIVACY_ADVISOR_WARMUP=0."""
+    return os.environ.get("PRIVACY_ADVISOR_WARMUP", "1") != "0"
+
+
+def _import_genai():
+    import google.generativeai  # noqa: F401
+
+
+def _load_rules():
+    from src.knowledge_base_mapper import get_rules
+    get_rules()
+
+
+def _load_questions():
+    from src.question_graph import get_question_set
+    get_question_set()
+
+
+def _load_path_table():
+    from src.question_paths import get_path_table
+    get_path_table()
+
+
+STEPS = (
+    ("rules", _load_rules),
+    ("questions", _load_questions),
+    ("path_table", _load_path_table),
+    ("genai_import", _import_genai),
+)
+
+
+def _model_step(api_key: str, model_name: str):
+    def build_model():
+        from src.gemini_pool import GEMINI_POOL
+        GEMINI_POOL.get(api_key, model_name)
+    return (f"model:{model_name}", build_model)
+
+
+def _run_steps(steps) -> Dict[str, float]:
+    timings = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.warning("warm-up step %s failed", name, exc_info=True)
+            continue
+        timings[name] = time.perf_counter() - start
+    WARMUP_TIMINGS.update(timings)
+    return timings
+
+
+def warm_up(api_key: Optional[str] = None, model_name: Optional[str] = None) -> Dict[str, float]:
+    """
+    Load shared state now, in the calling thread.
+
+    A failing step is logged and skipped: the app loads the same thing again
+    on first use and reports the error there.
+
+    Args:
+        api_key: If given with model_name, also build the pooled Gemini model
+        model_name: Gemini model to build
+
+    Returns:
+        Seconds spent per step
+    """
+    steps = list(STEPS)
+    if api_key and model_name:
+        steps.append(_model_step(api_key, model_name))
+    return _run_steps(steps)
+
+
+def start_warmup(api_key: Optional[str] = None, model_name: Optional[str] = None) -> Optional[threading.Thread]:
+    """
+    Warm up on a daemon thread; each part runs at most once per process.
+
+    Cheap enough to call on every Streamlit rerun: the shared state is
+    warmed on the first call, a model on the first call with its API key.
+
+    Args:
+        api_key: Optional Gemini API key whose model should be built
+        model_name: Gemini model to build for api_key
+
+    Returns:
+        The started thread, or None if there was nothing left to warm up
+    """
+    if not warmup_enabled():
+        return None
+    steps = []
+    with _lock:
+        if "shared" not in _started:
+            _started.add("shared")
+            steps.extend(STEPS)
+        if api_key and model_name:
+            task = (hashlib.sha256(api_key.encode("utf-8")).hexdigest(), model_name)
+            if task not in _started:
+                _started.add(task)
+                steps.append(_model_step(api_key, model_name))
+    if not steps:
+        return None
+    thread = threading.Thread(target=_run_steps, args=(steps,), name="privacy-advisor-warmup", daemon=True)
+    thread.start()
+    return thread
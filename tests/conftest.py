@@ -0,0 +1,35 @@
+import pytest
+
+PLATFORMS = ["Facebook", "Instagram", "Twitter/X", "LinkedIn", "TikTok"]
+PERMISSIONS = ["Location", "Contacts", "Camera", "Microphone", "None"]
+
+
+def _random_profile(rng):
+    profile = {
+        field: rng.choice(["yes", "no"])
+        for field in ("password_reuse", "password_manager", "two_factor", "public_wifi",
+                      "vpn", "os_update", "backup_data", "email_encryption")
+    }
+    profile["social_media"] = rng.sample(PLATFORMS, rng.randint(0, len(PLATFORMS)))
+    profile["app_permissions"] = rng.sample(PERMISSIONS, rng.randint(0, len(PERMISSIONS)))
+    return profile
+
+
+def _random_answer(rng, question):
+    if question["type"] == "yes_no":
+        return rng.choice(["yes", "no"])
+    if question["type"] == "choice":
+        return rng.choice(list(question["options"]))
+    return "some text"
+
+
+@pytest.fixture
+def random_profile():
+    """Build a random complete user profile from a random.Random."""
+    return _random_profile
+
+
+@pytest.fixture
+def random_answer():
+    """Pick a random answer to a question-graph question from a random.Random."""
+    return _random_answer
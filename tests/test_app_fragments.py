@@ -0,0 +1,177 @@
+import os
+import time
+
+import pytest
+
+from src.gemini_pool import GEMINI_POOL
+from src.gemini_stub import REPORT, stub_factory
+from src.issue_classifier import IssueClassifier
+from src.job_queue import JOB_QUEUE
+from src.report_cache import REPORT_CACHE
+from src.speculation import SPECULATION
+
+app_test = pytest.importorskip("streamlit.testing.v1")
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def poll(at, done, timeout=10.0):
+    """Rerun until a background job has landed (AppTest cannot tick run_every fragments)."""
+    deadline = time.monotonic() + timeout
+    while not done():
+        assert time.monotonic() < deadline, "background job did not finish"
+        time.sleep(0.05)
+        at.run()
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setenv("PRIVACY_ADVISOR_WARMUP", "0")
+    monkeypatch.setenv("PRIVACY_ADVISOR_SPECULATE", "0")
+    monkeypatch.setattr(GEMINI_POOL, "factory", stub_factory())
+    GEMINI_POOL.clear()
+    at = app_test.AppTest.from_file(APP, default_timeout=30).run()
+    at.sidebar.text_input[0].input("test-key").run()
+    at.text_area(key="issue_input").input("My email was in a breach").run()
+    at.button[0].click().run()
+    poll(at, lambda: at.session_state.issue_classified)
+    yield at
+    GEMINI_POOL.clear()
+
+
+def test_category_icon_needs_no_classifier():
+    assert IssueClassifier.get_category_icon("network_security") == "🌐"
+    assert IssueClassifier.get_category_icon("unknown") == "🔒"
+
+
+def test_followup_fragment_to_report(session):
+    at = session
+    assert not at.exception
+    assert "### 👤 Category" in [m.value for m in at.markdown]
+
+    at.radio(key="followup_q1").set_value("No").run()
+    at.text_input(key="followup_q4").input("none").run()
+    assert at.session_state.followup_answers["q1"] == "No"
+
+    next(b for b in at.button if "Generate" in b.label).click().run()
+    assert not at.exception
+    assert at.session_state.report_generated
+    assert at.query_params["job"]
+    poll(at, lambda: at.session_state.final_report is not None)
+    assert not at.exception
+    assert REPORT["analysis"] in [m.value for m in at.markdown]
+
+
+def test_reload_picks_up_report_job(session):
+    at = session
+    at.radio(key="followup_q1").set_value("Yes").run()
+    next(b for b in at.button if "Generate" in b.label).click().run()
+    job_id = at.query_params["job"]
+
+    reloaded = app_test.AppTest.from_file(APP, default_timeout=30)
+    reloaded.query_params["job"] = job_id
+    reloaded.run()
+    assert reloaded.session_state.active_job == job_id
+    assert reloaded.session_state.followup_answers["q1"] == "Yes"
+    reloaded.sidebar.text_input[0].input("test-key").run()
+    poll(reloaded, lambda: reloaded.session_state.final_report is not None)
+    assert REPORT["analysis"] in [m.value for m in reloaded.markdown]
+
+
+def answer_every_followup(at):
+    at.radio(key="followup_q1").set_value("No").run()
+    at.radio(key="followup_q2").set_value("No").run()
+    at.selectbox(key="followup_q3").set_value("Mobile").run()
+    at.text_input(key="followup_q4").input("none").run()
+
+
+@pytest.fixture
+def speculating(session, monkeypatch):
+    monkeypatch.setenv("PRIVACY_ADVISOR_SPECULATE", "1")
+    monkeypatch.setattr("src.speculation.SETTLE_SECONDS", 0.2)
+    SPECULATION.reset()
+    return session
+
+
+def test_untouched_form_never_speculates(speculating):
+    at = speculating
+    # Every yes/no and choice question has a default, but none was answered
+    at.text_input(key="followup_q4").input("none").run()
+    deadline = time.monotonic() + 1.0
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        at.run()
+        assert at.session_state.speculative_job is None
+    assert SPECULATION.stats()["started"] == 0
+
+
+def test_complete_answers_start_the_report_early(speculating):
+    at = speculating
+    at.radio(key="followup_q1").set_value("No").run()
+    assert at.session_state.speculative_job is None
+    answer_every_followup(at)
+    poll(at, lambda: at.session_state.speculative_job is not None)
+    JOB_QUEUE.wait(at.session_state.speculative_job, timeout=10)
+
+    next(b for b in at.button if "Generate" in b.label).click().run()
+    assert not at.exception
+    assert at.session_state.final_report["analysis"] == REPORT["analysis"]
+    stats = SPECULATION.stats()
+    assert (stats["started"], stats["reports"], stats["hits"], stats["cancelled"]) == (1, 1, 1, 0)
+    assert stats["saved_seconds_total"] > 0
+
+
+def test_changed_answers_do_not_respeculate_at_once(speculating):
+    at = speculating
+    answer_every_followup(at)
+    poll(at, lambda: at.session_state.speculative_job is not None)
+    at.radio(key="followup_q1").set_value("Yes").run()
+    poll(at, lambda: at.session_state.speculative_key is None)
+    # The stale job was dropped, and the next one waits for RESPECULATE_SECONDS
+    time.sleep(0.3)
+    at.run()
+    assert at.session_state.speculative_job is None
+    assert SPECULATION.stats()["started"] == 1
+
+
+def test_snapshot_restores_the_report_after_a_restart(session, monkeypatch, tmp_path):
+    monkeypatch.setenv("PRIVACY_ADVISOR_SNAPSHOTS", str(tmp_path / "snapshots.db"))
+    # Snapshots apply to sessions started after they are enabled
+    at = app_test.AppTest.from_file(APP, default_timeout=30).run()
+    token = at.query_params["session"]
+    at.sidebar.text_input[0].input("test-key").run()
+    at.text_area(key="issue_input").input("My email was in a breach").run()
+    at.button[0].click().run()
+    poll(at, lambda: at.session_state.issue_classified)
+    at.text_input(key="followup_q4").input("none").run()
+    next(b for b in at.button if "Generate" in b.label).click().run()
+    poll(at, lambda: at.session_state.final_report is not None)
+
+    # A new server process: no job queue entry, no shared report cache
+    def no_gemini(*args, **kwargs):
+        raise AssertionError("restored session called Gemini")
+
+    monkeypatch.setattr(GEMINI_POOL, "factory", no_gemini)
+    GEMINI_POOL.clear()
+    REPORT_CACHE.clear()
+    restored = app_test.AppTest.from_file(APP, default_timeout=30)
+    restored.query_params["session"] = token
+    restored.run()
+    restored.sidebar.text_input[0].input("test-key").run()
+    assert not restored.exception
+    assert restored.session_state.report_generated
+    assert restored.session_state.followup_answers["q4"] == "none"
+    assert REPORT["analysis"] in [m.value for m in restored.markdown]
+
+
+def test_streamed_report_parts_show_while_generating(session, monkeypatch):
+    monkeypatch.setattr(GEMINI_POOL, "factory", stub_factory(latency=2.0))
+    GEMINI_POOL.clear()
+    at = session
+    at.text_input(key="followup_q4").input("streamed").run()
+    next(b for b in at.button if "Generate" in b.label).click().run()
+    poll(at, lambda: REPORT["analysis"] in [m.value for m in at.markdown])
+    # The analysis is on the page before the report has finished
+    assert at.session_state.final_report is None
+    poll(at, lambda: at.session_state.final_report is not None)
+    assert at.session_state.final_report == REPORT
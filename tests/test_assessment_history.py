@@ -0,0 +1,73 @@
+import shutil
+import threading
+
+import pytest
+
+from src.app_controller import AppController
+from src.assessment_history import AssessmentHistory
+from src.knowledge_base_mapper import ENGINE_PATH, kb_version
+
+
+def test_changes_since_last(tmp_path):
+    history = AssessmentHistory(str(tmp_path / "history.db"))
+    controller = AppController(history=history, user_id="alice")
+    controller.update_input("two_factor", "no")
+    controller.update_input("vpn", "no")
+    controller.run_analysis()
+
+    assert controller.changes_since_last() is None
+
+    controller.update_input("two_factor", "yes")
+    controller.update_input("backup_data", "no")
+    controller.run_analysis()
+
+    diff = controller.changes_since_last()
+    assert diff["new_rules"] == ["no-backup-rule"]
+    assert diff["resolved_rules"] == ["no-two-factor-rule"]
+    assert diff["unchanged_rules"] == ["no-vpn-rule"]
+    assert diff["risk_score_change"] == -10
+    assert diff["risk_level"] == ("High", "Medium")
+    assert diff["changed_answers"] == {"backup_data": (None, "no"), "two_factor": ("no", "yes")}
+    assert not diff["kb_changed"]
+
+
+def test_batched_writes_from_several_threads(tmp_path):
+    history = AssessmentHistory(str(tmp_path / "history.db"))
+    result = AppController().run_analysis()
+
+    def worker(worker_id):
+        for batch in range(5):
+            history.record_many((f"user-{worker_id}", result, float(batch * 100 + i)) for i in range(100))
+        history.close()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latest = history.history("user-3", limit=1)[0]
+    assert latest["created_at"] == 499.0
+    assert history.count() == 2000
+    assert history.count("user-0") == 500
+
+
+def test_anonymous_analyses_are_not_recorded(tmp_path):
+    history = AssessmentHistory(str(tmp_path / "history.db"))
+    controller = AppController(history=history)
+    controller.update_input("vpn", "no")
+    controller.run_analysis()
+
+    assert history.count() == 0
+    assert controller.changes_since_last() is None
+    with pytest.raises(ValueError, match="user id"):
+        history.record(None, controller.run_analysis())
+
+
+def test_kb_version_covers_the_python_rules(tmp_path):
+    engine = tmp_path / "inference_engine.py"
+    shutil.copy(ENGINE_PATH, engine)
+    assert kb_version(engine_path=str(engine)) == kb_version()
+
+    engine.write_text(engine.read_text(encoding="utf-8").replace("20\n", "25\n", 1), encoding="utf-8")
+    assert kb_version(engine_path=str(engine)) != kb_version()
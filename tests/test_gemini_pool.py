@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from src.gemini_pool import GeminiClientPool
+from src.issue_classifier import IssueClassifier
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_models_are_shared_per_key_and_model():
+    built = []
+    pool = GeminiClientPool(factory=lambda key, name: built.append((key, name)) or object())
+    first = pool.get("key-a", "gemini-2.5-flash")
+    assert pool.get("key-a", "gemini-2.5-flash") is first
+    assert pool.get("key-b", "gemini-2.5-flash") is not first
+    assert pool.get("key-a", "gemini-pro") is not first
+    assert built == [("key-a", "gemini-2.5-flash"), ("key-b", "gemini-2.5-flash"), ("key-a", "gemini-pro")]
+    stats = pool.stats()
+    assert stats["hits"] == 1 and stats["constructions"] == 3 and stats["size"] == 3
+    # Only the hashed key identifies a model in the pool
+    assert "key-a" not in repr(list(pool._entries))
+
+
+def test_lru_bound_and_idle_eviction():
+    clock = FakeClock()
+    pool = GeminiClientPool(max_size=2, idle_ttl=60, factory=lambda key, name: object(), clock=clock)
+    a = pool.get("a", "m")
+    pool.get("b", "m")
+    pool.get("a", "m")
+    pool.get("c", "m")  # evicts b, the least recently used
+    assert len(pool) == 2 and pool.get("a", "m") is a
+    assert pool.stats()["evicted_lru"] == 1
+
+    clock.now = 61
+    assert pool.evict_idle() == 2
+    assert pool.get("a", "m") is not a
+    assert pool.stats()["evicted_idle"] == 2
+
+
+def test_concurrent_callers_share_one_construction():
+    calls = []
+
+    def slow_factory(key, name):
+        calls.append(key)
+        time.sleep(0.05)
+        return object()
+
+    pool = GeminiClientPool(factory=slow_factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(pool.get("k", "m"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == ["k"]
+    assert len({id(model) for model in results}) == 1
+    assert pool.stats()["construction_seconds_max"] >= 0.05
+
+
+def test_failed_construction_is_not_cached():
+    attempts = []
+
+    def flaky(key, name):
+        attempts.append(key)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return object()
+
+    pool = GeminiClientPool(factory=flaky)
+    with pytest.raises(RuntimeError):
+        pool.get("k", "m")
+    assert pool.get("k", "m") is not None
+    assert pool.stats()["construction_errors"] == 1
+    with pytest.raises(ValueError):
+        pool.get("", "m")
+
+
+def test_isolated_clients_keep_their_own_key():
+    pytest.importorskip("google.generativeai")
+    pool = GeminiClientPool()
+    first = IssueClassifier("key-a", pool=pool)
+    second = IssueClassifier("key-b", pool=pool)
+    assert first.model._client._transport._credentials.token == "key-a"
+    assert second.model._client._transport._credentials.token == "key-b"
+    assert IssueClassifier("key-a", pool=pool).model is first.model
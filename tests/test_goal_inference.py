@@ -0,0 +1,67 @@
+import builtins
+import random
+
+from src.app_controller import AppController
+from src.chat_interface import ChatInterface
+from src.goal_inference import GoalDrivenInference
+from src.inference_engine import InferenceEngine
+from src.utils import calculate_risk_level, sort_recommendations
+
+
+def test_settled_outcome_matches_full_assessment(random_profile):
+    goal = GoalDrivenInference()
+    rng = random.Random(2)
+    asked = []
+    for _ in range(300):
+        profile = random_profile(rng)
+        answers = {}
+        while (field := goal.next_question(answers)) is not None:
+            assert field not in answers
+            answers[field] = profile[field]
+        asked.append(len(answers))
+
+        recommendations, risk_score = InferenceEngine().process(profile)
+        state = goal.status(answers)
+        assert state["settled"]
+        assert state["min_score"] <= risk_score <= state["max_score"]
+        assert state["risk_level"] == calculate_risk_level(risk_score)
+        assert state["top_recommendations"] == [r["rule"] for r in sort_recommendations(recommendations)][:3]
+    assert sorted(asked)[len(asked) // 2] < len(goal.questions)
+
+
+def test_bounds_of_partial_profile():
+    state = GoalDrivenInference().status({"password_reuse": "yes", "two_factor": "no", "vpn": "no"})
+    assert state["min_score"] == 20 + 20 + 12
+    assert state["risk_level"] == "Critical"
+    assert "public-wifi-no-vpn-rule" in state["open"]
+    assert not state["settled"]
+
+
+def test_chat_interface_goal_mode(monkeypatch, capsys):
+    risky = {"password_reuse": "yes", "password_manager": "no", "two_factor": "no", "public_wifi": "yes",
+             "vpn": "no", "os_update": "no", "backup_data": "no", "email_encryption": "no"}
+    chat = ChatInterface(InferenceEngine(), goal_driven=True)
+    by_question = {q["question"]: q["key"] for q in chat.questions}
+    asked = []
+
+    def fake_input(prompt):
+        last_question = [line for line in capsys.readouterr().out.splitlines() if line.startswith("[Q")][-1]
+        key = by_question[last_question.split("] ", 1)[1]]
+        asked.append(key)
+        return risky.get(key, "Facebook Instagram Twitter TikTok")
+
+    monkeypatch.setattr(builtins, "input", fake_input)
+    assert chat.run()
+    assert len(asked) < len(chat.questions)
+    assert "skipped" in capsys.readouterr().out
+
+
+def test_app_controller_goal_questions():
+    controller = AppController()
+    first = controller.next_goal_question()
+    assert first is not None
+    for field in ("password_reuse", "two_factor", "os_update", "password_manager"):
+        controller.update_input(field, "yes" if field == "password_reuse" else "no")
+    assert controller.goal_status()["risk_level"] == "Critical"
+    controller.reset()
+    assert controller.goal_status()["min_score"] == 0
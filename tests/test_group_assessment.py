@@ -0,0 +1,54 @@
+import random
+
+from src.app_controller import AppController
+from src.group_assessment import GroupAssessment
+
+FIELDS = ["password_reuse", "password_manager", "two_factor", "public_wifi",
+          "vpn", "os_update", "backup_data", "email_encryption"]
+
+
+def _full_rescore(group):
+    """Recompute the aggregates from scratch for comparison"""
+    fresh = GroupAssessment(group.name)
+    for member_id, member in group.members.items():
+        fresh.add_member(member_id, member["user_data"])
+    return fresh
+
+
+def test_incremental_updates_match_full_rescore():
+    rng = random.Random(7)
+    group = GroupAssessment("acme")
+    for idx in range(200):
+        group.add_member(f"m{idx}", {field: rng.choice(["yes", "no"]) for field in FIELDS})
+
+    for _ in range(300):
+        group.update_answer(f"m{rng.randrange(200)}", rng.choice(FIELDS), rng.choice(["yes", "no"]))
+    group.remove_member("m0")
+
+    expected = _full_rescore(group)
+    assert group.summary() == expected.summary()
+    assert group.population.to_dict() == expected.population.to_dict()
+
+
+def test_weakest_members_and_top_rules():
+    group = GroupAssessment("household")
+    group.add_member("alice", {"two_factor": "no", "password_reuse": "yes"})
+    group.add_member("bob", {"two_factor": "no"})
+    group.add_member("carol", {})
+
+    assert group.weakest_members(2) == [("alice", 40), ("bob", 20)]
+    assert group.top_rules(1) == [("no-two-factor-rule", 2)]
+    assert group.risk_distribution() == {"Low": 1, "Medium": 1, "High": 1, "Critical": 0}
+
+    group.update_answer("alice", "password_reuse", "no")
+    assert group.weakest_members(1) == [("alice", 20)]
+
+
+def test_controller_saves_into_group():
+    group = GroupAssessment("team")
+    controller = AppController()
+    controller.update_input("vpn", "no")
+    controller.save_to_group(group, "dave")
+
+    assert group.members["dave"]["risk_score"] == 12
+    assert group.members["dave"]["rule_hits"] != 0
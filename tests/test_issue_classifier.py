@@ -0,0 +1,131 @@
+import json
+
+from src.gemini_pool import GeminiClientPool
+from src.gemini_stub import CLASSIFICATION, FOLLOWUP_QUESTIONS, REPORT, StubModel, StubResponse
+from src.issue_classifier import IssueClassifier, validate_classification, validate_followup_questions
+
+
+def classifier(model, **kwargs):
+    return IssueClassifier("key", pool=GeminiClientPool(factory=lambda key, name: model), **kwargs)
+
+
+class ScriptedModel(StubModel):
+    """Stub whose combined response is replaced by a fixed text"""
+
+    def __init__(self, combined_text):
+        super().__init__()
+        self.combined_text = combined_text
+        self.prompts = []
+
+    def generate_content(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        if '"followup_questions"' in prompt:
+            self.calls += 1
+            return StubResponse(self.combined_text)
+        return super().generate_content(prompt)
+
+
+def test_single_request_returns_both_parts():
+    model = StubModel()
+    classification, questions = classifier(model).analyze_issue("My email was in a breach")
+    assert model.calls == 1
+    assert classification["primary_category"] == CLASSIFICATION["primary_category"]
+    assert questions == FOLLOWUP_QUESTIONS
+
+
+def test_two_request_mode():
+    model = StubModel()
+    classification, questions = classifier(model, single_request=False).analyze_issue("breach")
+    assert model.calls == 2
+    assert classification == CLASSIFICATION
+    assert questions == FOLLOWUP_QUESTIONS
+
+
+def test_unusable_combined_response_falls_back_to_two_requests():
+    model = ScriptedModel("not json")
+    classification, questions = classifier(model).analyze_issue("breach")
+    assert model.calls == 3
+    assert classification == CLASSIFICATION
+    assert questions == FOLLOWUP_QUESTIONS
+
+
+def test_only_invalid_questions_are_asked_again():
+    model = ScriptedModel(json.dumps({"classification": CLASSIFICATION, "followup_questions": "none"}))
+    classification, questions = classifier(model).analyze_issue("breach")
+    assert model.calls == 2
+    assert "follow-up questions" in model.prompts[-1]
+    assert questions == FOLLOWUP_QUESTIONS
+
+
+class BrokenModel(StubModel):
+    """Stub that answers every request with a fixed text"""
+
+    def __init__(self, text):
+        super().__init__()
+        self.text = text
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        return StubResponse(self.text)
+
+
+def test_two_request_replies_are_validated():
+    model = BrokenModel(json.dumps([{"id": 1, "question": "Do you reuse passwords?", "type": "choice"}]))
+    classification = classifier(model).classify_issue("breach")
+    assert classification["primary_category"] == "general"
+    assert "error" in classification
+    questions = classifier(model).generate_followup_questions(classification)
+    assert questions == [{"id": "q1", "question": "Do you reuse passwords?", "type": "text", "context": ""}]
+
+    model.text = json.dumps(dict(CLASSIFICATION, confidence="high", risk_level=400))
+    classification = classifier(model).classify_issue("breach")
+    assert "error" not in classification
+    assert "confidence" not in classification and classification["risk_level"] == 100
+    # A classification is not a list of questions: the default questions are asked
+    questions = classifier(model).generate_followup_questions(classification)
+    assert [q["id"] for q in questions] == ["q1", "q2"]
+
+
+def test_validation_normalizes_model_output():
+    classification = validate_classification(dict(
+        CLASSIFICATION, primary_category="crypto", severity="HIGH", risk_level="140", confidence=3,
+        secondary_categories=["password_security", "other"]))
+    assert classification["primary_category"] == "general"
+    assert classification["severity"] == "high"
+    assert classification["risk_level"] == 100
+    assert classification["confidence"] == 1.0
+    assert classification["secondary_categories"] == ["password_security"]
+    assert validate_classification({"summary": "x", "key_concerns": []}) is None
+
+    questions = validate_followup_questions([
+        {"id": "q1", "question": "Use a VPN?", "type": "yes_no", "options": ["x"]},
+        {"id": "q1", "question": "Which browser?", "type": "choice"},
+        {"question": "  "},
+        "not a question",
+    ])
+    assert [(q["id"], q["type"]) for q in questions] == [("q1", "yes_no"), ("q2", "text")]
+    assert "options" not in questions[0]
+    assert validate_followup_questions([]) is None
+
+
+def test_streamed_report_yields_parts_then_the_report():
+    issue_data = {"user_issue": "breach", "classification": CLASSIFICATION, "followup_answers": {"q1": "No"}}
+    model = StubModel()
+    reports = list(classifier(model).stream_report(issue_data))
+    assert model.calls == 1
+    assert reports[0] == {"analysis": REPORT["analysis"], "partial": True}
+    assert all(report["partial"] for report in reports[:-1])
+    assert reports[-1] == REPORT
+    assert classifier(StubModel()).generate_report(issue_data) == REPORT
+
+
+def test_broken_stream_falls_back_to_the_rule_engine():
+    class DroppedStream(StubModel):
+        def generate_content(self, prompt, stream=False, **kwargs):
+            yield StubResponse(json.dumps(REPORT)[:40])
+            raise ConnectionError("stream reset")
+
+    issue_data = {"user_issue": "breach", "classification": CLASSIFICATION, "followup_answers": {}}
+    reports = list(classifier(DroppedStream()).stream_report(issue_data))
+    assert reports[-1]["source"] == "local"
+    assert reports[-1]["error"] == "stream reset"
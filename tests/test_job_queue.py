@@ -0,0 +1,129 @@
+import threading
+
+import pytest
+
+from src.job_queue import CANCELLED, DONE, FAILED, QUEUED, JobQueue, JobQueueFull, job_cancelled, report_progress
+
+
+@pytest.fixture
+def queue():
+    jobs = JobQueue(max_workers=1, max_queue=2)
+    yield jobs
+    jobs.shutdown(wait=False)
+
+
+def blocker(queue):
+    """Occupy the single worker until the returned event is set."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def work():
+        started.set()
+        release.wait(5)
+        return "blocked"
+
+    job_id = queue.submit(work, kind="block")
+    started.wait(5)
+    return job_id, release
+
+
+def test_result_and_metadata(queue):
+    job_id = queue.submit(lambda a, b=0: a + b, 2, b=3, kind="add", meta={"user_issue": "x"})
+    status = queue.wait(job_id, timeout=5)
+    assert status["state"] == DONE
+    assert status["result"] == 5
+    assert status["kind"] == "add"
+    assert status["meta"] == {"user_issue": "x"}
+    assert queue.status("missing") is None
+
+
+def test_failure_is_reported_not_raised(queue):
+    def boom():
+        raise ValueError("quota")
+
+    status = queue.wait(queue.submit(boom, key="k"), timeout=5)
+    assert status["state"] == FAILED
+    assert status["error"] == "ValueError: quota"
+    # Failed work is retried on the next submit
+    assert queue.find("k") is None
+
+
+def test_same_key_is_deduplicated(queue):
+    first = queue.submit(lambda: 1, key="report")
+    assert queue.submit(lambda: 2, key="report") == first
+    assert queue.wait(first, timeout=5)["result"] == 1
+    assert queue.submit(lambda: 3, key="report") == first
+    assert queue.stats()["deduplicated"] == 2
+
+    assert queue.discard(first)
+    assert queue.find("report") is None
+    assert queue.submit(lambda: 3, key="report") != first
+
+
+def test_queue_depth_and_rejection(queue):
+    running, release = blocker(queue)
+    waiting = [queue.submit(lambda: None), queue.submit(lambda: None)]
+    stats = queue.stats()
+    assert stats["running"] == 1
+    assert stats["queue_depth"] == 2
+    with pytest.raises(JobQueueFull):
+        queue.submit(lambda: None)
+
+    release.set()
+    for job_id in [running] + waiting:
+        queue.wait(job_id, timeout=5)
+    stats = queue.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["max_queue_depth"] == 2
+    assert stats["rejected"] == 1
+    assert stats["done"] == 3
+
+
+def test_cancel_queued_job(queue):
+    _, release = blocker(queue)
+    ran = []
+    job_id = queue.submit(ran.append, 1, key="k")
+    assert queue.status(job_id)["state"] == QUEUED
+    assert queue.cancel(job_id)
+    assert queue.find("k") is None
+    release.set()
+    assert queue.wait(job_id, timeout=5)["state"] == CANCELLED
+    assert not queue.cancel(job_id)
+    assert ran == []
+    assert queue.stats()["queue_depth"] == 0
+
+
+def test_running_job_publishes_progress(queue):
+    reported, release = threading.Event(), threading.Event()
+
+    def work():
+        report_progress({"analysis": "so far"})
+        reported.set()
+        release.wait(5)
+        return "done"
+
+    job_id = queue.submit(work)
+    reported.wait(5)
+    assert queue.status(job_id)["progress"] == {"analysis": "so far"}
+    release.set()
+    assert queue.wait(job_id, timeout=5)["result"] == "done"
+    assert not report_progress("outside a job")
+
+
+def test_running_job_sees_its_cancellation(queue):
+    started, cancelled = threading.Event(), threading.Event()
+
+    def work():
+        started.set()
+        cancelled.wait(5)
+        return job_cancelled()
+
+    job_id = queue.submit(work, key="k")
+    started.wait(5)
+    assert queue.cancel(job_id)
+    assert queue.find("k") is None
+    cancelled.set()
+    status = queue.wait(job_id, timeout=5)
+    assert status["state"] == CANCELLED
+    assert status["result"] is None
+    assert not job_cancelled()
@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from src.app_controller import AppController
+from src.assessment_history import AssessmentHistory
+from src.kb_backfill import backfill, diff_rules
+from src.knowledge_base_mapper import KB_PATH, evaluate_rules, kb_version, load_rules, parse_rules
+from src.population_stats import PopulationAggregator
+from src.utils import calculate_risk_level, sort_recommendations
+
+
+def edited_kb(tmp_path):
+    with open(KB_PATH, encoding="utf-8") as f:
+        text = f.read()
+    # weight change, condition change and text-only change
+    text = text.replace("(risk-score 12)", "(risk-score 25)")
+    text = text.replace("(length$ ?sm) 3", "(length$ ?sm) 1")
+    text = text.replace('"Implement regular data backups"', '"Back up your data"')
+    path = tmp_path / "knowledge_base.clp"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_diff_rules(tmp_path):
+    changes = diff_rules(load_rules(), load_rules(edited_kb(tmp_path)))
+    assert sorted(changes) == ["many-social-media-rule", "no-backup-rule", "no-vpn-rule"]
+    assert changes["no-vpn-rule"]["weight_change"] == 13
+    assert not changes["no-vpn-rule"]["condition_changed"]
+    assert changes["many-social-media-rule"]["condition_changed"]
+    assert changes["many-social-media-rule"]["slots"] == ["social_media"]
+    assert changes["no-backup-rule"]["text_changed"]
+
+
+def test_backfill_matches_full_rescore(tmp_path, random_profile):
+    new_kb = edited_kb(tmp_path)
+    history = AssessmentHistory(str(tmp_path / "history.db"))
+    population = PopulationAggregator()
+    rng = random.Random(3)
+    old_version = kb_version()
+    for idx in range(400):
+        controller = AppController()
+        for field, value in random_profile(rng).items():
+            controller.update_input(field, value)
+        results = controller.run_analysis()
+        history.record(f"user-{idx}", results, kb_version=old_version)
+        population.observe(results)
+
+    stats = backfill(history, KB_PATH, new_kb, population=population, batch_size=64)
+    assert 0 < stats["updated"] <= stats["selected"] < 400
+
+    new_rules = load_rules(new_kb)
+    expected_population = PopulationAggregator()
+    for batch in history.iter_where("1"):
+        for stored in batch:
+            recommendations, score = evaluate_rules(new_rules, stored["profile"])
+            recommendations = sort_recommendations(recommendations)
+            assert stored["risk_score"] == score
+            assert stored["risk_level"] == calculate_risk_level(score)
+            assert [r["rule"] for r in stored["recommendations"]] == [r["rule"] for r in recommendations]
+            for rec in stored["recommendations"]:
+                if rec["rule"] == "no-backup-rule":
+                    assert rec["message"] == "Back up your data"
+            assert stored["kb_version"] == kb_version(new_kb)
+            expected_population.observe(
+                {"risk_score": score, "risk_level": stored["risk_level"], "recommendations": recommendations}
+            )
+    assert population.to_dict() == expected_population.to_dict()
+
+
+def test_new_rule_needs_a_bit(tmp_path):
+    path = tmp_path / "kb.clp"
+    path.write_text("""
+        (defrule brand-new-rule (user-profile (vpn no)) =>
+           (assert (recommendation (priority low) (category "c") (message "m")
+                   (details "d") (action "a") (risk-score 1))))
+    """, encoding="utf-8")
+    history = AssessmentHistory(str(tmp_path / "history.db"))
+    with pytest.raises(ValueError, match="brand-new-rule"):
+        backfill(history, KB_PATH, str(path))
+    assert parse_rules(path.read_text())["brand-new-rule"]["slots"] == ["vpn"]
+
+
+def test_selection_reads_lists_like_the_rules(tmp_path):
+    path = tmp_path / "knowledge_base.clp"
+    with open(KB_PATH, encoding="utf-8") as f:
+        path.write_text(f.read().replace("(> (length$ ?perms) 2)", "(< (length$ ?perms) 2)"), encoding="utf-8")
+    history = AssessmentHistory(str(tmp_path / "history.db"))
+    profiles = {
+        "none-of-these": {"app_permissions": ["None", "Camera", "Location"]},
+        "missing": {},
+        "many": {"app_permissions": ["Camera", "Location", "Contacts"]},
+    }
+    for user, profile in profiles.items():
+        results = {"user_data": profile, "risk_score": 0, "risk_level": "Low", "recommendations": []}
+        history.record(user, results, kb_version=kb_version())
+
+    stats = backfill(history, KB_PATH, str(path))
+    assert stats["updated"] == 2
+    scores = {user: history.history(user)[0]["risk_score"] for user in profiles}
+    assert scores == {"none-of-these": 10, "missing": 10, "many": 0}
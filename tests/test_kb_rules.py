@@ -0,0 +1,34 @@
+import random
+
+from src.inference_engine import RULE_IDS, InferenceEngine
+from src.knowledge_base_mapper import evaluate_rules, load_rules, parse_rules, rule_matches
+
+
+def test_parsed_rules_match_python_engine(random_profile):
+    rules = load_rules()
+    assert tuple(rules) == RULE_IDS
+
+    rng = random.Random(7)
+    for _ in range(300):
+        profile = random_profile(rng)
+        expected, expected_score = InferenceEngine().process(profile)
+        recommendations, score = evaluate_rules(rules, profile)
+        assert score == expected_score
+        assert [r["rule"] for r in recommendations] == [r["rule"] for r in expected]
+
+
+def test_partial_profiles_are_undecided():
+    rules = parse_rules("""
+        ; comment
+        (defrule wifi "Public Wi-Fi without VPN"
+           (user-profile (public-wifi yes) (vpn no))
+           =>
+           (assert (recommendation (priority high) (category "Network")
+                   (message "Use a VPN") (details "d") (action "a") (risk-score 18))))
+    """)
+    rule = rules["wifi"]
+    assert rule["slots"] == ["public_wifi", "vpn"]
+    assert rule["risk_score"] == 18
+    assert rule_matches(rule, {"public_wifi": "yes"}) is None
+    assert rule_matches(rule, {"public_wifi": "no"}) is False
+    assert rule_matches(rule, {"public_wifi": "yes", "vpn": "no"}) is True
@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("streamlit.testing.v1")
+
+from src.gemini_pool import GEMINI_POOL
+from src.load_harness import LoadHarness, percentile, shared_runtime
+
+
+def test_percentile_nearest_rank():
+    ordered = [float(i) for i in range(1, 101)]
+    assert percentile(ordered, 0.50) == 50.0
+    assert percentile(ordered, 0.95) == 95.0
+    assert percentile([3.0], 0.99) == 3.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_concurrent_sessions_complete_the_flow(monkeypatch):
+    monkeypatch.setenv("PRIVACY_ADVISOR_WARMUP", "0")
+    factory = GEMINI_POOL.factory
+    harness = LoadHarness(latency=0.0, trace_memory=True)
+    with shared_runtime():
+        result = harness.run_level(3)
+
+    assert result["errors"] == []
+    assert result["completed"] == 3
+    # load, api key, describe, classify, 4 follow-ups, report; plus reruns polling the jobs
+    polls = result["reruns"] - 3 * 9
+    assert polls >= 0
+    assert set(result["per_step"]) - {"poll"} == {"load", "api_key", "describe", "classify", "answer", "report"}
+    assert set(result["wait"]) == {"classify", "report"}
+    assert result["jobs"]["done"] == 6
+    assert result["jobs"]["failed"] == 0
+    assert result["p50"] <= result["p95"] <= result["max"]
+    assert result["heap_bytes_per_session"] > 0
+    assert GEMINI_POOL.factory is factory
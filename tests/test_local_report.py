@@ -0,0 +1,132 @@
+import pytest
+
+from src.gemini_pool import GeminiClientPool
+from src.gemini_stub import CLASSIFICATION, FOLLOWUP_QUESTIONS, REPORT, StubModel
+from src.issue_classifier import IssueClassifier, generate_issue_report
+from src.knowledge_base_mapper import profile_from_followups, question_slot, slot_for_question, yes_no_value
+from src.local_report import local_report, use_local_report
+
+ANSWERS = {"q1": "Yes", "q2": "No", "q3": "Mobile", "q4": "none so far"}
+
+
+def issue(confidence=None, answers=ANSWERS):
+    classification = dict(CLASSIFICATION)
+    if confidence is not None:
+        classification["confidence"] = confidence
+    return {
+        "user_issue": "My email was in a breach",
+        "classification": classification,
+        "followup_answers": answers,
+        "followup_questions": FOLLOWUP_QUESTIONS,
+    }
+
+
+def test_followups_map_onto_profile_slots():
+    assert slot_for_question("Do you use a password manager?") == "password_manager"
+    assert slot_for_question("Which devices do you use?") is None
+    assert yes_no_value("Never.") == "no"
+    assert yes_no_value("Not sure") is None
+    profile = profile_from_followups(FOLLOWUP_QUESTIONS, ANSWERS, "I also use public wifi at work")
+    assert profile == {"password_reuse": "yes", "two_factor": "no", "public_wifi": "yes"}
+    untagged = [{k: v for k, v in q.items() if k not in ("slot", "polarity")} for q in FOLLOWUP_QUESTIONS]
+    assert profile_from_followups(untagged, ANSWERS, "I also use public wifi at work") == profile
+
+
+@pytest.mark.parametrize("question", [
+    "Do you skip software updates?",
+    "Have you ever had an account not use two-factor authentication?",
+    "Do you use the same password without a password manager?",
+    "Don't you back up your files?",
+    "Did you update your recovery email?",
+    "Do you encrypt your hard drive?",
+    "Do you have backup codes for your accounts?",
+])
+def test_negated_or_unrelated_questions_are_not_mapped(question):
+    assert slot_for_question(question) is None
+    assert profile_from_followups([{"id": "q1", "question": question}], {"q1": "Yes"}) == {}
+
+
+def test_tagged_questions_follow_their_polarity():
+    questions = [
+        {"id": "q1", "question": "Do you skip system updates?", "slot": "os_update", "polarity": "negative"},
+        {"id": "q2", "question": "Do you back up your phone?", "slot": "backup_data", "polarity": "positive"},
+        # Tagged as not about a slot: keywords are not consulted
+        {"id": "q3", "question": "Do you use a VPN for streaming abroad?", "slot": None},
+        {"id": "q4", "question": "Do you use public wifi?", "slot": "wifi"},
+    ]
+    assert question_slot(questions[0]) == ("os_update", True)
+    assert question_slot(questions[2]) is None
+    answers = {"q1": "Yes", "q2": "No", "q3": "Yes", "q4": "Yes"}
+    assert profile_from_followups(questions, answers) == {"os_update": "no", "backup_data": "no"}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("I never reuse passwords", {}),
+    ("I don't use public wifi", {}),
+    ("I reuse passwords everywhere", {"password_reuse": "yes"}),
+    ("I never reuse passwords, but I use public wifi at work", {"public_wifi": "yes"}),
+    ("I don't reuse passwords but I do reuse passwords for games", {"password_reuse": "yes"}),
+])
+def test_negated_issue_cues_are_ignored(text, expected):
+    assert profile_from_followups([], {}, text) == expected
+
+
+def test_negated_issue_cues_do_not_fire_rules():
+    data = dict(issue(answers={}), user_issue="I never reuse passwords and I don't use public wifi")
+    report = local_report(data)
+    assert report["profile"] == {}
+    assert "password-reuse-rule" not in report["rules"]
+    assert "public-wifi-no-vpn-rule" not in report["rules"]
+
+
+def test_local_report_uses_the_rule_engine():
+    report = local_report(issue())
+    assert set(REPORT) <= set(report)
+    assert report["source"] == "local"
+    assert report["rules"] == ["password-reuse-rule", "no-two-factor-rule"]
+    assert report["risk_score"] == 40
+    assert [a["action"] for a in report["immediate_actions"]][0] == "Create unique passwords for each service immediately"
+    # The password manager rule is in the category but was not asked about
+    assert any(step["action"].startswith("Check:") for step in report["medium_term_steps"])
+    assert "Bitwarden" in report["tools_recommended"]
+    assert "error" not in report
+
+
+@pytest.mark.parametrize("classification, expected", [
+    ({"primary_category": "network_security", "confidence": 0.9}, True),
+    ({"primary_category": "network_security", "confidence": 0.5}, False),
+    ({"primary_category": "general", "confidence": 0.99}, False),
+    ({"primary_category": "network_security"}, False),
+    ({"primary_category": "network_security", "confidence": "high"}, False),
+    ({"primary_category": "network_security", "confidence": 0.9, "error": "x"}, False),
+])
+def test_use_local_report(classification, expected):
+    assert use_local_report(classification) is expected
+
+
+def test_confident_standard_issue_skips_gemini():
+    model = StubModel()
+    classifier = IssueClassifier("key", pool=GeminiClientPool(factory=lambda key, name: model))
+    assert classifier.generate_report(issue(confidence=0.95))["source"] == "local"
+    assert model.calls == 0
+    assert classifier.generate_report(issue(confidence=0.5)) == REPORT
+    assert model.calls == 1
+    unforced = IssueClassifier("key", pool=GeminiClientPool(factory=lambda key, name: model), local_confidence=None)
+    assert unforced.generate_report(issue(confidence=0.95)) == REPORT
+
+
+def test_outages_fall_back_to_local_report():
+    class Down:
+        def generate_content(self, prompt):
+            raise ConnectionError("service unavailable")
+
+    classifier = IssueClassifier("key", pool=GeminiClientPool(factory=lambda key, name: Down()))
+    report = classifier.generate_report(issue())
+    assert report["source"] == "local" and report["error"] == "service unavailable"
+    assert report["rules"] == ["password-reuse-rule", "no-two-factor-rule"]
+
+    def unreachable(key, name):
+        raise OSError("no network")
+
+    report = generate_issue_report("key", issue(), pool=GeminiClientPool(factory=unreachable))
+    assert report["source"] == "local" and report["error"] == "no network"
@@ -0,0 +1,49 @@
+from src.inference_engine import InferenceEngine
+from src.output_handler import OutputHandler, ResultsSummary
+from src.utils import sort_recommendations
+
+ALL_NO = {
+    "password_reuse": "yes", "password_manager": "no", "two_factor": "no",
+    "public_wifi": "yes", "vpn": "no", "os_update": "no", "backup_data": "no",
+    "email_encryption": "no", "app_permissions": ["Location", "Camera", "Contacts"],
+    "social_media": ["a", "b", "c", "d"],
+}
+
+
+def test_buckets_ordered_by_risk_score():
+    recommendations, risk_score = InferenceEngine().process(ALL_NO)
+    summary = ResultsSummary(recommendations, risk_score)
+
+    assert [r["risk_score"] for r in summary.high] == [20, 20, 18, 15, 15]
+    assert [r["risk_score"] for r in summary.medium] == [12, 10, 10, 8]
+    assert [p for p, _ in summary.buckets()] == ["high", "medium", "low"]
+    assert summary.recommendations == sort_recommendations(recommendations)
+    assert summary.stats == {
+        "total": 10, "high_priority": 5, "medium_priority": 4, "low_priority": 1,
+        "risk_score": 133, "risk_level": "Critical",
+    }
+
+
+def test_output_handler_uses_summary():
+    handler = OutputHandler()
+    recommendations, risk_level = handler.process_results(
+        [{"priority": "low", "risk_score": 1}, {"priority": "high", "risk_score": 2}], 3
+    )
+
+    assert [r["priority"] for r in recommendations] == ["high", "low"]
+    assert risk_level == "Low"
+    assert handler.get_summary_stats()["high_priority"] == 1
+
+
+def test_unknown_priorities_come_after_low():
+    recommendations = [
+        {"priority": "urgent", "risk_score": 30},
+        {"priority": "low", "risk_score": 2},
+        {"priority": "low", "risk_score": 5},
+    ]
+    summary = ResultsSummary(recommendations, 37)
+
+    assert summary.recommendations == sort_recommendations(recommendations)
+    assert [r["risk_score"] for r in summary.low] == [5, 2]
+    assert [p for p, _ in summary.buckets()] == ["low", "other"]
+    assert summary.stats["low_priority"] == 3
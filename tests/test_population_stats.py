@@ -0,0 +1,44 @@
+from src.app_controller import AppController
+from src.population_stats import PopulationAggregator
+from src.results_store import ResultsStore
+
+
+def test_share_below_and_quantile():
+    population = PopulationAggregator()
+    for score in (0, 10, 20, 30, 40, 50, 60, 70, 80, 90):
+        population.observe_values(score, 0)
+
+    assert population.share_below(70) == 0.7
+    assert population.share_below(0) == 0.0
+    assert population.quantile(0.5) == 40
+    assert population.level_counts == {"Low": 2, "Medium": 1, "High": 2, "Critical": 5}
+
+
+def test_controller_feeds_aggregator_and_state_merges(tmp_path):
+    first, second = PopulationAggregator(), PopulationAggregator()
+    for population, answer in ((first, "no"), (second, "yes")):
+        controller = AppController(population=population)
+        controller.update_input("two_factor", answer)
+        controller.run_analysis()
+
+    first.save(str(tmp_path / "a.json"))
+    second.save(str(tmp_path / "b.json"))
+    merged = PopulationAggregator.merge_files([str(tmp_path / "a.json"), str(tmp_path / "b.json")])
+
+    assert merged.total == 2
+    assert merged.rule_hit_rates()["no-two-factor-rule"] == 0.5
+    assert merged.share_below(20) == 0.5
+
+
+def test_observe_store_matches_observe(tmp_path):
+    store = ResultsStore(str(tmp_path / "results"))
+    live = PopulationAggregator()
+    controller = AppController(results_store=store, population=live)
+    for field in ("two_factor", "vpn", "backup_data"):
+        controller.update_input(field, "no")
+        controller.run_analysis()
+
+    batch = PopulationAggregator()
+    batch.observe_store(store)
+
+    assert batch.to_dict() == live.to_dict()
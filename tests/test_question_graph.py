@@ -0,0 +1,93 @@
+import json
+import random
+
+import pytest
+
+from src.question_graph import (
+    QUESTIONS_PATH,
+    compile_condition,
+    get_question_graph,
+    get_question_set,
+    load_question_set,
+)
+
+
+def scan_next_questions(user_data):
+    """The full-scan lookup the graph index replaces"""
+    graph = get_question_graph()
+    all_questions = graph.questions
+    if not user_data:
+        return list(graph.initial_questions)
+    next_questions = []
+    last_key = list(user_data)[-1]
+    follow_ups = all_questions.get(last_key, {}).get("follow_ups", {})
+    for key in follow_ups.get(user_data[last_key], []):
+        if key not in user_data:
+            next_questions.append(key)
+    for key, info in all_questions.items():
+        if key in user_data:
+            continue
+        depends_on = info.get("depends_on")
+        if depends_on is None or all(dep in user_data for dep in depends_on):
+            condition = info.get("condition")
+            if (condition is None or condition(user_data)) and key not in next_questions:
+                next_questions.append(key)
+    return next_questions[:1]
+
+
+def test_matches_full_scan_on_random_answer_orders(random_answer):
+    graph = get_question_graph()
+    rng = random.Random(11)
+    for _ in range(300):
+        keys = rng.sample(graph.order, rng.randint(0, len(graph.order)))
+        user_data = {}
+        for key in keys:
+            assert graph.next_questions(user_data) == scan_next_questions(user_data)
+            user_data[key] = random_answer(rng, graph.questions[key])
+        assert graph.next_questions(user_data) == scan_next_questions(user_data)
+
+
+def test_adaptive_interview_follows_up_last_answer():
+    graph = get_question_graph()
+    assert graph.next_questions({}) == list(graph.initial_questions)
+    assert len(graph.initial_questions) == 9
+    assert graph.next_questions({"password_reuse": "no"}) == ["password_manager"]
+    assert graph.next_questions({"password_reuse": "no", "password_manager": "yes"}) == ["password_reuse_avoided"]
+    assert get_question_graph() is graph
+
+
+def test_compile_condition():
+    predicate, names = compile_condition("password_reuse == 'yes' or password_manager == 'no'")
+    assert names == ("password_reuse", "password_manager")
+    assert predicate({"password_manager": "no"})
+    assert not predicate({"password_reuse": "no"})
+
+    in_list, _ = compile_condition("usage in ['Very Active', 'Moderately Active'] and not quiet")
+    assert in_list({"usage": "Very Active"})
+    assert not in_list({"usage": "Rarely"})
+
+    for source in ("__import__('os')", "data.get('x')", "x[0] == 1", "lambda: 1"):
+        with pytest.raises(ValueError):
+            compile_condition(source)
+
+
+def test_frontend_views_and_content_cache(tmp_path):
+    question_set = get_question_set()
+    cli = [q["key"] for q in question_set.for_frontend("cli")]
+    assert cli[0] == "password_reuse" and cli[-2:] == ["app_permissions", "social_media"]
+    assert question_set.for_frontend("cli")[-1]["type"] == "multislot"
+
+    tkinter = question_set.for_frontend("tkinter")
+    assert [q["key"] for q in tkinter[:2]] == ["social_media", "devices"]
+    assert tkinter[1]["options"][0] == "Smartphone"
+    assert "devices" not in question_set.graph.questions
+
+    copy = tmp_path / "questions.json"
+    copy.write_bytes(open(QUESTIONS_PATH, "rb").read())
+    assert load_question_set(str(copy)) is load_question_set(QUESTIONS_PATH)
+
+    document = json.loads(copy.read_text())
+    document["questions"][1]["follow_ups"]["yes"] = ["no_such_question"]
+    copy.write_text(json.dumps(document))
+    with pytest.raises(ValueError, match="no_such_question"):
+        load_question_set(str(copy))
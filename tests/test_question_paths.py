@@ -0,0 +1,42 @@
+import random
+
+from src.question_graph import get_question_set
+from src.question_paths import PathTable, build_path_table, get_path_table
+
+
+def test_table_matches_graph_on_every_interview_step(tmp_path, random_answer):
+    table = build_path_table()
+    graph = table.graph
+    assert table.report["unreachable"] == []
+    assert table.report["dead_ends"] == 0
+    assert table.report["longest_path"] > len(graph.initial_questions)
+
+    rng = random.Random(5)
+    for _ in range(500):
+        user_data = {}
+        while True:
+            expected = graph.next_questions(user_data)
+            assert table.next_questions(user_data) == expected
+            if not expected:
+                break
+            key = rng.choice(expected)
+            user_data[key] = random_answer(rng, graph.questions[key])
+
+    path = tmp_path / "paths.bin"
+    table.save(str(path))
+    loaded = PathTable.load(graph, str(path))
+    assert loaded.decisions == table.decisions
+    assert loaded.digest == get_question_set().digest
+
+
+def test_unlisted_answers_fall_back_to_graph():
+    table = build_path_table()
+    user_data = {"social_media_usage": "Sometimes, on weekends"}
+    assert table.codec.state_from_answers(user_data) is None
+    assert table.next_questions(user_data) == table.graph.next_questions(user_data)
+
+
+def test_shipped_table_is_current():
+    table = get_path_table()
+    assert table is not None, "run scripts/build_question_paths.py after editing data/questions.json"
+    assert table.decisions == build_path_table().decisions
@@ -0,0 +1,50 @@
+import gzip
+
+import pytest
+
+from src.app_controller import AppController
+from src.report_archive import ReportArchive
+from src.utils import format_report
+
+
+def _report(**answers):
+    controller = AppController()
+    for field, value in answers.items():
+        controller.update_input(field, value)
+    results = controller.run_analysis()
+    return format_report(results["user_data"], results["recommendations"],
+                         results["risk_level"], results["risk_score"])
+
+
+@pytest.fixture
+def reports():
+    fields = ["password_reuse", "two_factor", "vpn", "os_update", "backup_data"]
+    return {f"user-{i}": _report(**{field: "no" for field in fields[:i % 5 + 1]}) for i in range(20)}
+
+
+def test_random_access_after_reopen(tmp_path, reports):
+    path = str(tmp_path / "archive")
+    with ReportArchive.create(path, list(reports.values())[:5]) as archive:
+        archive.append_many(reports.items())
+        archive.append("user-3", "replaced")
+
+    with ReportArchive(path) as archive:
+        assert len(archive) == 20
+        assert archive.get("user-7") == reports["user-7"]
+        assert archive.get("user-3") == "replaced"
+        with pytest.raises(KeyError):
+            archive.get("missing")
+
+
+def test_smaller_than_gzip(tmp_path, reports):
+    with ReportArchive.create(str(tmp_path / "archive"), list(reports.values())) as archive:
+        archive.append_many(reports.items())
+        gzip_size = sum(len(gzip.compress(text.encode("utf-8"))) for text in reports.values())
+        assert archive.stored_size() < gzip_size / 2
+
+
+def test_create_refuses_existing_archive(tmp_path, reports):
+    path = str(tmp_path / "archive")
+    ReportArchive.create(path, list(reports.values())).close()
+    with pytest.raises(FileExistsError):
+        ReportArchive.create(path, [])
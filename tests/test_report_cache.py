@@ -0,0 +1,64 @@
+from src.report_cache import ReportCache, memoized_report, report_cache_key
+
+ISSUE = {
+    "user_issue": "My email was in a breach",
+    "classification": {"primary_category": "account_security", "severity": "high"},
+    "followup_answers": {"q1": "Yes", "q2": "Mobile"},
+}
+
+
+def test_key_depends_only_on_inputs():
+    reordered = {
+        "followup_answers": {"q2": "Mobile", "q1": "Yes"},
+        "classification": {"severity": "high", "primary_category": "account_security"},
+        "user_issue": "My email was in a breach",
+    }
+    assert report_cache_key(ISSUE, "m") == report_cache_key(reordered, "m")
+    assert report_cache_key(ISSUE, "m") != report_cache_key(ISSUE, "other-model")
+    changed = dict(ISSUE, followup_answers={"q1": "No", "q2": "Mobile"})
+    assert report_cache_key(ISSUE, "m") != report_cache_key(changed, "m")
+
+
+def test_key_depends_on_the_questions_behind_the_answers():
+    reuse = {"id": "q1", "question": "Do you reuse passwords?", "slot": "password_reuse", "polarity": "positive"}
+    skip = {"id": "q1", "question": "Do you skip updates?", "slot": "os_update", "polarity": "negative"}
+    asked_reuse = dict(ISSUE, followup_questions=[reuse])
+    assert report_cache_key(asked_reuse, "m") != report_cache_key(dict(ISSUE, followup_questions=[skip]), "m")
+    assert report_cache_key(asked_reuse, "m") != report_cache_key(ISSUE, "m")
+    # Display-only fields do not matter
+    reworded_context = dict(ISSUE, followup_questions=[dict(reuse, context="why we ask")])
+    assert report_cache_key(asked_reuse, "m") == report_cache_key(reworded_context, "m")
+
+
+def test_reruns_and_other_sessions_reuse_the_report():
+    cache = ReportCache()
+    calls = []
+
+    def generate(data):
+        calls.append(data)
+        return {"analysis": f"report {len(calls)}"}
+
+    session = {}
+    report, source = memoized_report(session, ISSUE, "m", generate, cache)
+    assert source == "generated"
+    assert memoized_report(session, ISSUE, "m", generate, cache) == (report, "session")
+    assert memoized_report({}, dict(ISSUE), "m", generate, cache) == (report, "cache")
+    assert len(calls) == 1
+
+    changed = dict(ISSUE, followup_answers={"q1": "No"})
+    new_report, source = memoized_report(session, changed, "m", generate, cache)
+    assert source == "generated" and new_report != report
+    assert len(calls) == 2
+
+
+def test_errors_are_retried_and_cache_is_bounded():
+    cache = ReportCache(max_size=2)
+    session = {}
+    failing = lambda data: {"analysis": "Analysis in progress. Please try again.", "error": "timeout"}
+    memoized_report(session, ISSUE, "m", failing, cache)
+    _, source = memoized_report(session, ISSUE, "m", lambda data: {"analysis": "ok"}, cache)
+    assert source == "generated"
+
+    for idx in range(3):
+        cache.put(f"k{idx}", {"analysis": idx})
+    assert len(cache) == 2 and cache.get("k0") is None
@@ -0,0 +1,75 @@
+import json
+import re
+import zipfile
+
+import pytest
+
+from src.app_controller import AppController
+from src.report_export import FORMATS, _output_name, _output_path, export_reports, render_html, render_text
+from src.utils import format_report
+
+
+def _assessment(idx):
+    controller = AppController()
+    controller.update_input("two_factor", "no")
+    controller.update_input("vpn", "no")
+    controller.update_input("social_media", ["Facebook", "<script>"])
+    return dict(controller.run_analysis(), id=f"user-{idx}")
+
+
+def test_text_matches_format_report():
+    assessment = _assessment(1)
+    expected = format_report(
+        assessment["user_data"], assessment["recommendations"],
+        assessment["risk_level"], assessment["risk_score"],
+    )
+    expected = re.sub(r"Assessment Date: .*", "Assessment Date: DATE", expected)
+    assert render_text(assessment, "DATE") == expected
+
+
+def test_html_escapes_user_data():
+    assert "&lt;script&gt;" in render_html(_assessment(1), "DATE")
+
+
+def test_export_to_archive(tmp_path):
+    archive = tmp_path / "reports.zip"
+    names = export_reports([_assessment(i) for i in range(3)], archive=str(archive),
+                           formats=FORMATS, workers=2)
+
+    assert len(names) == 3 * len(FORMATS)
+    with zipfile.ZipFile(archive) as zf:
+        document = json.loads(zf.read("user-2.json"))
+        assert document["risk_score"] == 32
+        assert document["next_steps"][0] == "Address high-priority items first"
+
+
+def test_export_to_directory(tmp_path):
+    export_reports([_assessment(0)], out_dir=str(tmp_path), formats=("csv", "markdown"), workers=1)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["user-0.csv", "user-0.md"]
+
+
+def test_export_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_reports([], out_dir=str(tmp_path), formats=("pdf",))
+
+
+@pytest.mark.parametrize("assessment_id, expected", [
+    ("user-7", "user-7.csv"),
+    ("../../x", "3.csv"),
+    ("a/b", "3.csv"),
+    (".hidden", "3.csv"),
+    (None, "3.csv"),
+])
+def test_output_names_stay_in_out_dir(tmp_path, assessment_id, expected):
+    assert _output_name({"id": assessment_id}, 3, "csv") == expected
+    with pytest.raises(ValueError):
+        _output_path(str(tmp_path), "../escaped.csv")
+
+
+def test_unsafe_ids_fall_back_to_their_position(tmp_path):
+    assessments = [dict(_assessment(0), id="../../x"), dict(_assessment(1), id=None)]
+    export_reports(assessments, out_dir=str(tmp_path / "out"), formats=("json",), workers=1)
+
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["1.json", "2.json"]
+    assert not (tmp_path / "x.json").exists()
@@ -0,0 +1,45 @@
+import json
+import random
+
+from src.gemini_stub import REPORT
+from src.report_stream import ReportStreamParser
+
+TRICKY = dict(REPORT, risk=42, ok=True, nums=[1, 2.5, -3], empty=[], strs=["a,]", 'b"}'],
+              nested={"a": [1, {"b": '}]\\"'}]}, escaped='quote " brace } bracket ]', last=None)
+
+
+def feed_in_chunks(text, seed):
+    parser, rng, changes, i = ReportStreamParser(), random.Random(seed), [], 0
+    while i < len(text):
+        size = rng.randint(1, 30)
+        changes.append((i + size, parser.feed(text[i:i + size])))
+        i += size
+    return parser, changes
+
+
+def test_any_chunking_yields_the_whole_object():
+    for indent in (None, 2):
+        text = "```json\n" + json.dumps(TRICKY, indent=indent) + "\n```"
+        for seed in range(50):
+            parser, _ = feed_in_chunks(text, seed)
+            assert parser.done
+            assert parser.partial == TRICKY
+
+
+def test_parts_are_available_before_the_response_ends():
+    text = json.dumps(REPORT)
+    parser = ReportStreamParser()
+    end_of_analysis = text.index('"root_causes"')
+    assert parser.feed(text[:end_of_analysis]) == ["analysis"]
+    assert parser.partial == {"analysis": REPORT["analysis"]}
+
+    first_action_end = text.index("}", text.index('"immediate_actions"')) + 1
+    assert parser.feed(text[end_of_analysis:first_action_end]) == ["root_causes", "immediate_actions"]
+    assert parser.partial["immediate_actions"] == REPORT["immediate_actions"][:1]
+    assert not parser.done
+
+
+def test_incomplete_value_is_not_reported():
+    parser = ReportStreamParser()
+    assert parser.feed('{"analysis": "half a sent') == []
+    assert parser.partial == {}
@@ -0,0 +1,46 @@
+import io
+import os
+from datetime import datetime
+
+import pytest
+
+from src.inference_engine import InferenceEngine
+from src.report_writer import ReportWriter
+from src.utils import calculate_risk_level, format_report
+
+WHEN = datetime(2026, 3, 1, 9, 30)
+
+# The fixture's report as rendered by format_report before ReportWriter existed
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden", "format_report.txt")
+
+
+@pytest.fixture
+def assessment():
+    user_data = {"two_factor": "no", "vpn": "no", "email_encryption": "no"}
+    recommendations, risk_score = InferenceEngine().process(user_data)
+    return user_data, recommendations, calculate_risk_level(risk_score), risk_score
+
+
+def test_streamed_report_matches_the_original_format_report(assessment):
+    buf = io.StringIO()
+    ReportWriter().write(buf, *assessment, WHEN)
+    with open(GOLDEN, encoding="utf-8", newline="") as f:
+        golden = f.read()
+
+    assert buf.getvalue() == golden
+    assert format_report(*assessment, timestamp=WHEN) == golden
+    assert "Assessment Date: 2026-03-01 09:30:00" in buf.getvalue()
+
+
+def test_partial_render_high_priority_only(assessment):
+    text = ReportWriter(sections=("recommendations",), priorities=("high",)).render(*assessment, WHEN)
+
+    assert text.startswith("\nHIGH PRIORITY RECOMMENDATIONS (1 total)")
+    assert "Enable Two-Factor Authentication" in text
+    assert "VPN" not in text
+    assert "NEXT STEPS" not in text
+
+
+def test_rejects_unknown_section():
+    with pytest.raises(ValueError):
+        ReportWriter(sections=("appendix",))
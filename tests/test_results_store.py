@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from src import results_store
+from src.app_controller import AppController
+from src.results_store import ResultsStore, decode_profile, encode_profile
+
+
+def _ts(year, month):
+    return datetime(year, month, 15, tzinfo=timezone.utc).timestamp()
+
+
+def _result(**answers):
+    controller = AppController()
+    for field, value in answers.items():
+        controller.update_input(field, value)
+    return controller.run_analysis()
+
+
+@pytest.fixture(params=["numpy", "pure-python"])
+def store(request, tmp_path, monkeypatch):
+    if request.param == "pure-python":
+        monkeypatch.setattr(results_store, "np", None)
+    elif results_store.np is None:
+        pytest.skip("numpy is not installed")
+    return ResultsStore(str(tmp_path / "results"))
+
+
+def test_profile_bits_round_trip():
+    profile = {"two_factor": "no", "vpn": "yes", "backup_data": "no"}
+    assert decode_profile(encode_profile(profile)) == profile
+
+
+def test_rule_hit_share_by_month(store):
+    store.append_many(
+        [_result(two_factor="no"), _result(two_factor="yes"), _result(two_factor="no")],
+        [_ts(2026, 1), _ts(2026, 1), _ts(2026, 2)],
+    )
+
+    shares = store.rule_hit_share_by_month("no-two-factor-rule")
+
+    assert shares == {
+        "2026-01": {"hits": 1, "total": 2, "share": 0.5},
+        "2026-02": {"hits": 1, "total": 1, "share": 1.0},
+    }
+
+
+def test_controller_appends_results(store):
+    controller = AppController(results_store=store)
+    controller.update_input("password_reuse", "yes")
+    controller.update_input("two_factor", "no")
+    controller.run_analysis()
+
+    assert len(store) == 1
+    assert list(store.column("risk_score")) == [40]
+    assert store.risk_level_counts()["High"] == 1
+    assert decode_profile(store.column("profile")[0]) == {"password_reuse": "yes", "two_factor": "no"}
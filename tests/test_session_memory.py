@@ -0,0 +1,103 @@
+import json
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+from src.session_memory import SESSION_MEMORY, SessionMemoryTracker, deep_sizeof, trim_oldest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+CHATBOT = os.path.join(ROOT, "chatbot.py")
+
+
+def test_deep_sizeof_counts_nested_and_shared_objects_once():
+    text = "x" * 1000
+    assert deep_sizeof([text]) == sys.getsizeof([text]) + sys.getsizeof(text)
+    assert deep_sizeof([text, text]) == sys.getsizeof([text, text]) + sys.getsizeof(text)
+    nested = {"messages": [{"role": "user", "content": text}]}
+    assert deep_sizeof(nested) > 1000
+
+
+def test_trim_oldest_keeps_newest():
+    messages = [{"content": f"{i:02d}" + "m" * 500} for i in range(10)]
+    item = deep_sizeof(messages[0])
+    assert trim_oldest(messages, 2 * item + 1, keep=6) == 3
+    assert len(messages) == 7
+    assert trim_oldest(messages, 10 ** 9, keep=6) == 1
+    assert trim_oldest(messages, 10 ** 9, keep=6) == 0
+
+
+def test_sessions_sampled_on_step_changes_and_reported_biggest_first(monkeypatch):
+    monkeypatch.setenv("PRIVACY_ADVISOR_MEMORY", "0")
+    now = [0.0]
+    tracker = SessionMemoryTracker(session_ttl=100, clock=lambda: now[0])
+    small, big = {"messages": ["a"]}, {"messages": ["b" * 10000]}
+    assert tracker.observe("s1", "chatbot", 1, small) is not None
+    assert tracker.observe("s1", "chatbot", 1, small) is None
+    assert tracker.observe("s2", "chatbot", 1, big)["bytes"] > 10000
+    assert tracker.observe(None, "chatbot", 1, big) is None
+
+    report = tracker.report()
+    assert report["session_count"] == 2
+    assert [s["session"] for s in report["sessions"]] == ["s2", "s1"]
+    assert report["sessions"][0]["largest_fields"][0][0] == "messages"
+    assert report["tracemalloc"] is None
+
+    now[0] = 150.0
+    tracker.observe("s1", "chatbot", 2, small)
+    assert [s["session"] for s in tracker.report()["sessions"]] == ["s1"]
+
+
+def test_tracemalloc_growth_between_snapshots(monkeypatch):
+    monkeypatch.setenv("PRIVACY_ADVISOR_MEMORY", "1")
+    tracker = SessionMemoryTracker(snapshot_interval=0)
+    try:
+        tracker.observe("s1", "app", 0, {})
+        tracker.observe("s1", "app", 1, {})
+        leak = [bytearray(1000) for _ in range(200)]
+        tracker.observe("s1", "app", 2, {"leak": leak})
+        traced = tracker.report()["tracemalloc"]
+    finally:
+        tracemalloc.stop()
+    assert traced["top_sites"]
+    assert any("test_session_memory.py" in site["site"] and site["bytes"] >= 200 * 1000
+               for site in traced["growth"])
+
+
+def test_chatbot_history_is_trimmed_to_the_cap(monkeypatch):
+    app_test = pytest.importorskip("streamlit.testing.v1")
+    monkeypatch.setenv("PRIVACY_ADVISOR_WARMUP", "0")
+    monkeypatch.setenv("PRIVACY_ADVISOR_SESSION_CAP", "20000")
+    SESSION_MEMORY.reset()
+    at = app_test.AppTest.from_file(CHATBOT, default_timeout=30)
+    messages = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"{i} " + "x" * 2000}
+                for i in range(40)]
+    at.session_state["messages"] = messages
+    at.run()
+    assert not at.exception
+    kept = at.session_state.messages
+    assert 6 <= len(kept) < 40
+    assert kept[-1]["content"].startswith("39 ")
+    report = SESSION_MEMORY.report()
+    assert report["trims"] == 1
+    assert report["sessions"][0]["bytes"] <= 20000
+
+
+def test_debug_page_lists_sessions(monkeypatch):
+    app_test = pytest.importorskip("streamlit.testing.v1")
+    monkeypatch.setenv("PRIVACY_ADVISOR_WARMUP", "0")
+    monkeypatch.setenv("PRIVACY_ADVISOR_MEMORY", "1")
+    monkeypatch.setattr(SESSION_MEMORY, "snapshot_interval", 3600.0)
+    SESSION_MEMORY.reset()
+    at = app_test.AppTest.from_file(APP, default_timeout=30)
+    at.query_params["debug"] = "memory"
+    try:
+        at.run()
+    finally:
+        tracemalloc.stop()
+    assert not at.exception
+    report = json.loads(at.json[0].value)
+    assert report["session_count"] == 1
+    assert report["sessions"][0]["app"] == "app"
@@ -0,0 +1,45 @@
+import sqlite3
+
+from src.session_snapshot import SNAPSHOT_FIELDS, SessionSnapshots, decode_snapshot, encode_snapshot, new_token
+
+STATE = {
+    "user_issue": "My email was in a breach — what now?",
+    "issue_classified": True,
+    "issue_classification": {"primary_category": "account_security", "risk_level": 72},
+    "followup_answers": {"q1": "No"},
+    "report_generated": False,
+    "final_report": None,
+    "active_job": "not a snapshot field",
+}
+
+
+def test_encoding_keeps_only_snapshot_fields():
+    restored = decode_snapshot(encode_snapshot(STATE))
+    assert restored == {key: value for key, value in STATE.items() if key in SNAPSHOT_FIELDS}
+
+
+def test_save_load_and_replace(tmp_path):
+    store = SessionSnapshots(str(tmp_path / "snapshots.db"))
+    token = new_token()
+    assert store.load(token) is None
+    assert store.save(token, STATE) > 0
+    assert store.load(token)["followup_answers"] == {"q1": "No"}
+
+    store.save(token, dict(STATE, report_generated=True))
+    assert store.load(token)["report_generated"] is True
+    assert len(store) == 1
+    store.delete(token)
+    assert store.load(token) is None
+
+
+def test_expired_and_corrupt_snapshots(tmp_path):
+    path = str(tmp_path / "snapshots.db")
+    store = SessionSnapshots(path, max_age=60)
+    store.save("old", STATE, now=0.0)
+    store.save("bad", STATE)
+    assert store.load("old") is None
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE snapshots SET data = ? WHERE token = 'bad'", (b"garbage",))
+    assert store.load("bad") is None
+    assert store.prune() == 1
+    assert len(store) == 1
@@ -0,0 +1,39 @@
+from src.speculation import (
+    MAX_SPECULATIONS, RESPECULATE_SECONDS, SETTLE_SECONDS, SpeculationStats, may_speculate, ready_to_speculate,
+)
+
+QUESTIONS = [{"id": "q1"}, {"id": "q2"}, {"id": "q3"}]
+
+
+def test_complete_answers_must_settle_too():
+    answers = {"q1": "Yes", "q2": "No", "q3": "x"}
+    assert not ready_to_speculate(QUESTIONS, answers, 0.0)
+    assert ready_to_speculate(QUESTIONS, answers, SETTLE_SECONDS)
+
+
+def test_partial_answers_must_settle():
+    answers = {"q1": "Yes", "q2": "No"}
+    assert not ready_to_speculate(QUESTIONS, answers, SETTLE_SECONDS / 2)
+    assert ready_to_speculate(QUESTIONS, answers, SETTLE_SECONDS)
+    assert not ready_to_speculate(QUESTIONS, {"q1": "Yes"}, 60.0)
+    assert not ready_to_speculate([], {}, 60.0)
+
+
+def test_speculation_is_rate_limited():
+    assert may_speculate(0, None)
+    assert not may_speculate(1, RESPECULATE_SECONDS / 2)
+    assert may_speculate(1, RESPECULATE_SECONDS)
+    assert not may_speculate(MAX_SPECULATIONS, None)
+
+
+def test_hit_rate_and_saved_time():
+    stats = SpeculationStats()
+    stats.started()
+    stats.started()
+    stats.cancelled()
+    stats.report(hit=True, saved_seconds=4.0)
+    stats.report(hit=False)
+    result = stats.stats()
+    assert result["hit_rate"] == 0.5
+    assert result["saved_seconds_mean"] == 4.0
+    assert (result["started"], result["cancelled"]) == (2, 1)
@@ -0,0 +1,39 @@
+from src import warmup
+from src.gemini_pool import GEMINI_POOL
+from src.knowledge_base_mapper import get_rules
+
+
+def test_get_rules_is_parsed_once():
+    assert get_rules() is get_rules()
+    assert "no-vpn-rule" in get_rules()
+
+
+def test_start_warmup_runs_each_part_once(monkeypatch):
+    calls = []
+    monkeypatch.setenv("PRIVACY_ADVISOR_WARMUP", "1")
+    monkeypatch.setattr(warmup, "_started", set())
+    monkeypatch.setattr(warmup, "STEPS", (("shared", lambda: calls.append("shared")),))
+    monkeypatch.setattr(GEMINI_POOL, "factory", lambda key, name: calls.append((key, name)) or object())
+    GEMINI_POOL.clear()
+
+    warmup.start_warmup().join()
+    assert warmup.start_warmup() is None
+    warmup.start_warmup("key-a", "model").join()
+    assert warmup.start_warmup("key-a", "model") is None
+    warmup.start_warmup("key-b", "model").join()
+    GEMINI_POOL.clear()
+
+    assert calls == ["shared", ("key-a", "model"), ("key-b", "model")]
+    assert "model:model" in warmup.WARMUP_TIMINGS
+
+
+def test_failing_step_is_skipped_and_disabled_flag(monkeypatch):
+    def broken():
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(warmup, "STEPS", (("broken", broken), ("ok", lambda: None)))
+    assert list(warmup.warm_up()) == ["ok"]
+
+    monkeypatch.setenv("PRIVACY_ADVISOR_WARMUP", "0")
+    monkeypatch.setattr(warmup, "_started", set())
+    assert warmup.start_warmup() is None